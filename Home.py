@@ -1,4 +1,5 @@
 import streamlit as st
+from ml_explorer.overlay import finish_profiling, start_profiling
 
 
 # Page configuration - MUST be first Streamlit command
@@ -7,6 +8,7 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
+profiler = start_profiling('Home')
 
 # Main title
 st.title("🤖 Machine Learning Explorer Dashboard")
@@ -52,7 +54,12 @@ with col3:
             - Reward-based learning
             """)
 
+st.caption("🧪 **Experiment Results** browses parameter sweeps run from the command line "
+           "with `python -m ml_explorer.experiments`.")
+
 # Footer
 
 st.markdown("---")
 st.markdown("**Built with:** Streamlit + scikit-learn + Plotly")
+
+finish_profiling(profiler)
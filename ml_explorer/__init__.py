@@ -0,0 +1,64 @@
+"""
+Compute helpers shared by the ML Explorer Dashboard pages.
+
+The Streamlit scripts in ``pages/`` import from this package so the
+numerical work can be reused outside ``streamlit run``. Apart from the
+``overlay`` module, nothing here imports Streamlit: every function takes
+plain parameters and returns NumPy arrays or frozen result records, so
+the compute path can be benchmarked, cached and parallelised on its own.
+
+    from ml_explorer import GridWorld, fit_kmeans, train
+
+    fit = fit_kmeans(n_samples=1000, k=4)
+    result = train(GridWorld.classic(), n_agents=8, n_episodes=200,
+                   learning_rate=0.8, discount=0.95, epsilon=0.1, seed=0)
+"""
+import importlib
+
+# Public name -> defining module. Resolved on first access so that importing
+# one submodule (e.g. from a page) does not pull in every other dependency.
+_EXPORTS = {
+    # Supervised
+    'Dataset': 'supervised', 'ClassificationResult': 'supervised', 'RegressionResult': 'supervised',
+    'load_dataset': 'supervised', 'fit_classifier': 'supervised', 'fit_regressor': 'supervised',
+    'classify': 'sweep', 'regress': 'sweep',
+    'CVResult': 'crossval', 'cross_validate_classifier': 'crossval',
+    'cross_validate_regressor': 'crossval',
+    'RegularizationPath': 'regularization', 'regularization_path': 'regularization',
+    'regularization_paths': 'regularization',
+    'TableProfile': 'tabular', 'TableFit': 'tabular', 'profile_table': 'tabular', 'fit_table': 'tabular',
+    # Unsupervised
+    'KMeansResult': 'clustering', 'SweepResult': 'clustering', 'Projection': 'clustering',
+    'make_data': 'clustering', 'fit_kmeans': 'clustering', 'score_kmeans': 'clustering',
+    'project_pca': 'clustering', 'sweep_k': 'clustering',
+    'SilhouetteEstimate': 'silhouette',
+    'OutOfCoreResult': 'streaming', 'fit_out_of_core': 'streaming', 'fit_file': 'streaming',
+    # Reinforcement
+    'GridWorld': 'gridworld',
+    'TrainingResult': 'qlearning', 'init_q_tables': 'qlearning', 'train_episode': 'qlearning',
+    'train_episodes': 'qlearning', 'train': 'qlearning', 'state_values': 'qlearning',
+    'QStar': 'planning', 'value_iteration': 'planning', 'OptimalityTracker': 'planning',
+    'DynaPlanner': 'dyna', 'compare_planning': 'dyna', 'ConvergenceTrace': 'dyna',
+    'HyperparameterGrid': 'tuning', 'SweepRunner': 'tuning', 'sweep_hyperparameters': 'tuning',
+    'Checkpoint': 'checkpoint', 'save_checkpoint': 'checkpoint', 'load_checkpoint': 'checkpoint',
+    # Experiments
+    'ExperimentResults': 'experiments', 'load_spec': 'experiments', 'run_spec': 'experiments',
+    'load_results': 'experiments',
+    # Caching
+    'FigurePayload': 'figures', 'cached_figure': 'figures',
+    'cache_stats': 'cache', 'clear_caches': 'cache', 'set_memory_budget': 'cache',
+    'session_footprints': 'cache',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'ml_explorer' has no attribute '{name}'")
+    module = importlib.import_module(f'ml_explorer.{_EXPORTS[name]}')
+    return getattr(module, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,365 @@
+"""
+Benchmarks for the compute and render path of every page.
+
+Each suite runs one page's pipeline over a parameter matrix and times
+every stage separately: the model or training work, building the Plotly
+figure, and serialising it to the JSON Streamlit sends to the browser.
+Caches are cleared before every repetition, so the numbers are for a cold
+rerun in a warmed-up process (each suite runs once untimed first).
+Seconds are the median over the repetitions. Peak memory comes from one
+extra traced run: Python and NumPy allocations are tracked with
+``tracemalloc``.
+
+Results are written as JSON. If a baseline file exists, the results are
+compared against it and every stage that got slower, or used more memory,
+beyond the threshold is reported as a regression::
+
+    python -m ml_explorer.benchmark --quick                # fast subset
+    python -m ml_explorer.benchmark --save-baseline        # record a baseline
+    python -m ml_explorer.benchmark --suite clustering     # compare one suite
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR, clear_caches
+
+BENCHMARK_DIR = CACHE_DIR / 'benchmarks'
+RESULTS_PATH = BENCHMARK_DIR / 'latest.json'
+BASELINE_PATH = BENCHMARK_DIR / 'baseline.json'
+
+# A stage regresses when it is this much slower (or larger) than the baseline...
+THRESHOLD = 0.25
+# ...and the difference is above the timer / allocator noise
+MIN_SECONDS = 0.005
+MIN_MB = 1.0
+
+# Parameter matrix of every suite: full run and --quick subset
+MATRIX = {
+    'supervised': {
+        'full': {'dataset': ('iris', 'diabetes'), 'test_size': (10, 20, 30, 50)},
+        'quick': {'dataset': ('iris', 'diabetes'), 'test_size': (20,)},
+    },
+    'clustering': {
+        'full': {'n_samples': (300, 5_000, 50_000, 200_000), 'k': (3, 8)},
+        'quick': {'n_samples': (300, 5_000), 'k': (3,)},
+    },
+    'qlearning': {
+        'full': {'grid_size': (5, 20, 50, 100), 'episodes': (100, 1000)},
+        'quick': {'grid_size': (5, 20), 'episodes': (100,)},
+    },
+}
+
+
+@dataclass(frozen=True)
+class Regression:
+    """One stage metric that got worse than the baseline."""
+    case: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self):
+        return self.current / self.baseline if self.baseline else float('inf')
+
+
+class _Recorder:
+    """Times named stages of one run and, when tracing, their peak allocations."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.seconds = {}
+        self.peak_mb = {}
+        self.payload_bytes = None
+
+    def __call__(self, stage, fn):
+        if self.trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        value = fn()
+        self.seconds[stage] = time.perf_counter() - start
+        if self.trace:
+            self.peak_mb[stage] = (tracemalloc.get_traced_memory()[1] - before) / 1e6
+        return value
+
+
+# ========================================
+# SUITES
+# ========================================
+
+def _serialize(measure, fig):
+    payload = measure('serialize', fig.to_json)
+    measure.payload_bytes = len(payload)
+
+
+def _supervised(measure, dataset, test_size):
+    from ml_explorer.plotting import confusion_heatmap, prediction_scatter
+    from ml_explorer.supervised import IRIS_SPECIES, fit_classifier, fit_regressor, load_dataset
+
+    measure('load', lambda: load_dataset(dataset))
+    if dataset == 'iris':
+        result = measure('fit', lambda: fit_classifier('iris', test_size=test_size / 100))
+        fig = measure('figure', lambda: confusion_heatmap(result.confusion, list(IRIS_SPECIES.values())))
+    else:
+        result = measure('fit', lambda: fit_regressor('diabetes', test_size=test_size / 100))
+        fig = measure('figure', lambda: prediction_scatter(result.y_test, result.y_pred))
+    _serialize(measure, fig)
+
+
+def _clustering(measure, n_samples, k):
+    from ml_explorer.clustering import fit_kmeans, make_data, project_pca, score_kmeans
+    from ml_explorer.plotting import cluster_scatter
+
+    measure('data', lambda: make_data(n_samples))
+    fit = measure('fit', lambda: fit_kmeans(n_samples, k))
+    measure('metrics', lambda: score_kmeans(n_samples, k))
+    projection = measure('projection', lambda: project_pca(n_samples))
+    fig = measure('figure', lambda: cluster_scatter(
+        projection.X_pca[:, 0], projection.X_pca[:, 1], fit.labels,
+        centers=projection.transform(fit.centers)
+    ))
+    _serialize(measure, fig)
+
+
+def _qlearning(measure, grid_size, episodes):
+    from ml_explorer.gridworld import GridWorld
+    from ml_explorer.planning import value_iteration
+    from ml_explorer.plotting import q_value_heatmap
+    from ml_explorer.qlearning import state_values, train
+
+    if grid_size == 5:
+        env = measure('world', GridWorld.classic)
+    else:
+        env = measure('world', lambda: GridWorld.random(grid_size, grid_size, n_pits=3, seed=0))
+    measure('plan', lambda: value_iteration(env, 0.95))
+    result = measure('train', lambda: train(env, 1, episodes, 0.8, 0.95, 0.1, seed=0))
+    fig = measure('figure', lambda: q_value_heatmap(env, state_values(env, result.q_tables)))
+    _serialize(measure, fig)
+
+
+SUITES = {
+    'supervised': _supervised,
+    'clustering': _clustering,
+    'qlearning': _qlearning,
+}
+
+
+# ========================================
+# RUNNING
+# ========================================
+
+def case_id(suite, params):
+    """Stable name of a benchmark case, used to match results with a baseline."""
+    return suite + '/' + ','.join(f'{key}={value}' for key, value in params.items())
+
+
+def iter_cases(suites=None, quick=False):
+    """Yield ``(suite, params)`` for every point of the selected parameter matrices."""
+    for suite in suites or SUITES:
+        matrix = MATRIX[suite]['quick' if quick else 'full']
+        for values in itertools.product(*matrix.values()):
+            yield suite, dict(zip(matrix, values))
+
+
+def run_case(suite, params, repeat=3):
+    """
+    Benchmark one case.
+
+    Returns:
+    --------
+    record : dict
+        JSON-ready ``{'case', 'suite', 'params', 'stages', 'payload_bytes'}``
+        where ``stages`` maps each stage to its median seconds and peak MB
+    """
+    fn = SUITES[suite]
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        measure = _Recorder(trace=False)
+        fn(measure, **params)
+        timings.append(measure.seconds)
+
+    # Memory is measured separately because tracing slows allocations down
+    clear_caches()
+    traced = _Recorder(trace=True)
+    tracemalloc.start()
+    try:
+        fn(traced, **params)
+    finally:
+        tracemalloc.stop()
+    clear_caches()
+
+    stages = {
+        stage: {
+            'seconds': statistics.median(t[stage] for t in timings),
+            'peak_mb': traced.peak_mb[stage],
+        }
+        for stage in timings[0]
+    }
+    return {
+        'case': case_id(suite, params),
+        'suite': suite,
+        'params': params,
+        'stages': stages,
+        'total_seconds': sum(s['seconds'] for s in stages.values()),
+        'payload_bytes': traced.payload_bytes,
+    }
+
+
+def environment():
+    """Versions and hardware the results were measured on."""
+    import plotly
+    import sklearn
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'plotly': plotly.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(suites=None, quick=False, repeat=3, progress=None):
+    """
+    Benchmark every case of the selected suites.
+
+    Parameters:
+    -----------
+    suites : list of str, optional
+        Suites to run, defaults to all
+    quick : bool
+        Use the small parameter matrix
+    repeat : int
+        Timed repetitions per case
+    progress : callable, optional
+        Called with each finished record
+
+    Returns:
+    --------
+    results : dict
+        ``{'environment': ..., 'results': [record, ...]}``
+    """
+    records = []
+    warmed_up = set()
+    for suite, params in iter_cases(suites, quick):
+        if suite not in warmed_up:
+            # Keep one-off costs (imports, first plotly template load) out of the first case
+            SUITES[suite](_Recorder(trace=False), **params)
+            warmed_up.add(suite)
+        record = run_case(suite, params, repeat)
+        records.append(record)
+        if progress is not None:
+            progress(record)
+    return {'environment': environment(), 'results': records}
+
+
+# ========================================
+# BASELINES
+# ========================================
+
+def save(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+
+
+def load(path):
+    """Read a results file, or return None if there is none."""
+    try:
+        return json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def compare(results, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS, min_mb=MIN_MB):
+    """
+    Stages of ``results`` that regressed against ``baseline``.
+
+    Only cases and stages present in both are compared. A stage regresses
+    when its time or peak memory exceeds the baseline by more than
+    ``threshold`` (relative) and by more than ``min_seconds`` / ``min_mb``
+    (absolute).
+
+    Returns:
+    --------
+    regressions : list of Regression
+    """
+    previous = {record['case']: record for record in baseline['results']}
+    regressions = []
+    for record in results['results']:
+        old = previous.get(record['case'])
+        if old is None:
+            continue
+        for stage, current in record['stages'].items():
+            before = old['stages'].get(stage)
+            if before is None:
+                continue
+            for metric, floor in (('seconds', min_seconds), ('peak_mb', min_mb)):
+                if (current[metric] > before[metric] * (1 + threshold)
+                        and current[metric] - before[metric] > floor):
+                    regressions.append(Regression(record['case'], stage, metric,
+                                                  before[metric], current[metric]))
+    return regressions
+
+
+def _print_record(record):
+    stages = '  '.join(f"{stage} {s['seconds'] * 1000:.1f}ms/{s['peak_mb']:.1f}MB"
+                       for stage, s in record['stages'].items())
+    print(f"{record['case']:<45} {record['total_seconds'] * 1000:9.1f}ms  {stages}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ML Explorer compute and render paths")
+    parser.add_argument('--suite', action='append', choices=list(SUITES),
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument('--quick', action='store_true', help="Run the small parameter matrix")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed repetitions per case")
+    parser.add_argument('--output', default=str(RESULTS_PATH), help="Where to write the results")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline to compare against")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Also write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Relative slowdown reported as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run(args.suite, args.quick, args.repeat, progress=_print_record)
+    save(results, args.output)
+    print(f"Wrote {len(results['results'])} cases to {args.output}")
+
+    baseline = load(args.baseline)
+    if args.save_baseline:
+        save(results, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        unit = 's' if r.metric == 'seconds' else 'MB'
+        print(f"REGRESSION {r.case} {r.stage} {r.metric}: "
+              f"{r.baseline:.3f}{unit} -> {r.current:.3f}{unit} ({r.ratio:.2f}x)")
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
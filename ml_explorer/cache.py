@@ -0,0 +1,379 @@
+"""
+Process-wide, size-bounded memoisation.
+
+Streamlit reruns page scripts from the top on every widget change, so
+anything expensive (dataset loading, model fitting) is wrapped with
+``lru_cached``. The cache lives at module level, which means it is shared
+by every session served by the same process, and it evicts the least
+recently used entry once ``maxsize`` is reached. Concurrent calls with the
+same arguments wait for the first one instead of redoing the work.
+
+Registered caches (every ``lru_cached`` function and every page pipeline
+stage) also share one memory budget. Each entry's size is estimated when
+it is stored, and once the registered caches together hold more than the
+budget, the least recently used entries across all of them are evicted.
+``cache_stats`` reports entries, bytes, hits, misses and evictions per
+cache. ``record_session`` keeps what each browser session holds privately
+(its ``st.session_state``) so the two can be compared. ``store_validated``
+keeps uploaded files under ``CACHE_DIR``, named by their contents.
+"""
+import functools
+import hashlib
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+# Where results that are worth keeping across server restarts are written
+CACHE_DIR = Path(os.environ.get('ML_EXPLORER_CACHE_DIR', Path.home() / '.cache' / 'ml_explorer'))
+
+# Combined size of all registered caches, in MB
+MEMORY_BUDGET_MB = float(os.environ.get('ML_EXPLORER_CACHE_MB', 512))
+
+# Every registered cache, by name (``module.qualname`` for ``lru_cached``)
+_registry = {}
+_budget_lock = threading.Lock()
+# Global access order across caches: every read or write stamps the entry
+_clock = itertools.count()
+
+
+def sizeof(obj, _seen=None):
+    """
+    Approximate bytes held by ``obj`` and everything it references.
+
+    NumPy arrays and pandas objects count their buffers, containers and
+    plain objects are walked recursively, and an object reachable twice is
+    counted once. Modules, classes and functions count as zero.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType,
+                                           types.BuiltinFunctionType, types.MethodType)):
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):  # pandas.DataFrame
+        return int(obj.memory_usage(deep=True).sum())
+    nbytes = getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, int):  # NumPy arrays, pandas Series
+        return nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, complex, bool)):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(sizeof(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), '__slots__', ()):
+        size += sizeof(getattr(obj, slot, None), seen)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'nbytes', 'tick')
+
+    def __init__(self, value, nbytes):
+        self.value = value
+        self.nbytes = nbytes
+        self.tick = next(_clock)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of one registered cache."""
+    name: str
+    entries: int
+    maxsize: int
+    nbytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that forgets its least recently used entries.
+
+    Parameters:
+    -----------
+    maxsize : int
+        Maximum number of entries kept
+    name : str, optional
+        Registers the cache under this name, which puts it under the shared
+        memory budget and in ``cache_stats``
+    """
+
+    def __init__(self, maxsize=128, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {}
+        if name is not None:
+            _registry[name] = self
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def _lookup(self, key):
+        # Caller holds the lock
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        self._data.move_to_end(key)
+        entry.tick = next(_clock)
+        self.hits += 1
+        return entry
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.value
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        entry = _Entry(value, sizeof(value) if self.name is not None else 0)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._data[key] = entry
+            self.nbytes += entry.nbytes
+            while len(self._data) > self.maxsize:
+                self._evict_oldest()
+        if self.name is not None:
+            _enforce_budget()
+
+    def _evict_oldest(self):
+        # Caller holds the lock
+        _, entry = self._data.popitem(last=False)
+        self.nbytes -= entry.nbytes
+        self.evictions += 1
+        return entry.nbytes
+
+    def _oldest_tick(self):
+        with self._lock:
+            return next(iter(self._data.values())).tick if self._data else None
+
+    def stats(self):
+        return CacheStats(self.name, len(self._data), self.maxsize, self.nbytes,
+                          self.hits, self.misses, self.evictions)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for ``key``, computing it at most once.
+
+        If another thread is already computing the same key, wait for it
+        and reuse its result.
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry.value
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+
+def _enforce_budget():
+    """Evict the least recently used entries of all registered caches until they fit the budget."""
+    budget = MEMORY_BUDGET_MB * 2**20
+    with _budget_lock:
+        caches = list(_registry.values())
+        total = sum(cache.nbytes for cache in caches)
+        while total > budget:
+            ticks = [(tick, i) for i, cache in enumerate(caches)
+                     if (tick := cache._oldest_tick()) is not None]
+            if not ticks:
+                break
+            cache = caches[min(ticks)[1]]
+            with cache._lock:
+                if cache._data:
+                    total -= cache._evict_oldest()
+
+
+def set_memory_budget(mb):
+    """Change the shared memory budget (in MB), evicting at once if it shrank."""
+    global MEMORY_BUDGET_MB
+    MEMORY_BUDGET_MB = float(mb)
+    _enforce_budget()
+
+
+def cache_stats():
+    """
+    Counters of every registered cache, largest first.
+
+    Returns:
+    --------
+    stats : list of CacheStats
+    """
+    return sorted((cache.stats() for cache in list(_registry.values())),
+                  key=lambda s: s.nbytes, reverse=True)
+
+
+def lru_cached(maxsize=128):
+    """
+    Decorator memoising a function in a process-wide ``LRUCache``.
+
+    Arguments are normalised against the function signature, so
+    ``f(0.2)`` and ``f(test_size=0.2)`` share an entry. All arguments
+    must be hashable. Cached values are shared between callers and must
+    be treated as read-only.
+    """
+    def decorator(fn):
+        cache = LRUCache(maxsize, name=f'{fn.__module__}.{fn.__qualname__}')
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(bound.arguments.items())
+            return cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def clear_caches():
+    """Empty every registered cache in the process (e.g. to time cold runs)."""
+    for cache in list(_registry.values()):
+        cache.clear()
+
+
+# ============================================================================
+# PER-SESSION FOOTPRINT
+# ============================================================================
+
+@dataclass(frozen=True)
+class SessionFootprint:
+    """What one browser session holds outside the shared caches."""
+    session: str
+    page: str
+    last_seen: float  # time.time() of the session's latest run
+    items: dict       # session state key -> estimated bytes
+
+    @property
+    def nbytes(self):
+        return sum(self.items.values())
+
+
+# Latest footprint of recently active sessions (not under the budget)
+_sessions = LRUCache(maxsize=256)
+
+
+def record_session(session, page, state):
+    """
+    Record the estimated size of everything a session keeps in its state.
+
+    Parameters:
+    -----------
+    session : str
+        Session id
+    page : str
+        Page that just ran
+    state : mapping
+        The session's private objects, e.g. ``st.session_state``
+    """
+    seen = set()
+    items = {str(key): sizeof(value, seen) for key, value in list(state.items())}
+    _sessions.put(session, SessionFootprint(session, page, time.time(), items))
+
+
+def session_footprints():
+    """
+    Latest footprint of every recently active session, largest first.
+
+    Returns:
+    --------
+    footprints : list of SessionFootprint
+    """
+    with _sessions._lock:
+        footprints = [entry.value for entry in _sessions._data.values()]
+    return sorted(footprints, key=lambda f: f.nbytes, reverse=True)
+
+
+# ============================================================================
+# UPLOADS
+# ============================================================================
+
+def store_validated(data, directory, name, suffix, validate):
+    """
+    Save the bytes of an uploaded file under ``directory`` once ``validate`` accepts them.
+
+    The file is named after its stem and a hash of its contents, so the
+    same upload is stored once. It is validated under its final name in
+    ``directory/.incoming``, then moved into place, so a rejected upload
+    never appears in ``directory``.
+
+    Parameters:
+    -----------
+    data : bytes
+        Contents of the upload
+    directory : Path
+        Where accepted uploads are kept
+    name : str
+        Original file name; its stem starts the stored name
+    suffix : str
+        Suffix of the stored file
+    validate : callable
+        Called with the path of the incoming file; raises if it is invalid
+
+    Returns:
+    --------
+    path : Path
+    """
+    path = directory / f"{Path(name).stem}-{hashlib.sha1(data).hexdigest()[:12]}{suffix}"
+    if not path.exists():
+        tmp = directory / '.incoming' / path.name
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(data)
+        try:
+            validate(tmp)
+        except Exception:
+            tmp.unlink()
+            raise
+        os.replace(tmp, path)
+    return path
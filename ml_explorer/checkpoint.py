@@ -0,0 +1,236 @@
+"""
+Compact checkpoints of a batch of Q-learning agents.
+
+A checkpoint holds everything the Grid World page needs to pick up
+training where it stopped: the float32 Q-tensor, the float32 reward
+history with its summary curves, the episode count, the hyperparameters,
+the grid layout and the state of the exploration random generator.
+
+The file is a small fixed header, a JSON description, then the raw
+arrays, each starting on a 64-byte boundary::
+
+    b'MLXQ' | version (uint16) | reserved (uint16) | JSON length (uint32)
+    JSON header (dtype, shape and offset of every array, plus metadata)
+    Q-tensor | rewards | summary
+
+Loading memory-maps the arrays instead of reading them, so a checkpoint
+of a 200×200 grid with a long history opens in milliseconds and pages
+are read from disk only when a chart or the next training run needs them.
+"""
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR, store_validated
+from ml_explorer.history import RewardHistory
+
+MAGIC = b'MLXQ'
+VERSION = 1
+ALIGN = 64
+SUFFIX = '.mlxq'
+
+# Saved and uploaded checkpoints, kept across server restarts
+CHECKPOINT_DIR = CACHE_DIR / 'checkpoints'
+
+_PREFIX = struct.Struct('<4sHHI')
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Agent state read back from a checkpoint file."""
+    q_tables: np.ndarray   # agents × rows × cols × actions, float32
+    rewards: np.ndarray    # episodes × agents, float32
+    summary: np.ndarray    # episodes × 4 (mean, low, high, moving average), float32
+    episodes_run: int
+    params: dict           # learning_rate, discount, epsilon
+    layout_key: tuple = None
+    rng_state: dict = None
+    window: int = 10
+    percentiles: tuple = (10, 90)
+
+    @property
+    def n_agents(self):
+        return self.q_tables.shape[0]
+
+    def history(self):
+        """``RewardHistory`` over the stored arrays (no recomputation)."""
+        return RewardHistory.from_arrays(self.rewards, self.summary, self.window, *self.percentiles)
+
+    def rng(self):
+        """Exploration generator restored to its saved state (fresh if none was saved)."""
+        rng = np.random.default_rng()
+        if self.rng_state and self.rng_state.get('bit_generator') == type(rng.bit_generator).__name__:
+            rng.bit_generator.state = self.rng_state
+        return rng
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def save_checkpoint(path, q_tables, history, episodes_run, params, layout_key=None, rng=None):
+    """
+    Write agent state to ``path`` (atomically: a partial file is never left behind).
+
+    Parameters:
+    -----------
+    path : str or Path
+        Destination file
+    q_tables : numpy.ndarray
+        Q-tensor (agents × rows × cols × actions)
+    history : RewardHistory
+        Rewards of every episode trained so far
+    episodes_run : int
+        Episodes trained so far
+    params : dict
+        Hyperparameters (learning_rate, discount, epsilon)
+    layout_key : tuple, optional
+        Grid World layout parameters, None for the classic grid
+    rng : numpy.random.Generator, optional
+        Exploration generator, saved so a resumed run continues its sequence
+
+    Returns:
+    --------
+    path : Path
+    """
+    arrays = {
+        'q_tables': np.ascontiguousarray(q_tables, dtype=np.float32),
+        'rewards': np.ascontiguousarray(history.rewards, dtype=np.float32),
+        'summary': np.ascontiguousarray(history.summary, dtype=np.float32),
+    }
+    header = {
+        'episodes_run': int(episodes_run),
+        'params': {key: float(value) for key, value in params.items()},
+        'layout_key': None if layout_key is None else list(layout_key),
+        'rng_state': rng.bit_generator.state if rng is not None else None,
+        'window': history.window,
+        'percentiles': list(history.percentiles),
+        'arrays': {},
+    }
+
+    def layout(start):
+        offsets, offset = {}, start
+        for name, array in arrays.items():
+            offset = _aligned(offset)
+            offsets[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes
+        return offsets
+
+    # The offsets are part of the header, so grow the space reserved for it
+    # until the header (with the offsets it implies) fits
+    start = 0
+    while True:
+        header['arrays'] = layout(start)
+        encoded = json.dumps(header).encode()
+        needed = _aligned(_PREFIX.size + len(encoded))
+        if needed <= start:
+            break
+        start = needed
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, 0, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.seek(header['arrays'][name]['offset'])
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    """
+    Parse the fixed prefix and JSON header of a checkpoint.
+
+    Raises:
+    -------
+    ValueError
+        If the file is not a checkpoint, is from a newer version, or is truncated
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{path.name} is not an ML Explorer checkpoint")
+        magic, version, _, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path.name} is not an ML Explorer checkpoint")
+        if version > VERSION:
+            raise ValueError(f"{path.name} was written by a newer version (format {version})")
+        header = json.loads(f.read(length))
+
+    for name, spec in header['arrays'].items():
+        nbytes = np.dtype(spec['dtype']).itemsize * int(np.prod(spec['shape']))
+        if nbytes and spec['offset'] + nbytes > size:
+            raise ValueError(f"{path.name} is truncated ({name} ends past the end of the file)")
+    return header
+
+
+def load_checkpoint(path, mmap=True):
+    """
+    Open a checkpoint written by ``save_checkpoint``.
+
+    Parameters:
+    -----------
+    path : str or Path
+        Checkpoint file
+    mmap : bool
+        Memory-map the arrays read-only (default) instead of reading them
+        into memory; the file must then stay in place while they are used
+
+    Returns:
+    --------
+    checkpoint : Checkpoint
+    """
+    header = read_header(path)
+
+    def array(name):
+        spec = header['arrays'][name]
+        dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+        if mmap and all(shape):
+            return np.memmap(path, dtype=dtype, mode='r', offset=spec['offset'], shape=shape)
+        # Zero-sized arrays cannot be memory-mapped
+        with open(path, 'rb') as f:
+            f.seek(spec['offset'])
+            data = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+        data.setflags(write=False)
+        return data
+
+    layout_key = header['layout_key']
+    return Checkpoint(
+        q_tables=array('q_tables'),
+        rewards=array('rewards'),
+        summary=array('summary'),
+        episodes_run=header['episodes_run'],
+        params=header['params'],
+        layout_key=None if layout_key is None else tuple(layout_key),
+        rng_state=header['rng_state'],
+        window=header['window'],
+        percentiles=tuple(header['percentiles']),
+    )
+
+
+def store_upload(data, name='upload'):
+    """
+    Save the bytes of an uploaded checkpoint under ``CHECKPOINT_DIR`` and validate it.
+
+    Returns:
+    --------
+    path : Path
+    """
+    return store_validated(data, CHECKPOINT_DIR, name, SUFFIX, read_header)
+
+
+def list_checkpoints(directory=CHECKPOINT_DIR):
+    """Checkpoint files in ``directory``, newest first."""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    return sorted(directory.glob(f'*{SUFFIX}'), key=lambda p: p.stat().st_mtime, reverse=True)
@@ -0,0 +1,153 @@
+"""
+Data generation, K-Means fitting and PCA for the Unsupervised Learning page.
+
+Fits and scores are memoised per ``(n_samples, k, seed)`` with
+``lru_cached``, so once ``sweep_k`` has fitted every k for a dataset,
+moving the k slider just picks a cached result. Fitting, scoring and
+projecting are separate functions so each can be reused on its own.
+scikit-learn is only imported on a cache miss.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import lru_cached
+from ml_explorer.parallel import fit_map
+from ml_explorer.silhouette import silhouette
+
+K_VALUES = range(2, 11)  # matches the page slider
+
+
+@dataclass(frozen=True)
+class KMeansResult:
+    """Cluster assignment of one K-Means fit."""
+    k: int
+    labels: np.ndarray
+    centers: np.ndarray
+    inertia: float
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Fits and silhouette scores for a range of k."""
+    ks: tuple
+    fits: tuple
+    scores: tuple
+
+    @property
+    def inertia(self):
+        return np.array([fit.inertia for fit in self.fits])
+
+    @property
+    def silhouette(self):
+        return np.array([score.score for score in self.scores])
+
+
+@dataclass(frozen=True)
+class Projection:
+    """2D PCA projection of a dataset and the fitted PCA model."""
+    X_pca: np.ndarray
+    explained_variance_ratio: np.ndarray
+    pca: object  # fitted sklearn.decomposition.PCA
+
+    def transform(self, points):
+        """Project other points (e.g. cluster centers) onto the same components."""
+        return self.pca.transform(points)
+
+
+@lru_cached(maxsize=16)
+def make_data(n_samples, seed=42):
+    """
+    Generate the page's 4-feature blob dataset.
+
+    Returns:
+    --------
+    X, true_labels : numpy.ndarray
+    """
+    from sklearn.datasets import make_blobs
+
+    X, true_labels = make_blobs(
+        n_samples=n_samples,
+        centers=5,
+        n_features=4,
+        random_state=seed,
+        cluster_std=1.0
+    )
+    X.setflags(write=False)
+    true_labels.setflags(write=False)
+    return X, true_labels
+
+
+@lru_cached(maxsize=256)
+def fit_kmeans(n_samples, k, seed=42):
+    """
+    Fit K-Means with k clusters on ``make_data(n_samples, seed)``.
+
+    Returns:
+    --------
+    result : KMeansResult
+    """
+    from sklearn.cluster import KMeans
+
+    X, _ = make_data(n_samples, seed)
+    kmeans = KMeans(n_clusters=k, random_state=seed, n_init=10)
+    labels = kmeans.fit_predict(X)
+
+    labels.setflags(write=False)
+    kmeans.cluster_centers_.setflags(write=False)
+    return KMeansResult(k, labels, kmeans.cluster_centers_, float(kmeans.inertia_))
+
+
+@lru_cached(maxsize=256)
+def score_kmeans(n_samples, k, seed=42):
+    """
+    Silhouette score of ``fit_kmeans(n_samples, k, seed)``.
+
+    Returns:
+    --------
+    estimate : SilhouetteEstimate
+    """
+    X, _ = make_data(n_samples, seed)
+    return silhouette(X, fit_kmeans(n_samples, k, seed).labels)
+
+
+@lru_cached(maxsize=16)
+def project_pca(n_samples, seed=42, n_components=2):
+    """
+    Fit PCA on ``make_data(n_samples, seed)`` and project the data.
+
+    Returns:
+    --------
+    projection : Projection
+    """
+    from sklearn.decomposition import PCA
+
+    X, _ = make_data(n_samples, seed)
+    pca = PCA(n_components=n_components)
+    X_pca = pca.fit_transform(X)
+    X_pca.setflags(write=False)
+    return Projection(X_pca, pca.explained_variance_ratio_, pca)
+
+
+@lru_cached(maxsize=16)
+def sweep_k(n_samples, seed=42, k_values=tuple(K_VALUES), max_workers=None):
+    """
+    Fit and score every k in ``k_values`` in parallel.
+
+    K-Means and the silhouette score spend their time in native code that
+    releases the GIL, so a thread per k (up to the cores) keeps every core
+    busy without the start-up cost of worker processes. ``parallel.fit_map``
+    splits the cores' native threads between the concurrent fits. Each fit
+    and score lands in the ``fit_kmeans`` / ``score_kmeans`` caches.
+
+    Returns:
+    --------
+    result : SweepResult
+    """
+    make_data(n_samples, seed)  # generate once, before the threads need it
+
+    def fit_and_score(k):
+        return fit_kmeans(n_samples, k, seed), score_kmeans(n_samples, k, seed)
+
+    fits, scores = zip(*fit_map(fit_and_score, k_values, max_workers))
+    return SweepResult(tuple(k_values), fits, scores)
@@ -0,0 +1,163 @@
+"""
+k-fold and repeated k-fold cross-validation for the Supervised Learning page.
+
+A single train/test split gives metrics that jump around with the seed.
+Here every model is scored on ``n_splits × n_repeats`` folds and the page
+shows mean ± standard deviation.
+
+LogisticRegression folds are independent fits and run on a thread pool,
+one thread per core (scikit-learn's solvers spend their time in native
+code), with ``parallel.fit_map`` splitting the cores' native threads
+between the concurrent fits. LinearRegression
+folds are not fitted one by one. Every fold's training Gram matrix is the
+full Gram matrix minus that of its test rows, so all folds are solved
+together with one batched ``numpy.linalg.solve``. Even 100-fold repeated
+CV costs a few milliseconds.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import lru_cached
+from ml_explorer.parallel import fit_map
+from ml_explorer.supervised import load_dataset
+
+
+@dataclass(frozen=True)
+class CVResult:
+    """Per-fold scores of one model (folds are ordered repeat by repeat)."""
+    n_splits: int
+    n_repeats: int
+    scores: dict  # metric name -> numpy.ndarray of per-fold values
+
+    @property
+    def n_folds(self):
+        return self.n_splits * self.n_repeats
+
+    def mean(self, metric):
+        return float(np.mean(self.scores[metric]))
+
+    def std(self, metric):
+        return float(np.std(self.scores[metric]))
+
+
+def fold_assignments(y, n_splits, n_repeats, random_state, stratify=False):
+    """
+    Test fold of every sample in every repeat.
+
+    Returns:
+    --------
+    folds : numpy.ndarray
+        2D int array (repeats × samples) of fold numbers 0..n_splits-1
+    """
+    from sklearn.model_selection import RepeatedKFold, RepeatedStratifiedKFold
+
+    Splitter = RepeatedStratifiedKFold if stratify else RepeatedKFold
+    splitter = Splitter(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+    folds = np.empty((n_repeats, len(y)), dtype=np.int32)
+    for i, (_, test) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[i // n_splits, test] = i % n_splits
+    return folds
+
+
+def _test_masks(folds, n_splits):
+    # (repeats × splits) × samples, True where the sample is in the test fold
+    return (folds[:, None, :] == np.arange(n_splits)[None, :, None]).reshape(-1, folds.shape[1])
+
+
+@lru_cached(maxsize=64)
+def cross_validate_classifier(dataset='iris', n_splits=5, n_repeats=1, random_state=42,
+                              max_iter=200, max_workers=None):
+    """
+    Repeated stratified k-fold accuracy of LogisticRegression.
+
+    Parameters:
+    -----------
+    dataset : str
+        Name of the bundled dataset
+    n_splits, n_repeats : int
+        Folds per repeat and number of reshuffled repeats
+    random_state : int
+        Seed of the fold shuffles
+    max_iter : int
+        Iteration limit of the solver
+    max_workers : int, optional
+        Threads fitting folds in parallel (default: one per core)
+
+    Returns:
+    --------
+    result : CVResult
+        Scores under 'accuracy'
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    data = load_dataset(dataset)
+    folds = fold_assignments(data.y, n_splits, n_repeats, random_state, stratify=True)
+    masks = _test_masks(folds, n_splits)
+
+    def score(test):
+        model = LogisticRegression(max_iter=max_iter).fit(data.X[~test], data.y[~test])
+        return np.mean(model.predict(data.X[test]) == data.y[test])
+
+    accuracy = np.array(fit_map(score, masks, max_workers), dtype=float)
+    accuracy.setflags(write=False)
+    return CVResult(n_splits, n_repeats, {'accuracy': accuracy})
+
+
+def batched_least_squares(X, y, test_masks):
+    """
+    Ordinary least squares with intercept, fitted on every fold at once.
+
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Samples (n × features)
+    y : numpy.ndarray
+        Targets (n,)
+    test_masks : numpy.ndarray
+        Boolean (folds × n), True for the rows held out of each fit
+
+    Returns:
+    --------
+    coefs : numpy.ndarray
+        (folds × features+1) weights, intercept last
+    """
+    Xa = np.column_stack([X, np.ones(len(X))])
+    test = test_masks.astype(Xa.dtype)
+    # Training Gram matrix and moment vector of every fold = full minus test rows
+    gram = Xa.T @ Xa - np.einsum('fn,ni,nj->fij', test, Xa, Xa, optimize=True)
+    moment = Xa.T @ y - test @ (Xa * y[:, None])
+    try:
+        return np.linalg.solve(gram, moment[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # Rank-deficient fold: minimum-norm solution, like scipy's lstsq
+        return np.einsum('fij,fj->fi', np.linalg.pinv(gram), moment)
+
+
+@lru_cached(maxsize=64)
+def cross_validate_regressor(dataset='diabetes', n_splits=5, n_repeats=1, random_state=42):
+    """
+    Repeated k-fold RMSE and R² of LinearRegression, all folds in one batched solve.
+
+    Returns:
+    --------
+    result : CVResult
+        Scores under 'rmse' and 'r2'
+    """
+    data = load_dataset(dataset)
+    folds = fold_assignments(data.y, n_splits, n_repeats, random_state)
+    masks = _test_masks(folds, n_splits)
+
+    coefs = batched_least_squares(data.X, data.y, masks)
+    predictions = data.X @ coefs[:, :-1].T + coefs[:, -1]           # samples × folds
+    residuals = (data.y[:, None] - predictions).T * masks            # folds × samples, test rows only
+    n_test = masks.sum(axis=1)
+    sse = (residuals ** 2).sum(axis=1)
+    test_mean = (masks * data.y).sum(axis=1) / n_test
+    sst = ((data.y[None, :] - test_mean[:, None]) ** 2 * masks).sum(axis=1)
+
+    rmse = np.sqrt(sse / n_test)
+    r2 = 1 - sse / sst
+    rmse.setflags(write=False)
+    r2.setflags(write=False)
+    return CVResult(n_splits, n_repeats, {'rmse': rmse, 'r2': r2})
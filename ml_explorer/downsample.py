@@ -0,0 +1,73 @@
+"""
+Shape-preserving downsampling for long line charts.
+
+Both functions cap the number of points sent to the browser while
+keeping the visual shape of a series: ``minmax_downsample`` keeps the
+extremes of every bucket so spikes and dips stay visible, ``lttb``
+(Largest-Triangle-Three-Buckets) picks the point in each bucket that
+contributes most to the curve's outline.
+"""
+import numpy as np
+
+
+def minmax_downsample(x, y, n_out):
+    """
+    Keep the minimum and maximum of each bucket, in their original order.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Series to reduce (same length, x increasing)
+    n_out : int
+        Maximum number of points to return
+
+    Returns:
+    --------
+    x_out, y_out : numpy.ndarray
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return x, y
+
+    n_buckets = n_out // 2
+    bucket = (np.arange(n) * n_buckets) // n
+
+    # Sorting by (bucket, y) puts each bucket's min first and max last
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.sort(np.unique(np.concatenate([order[starts], order[ends]])))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; each bucket in between
+    contributes the point forming the largest triangle with the point
+    kept from the previous bucket and the average of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_lo, nxt_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else x[-1]
+        avg_y = y[nxt_lo:nxt_hi].mean() if nxt_hi > nxt_lo else y[-1]
+
+        ax, ay = x[keep[i]], y[keep[i]]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        keep[i + 1] = lo + int(np.argmax(area))
+
+    return x[keep], y[keep]
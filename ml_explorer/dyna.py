@@ -0,0 +1,258 @@
+"""
+Model-based planning (Dyna-Q and prioritized sweeping) for batched Q-learning.
+
+Plain Q-learning makes one Q update per real step. A ``DynaPlanner``
+also records every real transition in a learned tabular model (the Grid
+World is deterministic, so one observation per state-action pair is the
+whole model) and, after each real step, replays ``n_updates`` simulated
+transitions from it:
+
+- ``'dyna'`` (Dyna-Q) picks the pairs uniformly among those seen so far.
+- ``'prioritized'`` (prioritized sweeping) keeps a small priority queue
+  per agent, ordered by the size of the last TD error. It pops the most
+  urgent pairs and pushes the seen predecessors of every updated state,
+  so values flow backwards from the goal.
+
+All agents' planning updates for a step are one batch of array
+operations. A pair drawn twice in a batch is updated once.
+
+``compare_planning`` trains the same batch of agents with each mode and
+records the distance to Q* against both environment steps and wall-clock
+seconds, so sample efficiency and compute cost can be compared directly.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.planning import OptimalityTracker
+from ml_explorer.qlearning import init_q_tables, per_agent, train_episode
+
+PLANNING_MODES = ('none', 'dyna', 'prioritized')
+
+# Queue entries kept per agent for prioritized sweeping
+QUEUE_SIZE = 64
+
+
+class DynaPlanner:
+    """
+    Learned model and planning updates for a batch of agents.
+
+    Parameters:
+    -----------
+    env : GridWorld
+        Environment the agents are trained in (for its size, terminal
+        states and predecessor table)
+    n_agents : int
+        Agents in the batch
+    mode : str
+        One of ``PLANNING_MODES``; 'none' only counts steps
+    n_updates : int
+        Planning updates per agent after every real step
+    threshold : float
+        Smallest TD error worth queueing (prioritized sweeping)
+    """
+
+    def __init__(self, env, n_agents, mode='dyna', n_updates=10, threshold=1e-3,
+                 queue_size=QUEUE_SIZE):
+        if mode not in PLANNING_MODES:
+            raise ValueError(f"Unknown planning mode '{mode}'; expected one of {PLANNING_MODES}")
+        self.env = env
+        self.mode = mode
+        self.n_updates = n_updates
+        self.threshold = threshold
+        self.n_agents = n_agents
+        self.queue_size = queue_size
+        self.steps = 0             # real agent-steps seen
+        self.planning_updates = 0  # simulated updates applied
+        self.next_state = None     # model arrays, allocated when planning first runs
+
+    def _allocate(self):
+        n_pairs = self.env.n_states * self.env.n_actions
+        # Model: next state (-1 = never tried) and reward of every pair, per agent
+        self.next_state = np.full((self.n_agents, n_pairs), -1, dtype=np.int32)
+        self.reward = np.zeros((self.n_agents, n_pairs), dtype=np.float32)
+        # Pairs tried so far, in the order they were first seen
+        self.seen = np.zeros((self.n_agents, n_pairs), dtype=np.int32)
+        self.n_seen = np.zeros(self.n_agents, dtype=np.int64)
+        self.queue_pair = np.zeros((self.n_agents, self.queue_size), dtype=np.int32)
+        self.queue_priority = np.zeros((self.n_agents, self.queue_size), dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the model (0 until planning has run)."""
+        if self.next_state is None:
+            return 0
+        return sum(a.nbytes for a in (self.next_state, self.reward, self.seen,
+                                      self.queue_pair, self.queue_priority))
+
+    def step(self, q, agents, states, actions, next_states, rewards, td_errors,
+             learning_rate, discount, rng, tracker=None):
+        """
+        Record one real step of ``agents`` and run the planning updates after it.
+
+        ``q`` is the (agents × states × actions) view of the Q-tensor and
+        ``td_errors`` the TD errors of the real updates just applied.
+        ``learning_rate`` and ``discount`` are scalars or per-agent arrays
+        over the whole batch.
+        """
+        self.steps += len(agents)
+        if self.mode == 'none' or self.n_updates <= 0:
+            return
+        if self.next_state is None:
+            self._allocate()
+
+        pairs = states * self.env.n_actions + actions
+        new = self.next_state[agents, pairs] < 0
+        self.next_state[agents, pairs] = next_states
+        self.reward[agents, pairs] = rewards
+        self.seen[agents[new], self.n_seen[agents[new]]] = pairs[new]
+        self.n_seen[agents[new]] += 1
+
+        if self.mode == 'dyna':
+            # Uniform draws among the pairs each agent has seen
+            draws = rng.random((len(agents), self.n_updates)) * self.n_seen[agents, None]
+            batch_agents = np.repeat(agents, self.n_updates)
+            batch_pairs = self.seen[batch_agents, draws.astype(np.int64).ravel()]
+        else:
+            self._push(agents, pairs[:, None], np.abs(td_errors)[:, None])
+            batch_agents, batch_pairs = self._pop(agents)
+        if len(batch_agents) == 0:
+            return
+
+        updated = self._update(q, batch_agents, batch_pairs, learning_rate, discount, tracker)
+        if self.mode == 'prioritized':
+            self._push_predecessors(q, *updated, discount)
+
+    # ----------------------------------------------------------------------
+    # Planning updates
+
+    def _update(self, q, agents, pairs, learning_rate, discount, tracker):
+        # One update per distinct (agent, pair)
+        codes = np.unique(agents.astype(np.int64) * self.next_state.shape[1] + pairs)
+        agents, pairs = np.divmod(codes, self.next_state.shape[1])
+        states, actions = np.divmod(pairs, self.env.n_actions)
+
+        next_states = self.next_state[agents, pairs]
+        next_max = np.where(self.env.terminal[next_states], 0.0, np.max(q[agents, next_states, :], axis=1))
+        old_values = q[agents, states, actions]
+        td_errors = self.reward[agents, pairs] + per_agent(discount, agents) * next_max - old_values
+        new_values = old_values + per_agent(learning_rate, agents) * td_errors
+        q[agents, states, actions] = new_values
+        if tracker is not None:
+            tracker.update(agents, states, actions, old_values, new_values, q, batched=True)
+        self.planning_updates += len(agents)
+        return agents, states
+
+    # ----------------------------------------------------------------------
+    # Prioritized sweeping queue
+
+    def _push(self, agents, pairs, priorities):
+        """Merge (agents × k) candidate pairs into the queues, keeping the most urgent."""
+        priorities = np.where(priorities > self.threshold, priorities, 0.0).astype(np.float32)
+        merged_pairs = np.concatenate([self.queue_pair[agents], pairs.astype(np.int32)], axis=1)
+        merged = np.concatenate([self.queue_priority[agents], priorities], axis=1)
+        size = self.queue_pair.shape[1]
+        if merged.shape[1] > size:
+            keep = np.argpartition(-merged, size - 1, axis=1)[:, :size]
+            merged_pairs = np.take_along_axis(merged_pairs, keep, axis=1)
+            merged = np.take_along_axis(merged, keep, axis=1)
+        self.queue_pair[agents] = merged_pairs
+        self.queue_priority[agents] = merged
+
+    def _pop(self, agents):
+        """Take each agent's ``n_updates`` most urgent queued pairs."""
+        priorities = self.queue_priority[agents]
+        k = min(self.n_updates, priorities.shape[1])
+        top = np.argpartition(-priorities, k - 1, axis=1)[:, :k]
+        rows = np.arange(len(agents))[:, None]
+        valid = priorities[rows, top] > 0
+        pairs = self.queue_pair[agents[:, None], top][valid]
+        batch_agents = np.broadcast_to(agents[:, None], top.shape)[valid]
+        self.queue_priority[agents[:, None], top] = 0.0
+        return batch_agents, pairs
+
+    def _push_predecessors(self, q, agents, states, discount):
+        """Queue the seen pairs leading into freshly updated states, by their TD error."""
+        predecessors = self.env.predecessors[states]                  # updates × k
+        owners = np.broadcast_to(agents[:, None], predecessors.shape)
+        known = predecessors >= 0
+        known[known] = self.next_state[owners[known], predecessors[known]] >= 0
+        if not known.any():
+            return
+
+        owners, pairs = owners[known], predecessors[known]
+        pred_states, pred_actions = np.divmod(pairs, self.env.n_actions)
+        next_states = self.next_state[owners, pairs]
+        next_max = np.where(self.env.terminal[next_states], 0.0, np.max(q[owners, next_states, :], axis=1))
+        td = np.abs(self.reward[owners, pairs] + per_agent(discount, owners) * next_max
+                    - q[owners, pred_states, pred_actions])
+
+        # Regroup the candidates per agent (padded with priority 0)
+        order = np.argsort(owners, kind='stable')
+        owners, pairs, td = owners[order], pairs[order], td[order]
+        unique_agents, starts, counts = np.unique(owners, return_index=True, return_counts=True)
+        slots = np.arange(len(owners)) - np.repeat(starts, counts)
+        padded_pairs = np.zeros((len(unique_agents), counts.max()), dtype=np.int32)
+        padded_td = np.zeros((len(unique_agents), counts.max()), dtype=np.float32)
+        rows = np.repeat(np.arange(len(unique_agents)), counts)
+        padded_pairs[rows, slots] = pairs
+        padded_td[rows, slots] = td
+        self._push(unique_agents, padded_pairs, padded_td)
+
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+
+@dataclass(frozen=True)
+class ConvergenceTrace:
+    """Mean over agents of progress towards Q*, at regular episodes of one training run."""
+    mode: str
+    episodes: np.ndarray   # episode number of each sample
+    steps: np.ndarray      # real environment steps per agent so far
+    seconds: np.ndarray    # training wall-clock time so far (measurement excluded)
+    error: np.ndarray      # RMS error against Q*
+    agreement: np.ndarray  # share of states with an optimal greedy action
+    planning_updates: int
+
+
+def compare_planning(env, q_star, n_agents, n_episodes, learning_rate, discount, epsilon,
+                     n_updates=10, seed=0, modes=PLANNING_MODES, n_samples=50):
+    """
+    Train the same agents once per planning mode and trace their convergence.
+
+    Every mode starts from zero Q-tables and the same seed. Distances to Q*
+    are measured at up to ``n_samples`` evenly spaced episodes, outside
+    the timed region.
+
+    Returns:
+    --------
+    traces : dict
+        Mode -> ConvergenceTrace
+    """
+    every = max(1, n_episodes // n_samples)
+    traces = {}
+    for mode in modes:
+        q_tables = init_q_tables(env, n_agents)
+        planner = DynaPlanner(env, n_agents, mode, n_updates)
+        rng = np.random.default_rng(seed)
+        seconds = 0.0
+        samples = []
+
+        def measure(episode):
+            tracker = OptimalityTracker(q_star, q_tables)
+            samples.append((episode, planner.steps / n_agents, seconds,
+                            tracker.error.mean(), tracker.agreement.mean()))
+
+        measure(0)
+        for episode in range(1, n_episodes + 1):
+            start = time.perf_counter()
+            train_episode(env, q_tables, learning_rate, discount, epsilon, rng, planner=planner)
+            seconds += time.perf_counter() - start
+            if episode % every == 0 or episode == n_episodes:
+                measure(episode)
+
+        columns = [np.array(column) for column in zip(*samples)]
+        traces[mode] = ConvergenceTrace(mode, *columns, planning_updates=planner.planning_updates)
+    return traces
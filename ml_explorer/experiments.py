@@ -0,0 +1,474 @@
+"""
+Headless experiment runner: the dashboard's computations over a parameter grid.
+
+A spec (JSON, or YAML when PyYAML is installed) names one experiment,
+the parameters to sweep and the seeds to repeat every combination with::
+
+    name: kmeans-k
+    experiment: clustering
+    params:             # fixed for every run
+      n_samples: 5000
+    grid:               # every combination is run...
+      k: [2, 3, 4, 5, 6]
+    seeds: [0, 1, 2]    # ...once per seed
+
+Runs are spread over a process pool. Every finished run is appended to a
+JSON-lines progress file next to the output, so an interrupted sweep
+picks up where it stopped when the same command is run again. Once all
+runs are done, one row per run (parameters, seed, metrics and its wall
+time) is written to a Parquet file, or an Arrow/Feather file for a
+``.arrow`` or ``.feather`` output, with the spec stored in its metadata::
+
+    python -m ml_explorer.experiments kmeans-k.yaml
+    python -m ml_explorer.experiments spec.json --output results.arrow --workers 4
+
+The Experiment Results page opens these files and browses them without
+recomputing anything.
+"""
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR, lru_cached, store_validated
+
+EXPERIMENT_DIR = CACHE_DIR / 'experiments'
+UPLOAD_DIR = EXPERIMENT_DIR / 'uploads'
+RESULT_SUFFIXES = ('.parquet', '.arrow', '.feather')
+METADATA_KEY = b'ml_explorer'
+
+# Episodes averaged for the final reward of a Q-learning run
+FINAL_EPISODES = 10
+
+
+# ============================================================================
+# EXPERIMENTS
+# ============================================================================
+# Each takes the seed plus keyword parameters (their defaults match the
+# pages) and returns a flat dict of metrics: numbers, or 1D arrays for curves.
+
+def _classification(seed, dataset='iris', test_size=20, max_iter=200):
+    from ml_explorer.supervised import fit_classifier
+
+    result = fit_classifier(dataset, test_size=test_size / 100, random_state=seed, max_iter=max_iter)
+    return {'accuracy': result.accuracy, 'n_train': result.n_train, 'n_test': result.n_test}
+
+
+def _regression(seed, dataset='diabetes', test_size=20):
+    from ml_explorer.supervised import fit_regressor
+
+    result = fit_regressor(dataset, test_size=test_size / 100, random_state=seed)
+    return {'rmse': result.rmse, 'r2': result.r2, 'n_train': result.n_train, 'n_test': result.n_test}
+
+
+def _clustering(seed, n_samples=300, k=3):
+    from ml_explorer.clustering import fit_kmeans, score_kmeans
+
+    score = score_kmeans(n_samples, k, seed)
+    return {'inertia': fit_kmeans(n_samples, k, seed).inertia, 'silhouette': score.score,
+            'silhouette_low': score.ci_low, 'silhouette_high': score.ci_high}
+
+
+def _qlearning(seed, grid_size=None, wall_density=0.15, n_pits=0, n_goals=1, layout_seed=0,
+               n_agents=8, episodes=100, learning_rate=0.8, discount=0.95, epsilon=0.1,
+               planning='none', n_planning=10):
+    from ml_explorer.dyna import DynaPlanner
+    from ml_explorer.gridworld import GridWorld
+    from ml_explorer.planning import OptimalityTracker, value_iteration
+    from ml_explorer.qlearning import init_q_tables, train_episodes
+
+    # No grid size: the classic 5×5 world, as on the page
+    if grid_size is None:
+        env = GridWorld.classic()
+    else:
+        env = GridWorld.random(grid_size, grid_size, wall_density, n_pits, n_goals, layout_seed)
+    q_tables = init_q_tables(env, n_agents)
+    planner = DynaPlanner(env, n_agents, planning, n_planning)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    rewards = train_episodes(env, q_tables, episodes, learning_rate, discount, epsilon, rng, planner=planner)
+    train_seconds = time.perf_counter() - start
+
+    tracker = OptimalityTracker(value_iteration(env, discount), q_tables)
+    return {
+        'final_reward': float(rewards[-FINAL_EPISODES:].mean()),
+        'q_error': float(tracker.error.mean()),
+        'agreement': float(tracker.agreement.mean()),
+        'steps_per_agent': planner.steps / n_agents,
+        'planning_updates': planner.planning_updates,
+        'train_seconds': train_seconds,
+        'reward_curve': rewards.mean(axis=1).astype(np.float32),
+    }
+
+
+EXPERIMENTS = {
+    'classification': _classification,
+    'regression': _regression,
+    'clustering': _clustering,
+    'qlearning': _qlearning,
+}
+
+# Imported when a worker starts, so the first run's time is not mostly imports
+_WORKER_IMPORTS = {
+    'classification': ('sklearn.datasets', 'sklearn.linear_model', 'sklearn.model_selection'),
+    'regression': ('sklearn.datasets', 'sklearn.linear_model', 'sklearn.model_selection'),
+    'clustering': ('sklearn.cluster', 'sklearn.datasets', 'sklearn.metrics'),
+    'qlearning': (),
+}
+
+
+# ============================================================================
+# SPECS
+# ============================================================================
+
+@dataclass(frozen=True)
+class Run:
+    """One parameter combination and seed of a spec."""
+    run_id: str
+    params: dict
+    seed: int
+
+    @property
+    def label(self):
+        return ' '.join([f"{key}={value}" for key, value in self.params.items()] + [f"seed={self.seed}"])
+
+
+def load_spec(path):
+    """
+    Read and validate an experiment spec from a .json, .yaml or .yml file.
+
+    Raises:
+    -------
+    ValueError
+        If the spec names an unknown experiment or parameter
+    """
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML specs need PyYAML (pip install pyyaml); JSON specs work without it") from e
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    return validate_spec(spec, default_name=path.stem)
+
+
+def validate_spec(spec, default_name='experiment'):
+    """Fill in defaults and check a spec dict; returns a normalised copy."""
+    if not isinstance(spec, dict) or 'experiment' not in spec:
+        raise ValueError("A spec needs an 'experiment' entry")
+    experiment = spec['experiment']
+    if experiment not in EXPERIMENTS:
+        raise ValueError(f"Unknown experiment '{experiment}'; expected one of {list(EXPERIMENTS)}")
+
+    params = dict(spec.get('params') or {})
+    # A single value in the grid is a one-element axis
+    grid = {key: list(values) if isinstance(values, (list, tuple)) else [values]
+            for key, values in (spec.get('grid') or {}).items()}
+    seeds = spec.get('seeds', [0])
+    seeds = [int(seed) for seed in (seeds if isinstance(seeds, (list, tuple)) else [seeds])]
+
+    accepted = set(inspect.signature(EXPERIMENTS[experiment]).parameters) - {'seed'}
+    unknown = (set(params) | set(grid)) - accepted
+    if unknown:
+        raise ValueError(f"Unknown parameters for '{experiment}': {sorted(unknown)}; "
+                         f"expected some of {sorted(accepted)}")
+    if set(params) & set(grid):
+        raise ValueError(f"Parameters both fixed and swept: {sorted(set(params) & set(grid))}")
+    if not seeds or any(not values for values in grid.values()):
+        raise ValueError("Every grid axis and the seed list need at least one value")
+
+    return {'name': str(spec.get('name', default_name)), 'experiment': experiment,
+            'params': params, 'grid': grid, 'seeds': seeds}
+
+
+def expand(spec):
+    """Every run of a validated spec: grid combinations × seeds, in a stable order."""
+    axes = list(spec['grid'])
+    runs = []
+    for values in itertools.product(*spec['grid'].values()):
+        params = {**spec['params'], **dict(zip(axes, values))}
+        for seed in spec['seeds']:
+            # Identified by what it computes, so resuming survives edits to the spec
+            key = json.dumps([spec['experiment'], params, seed], sort_keys=True, default=str)
+            runs.append(Run(hashlib.sha1(key.encode()).hexdigest()[:16], params, seed))
+    return runs
+
+
+# ============================================================================
+# RUNNING
+# ============================================================================
+
+def _start_worker(experiment):
+    import importlib
+
+    for module in _WORKER_IMPORTS[experiment]:
+        importlib.import_module(module)
+
+
+def _execute(experiment, params, seed):
+    """Worker: one run, single-threaded BLAS so the pool does not oversubscribe."""
+    from threadpoolctl import threadpool_limits
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=1):
+        metrics = EXPERIMENTS[experiment](seed, **params)
+    metrics = {key: value.tolist() if isinstance(value, np.ndarray) else value
+               for key, value in metrics.items()}
+    return metrics, time.perf_counter() - start
+
+
+def progress_path(output):
+    """Progress file kept next to ``output`` while (and after) a spec runs."""
+    output = Path(output)
+    return output.with_name(output.name + '.progress.jsonl')
+
+
+def _read_progress(path):
+    done = {}
+    if path.exists():
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interruption
+                done[record['run_id']] = record
+    return done
+
+
+def run_spec(spec, output, max_workers=None, restart=False, progress=None):
+    """
+    Run every run of ``spec`` that has no result yet, then write ``output``.
+
+    Parameters:
+    -----------
+    spec : dict
+        Validated spec (see ``load_spec``)
+    output : str or Path
+        Results file (.parquet, .arrow or .feather)
+    max_workers : int, optional
+        Worker processes (default: all cores)
+    restart : bool
+        Ignore the progress of earlier, interrupted invocations
+    progress : callable, optional
+        Called as ``progress(done, total, run, seconds, error)`` after every run
+
+    Returns:
+    --------
+    failed : list of (Run, str)
+        Runs that raised, with the error; they are retried on the next invocation
+    """
+    output = Path(output)
+    if output.suffix not in RESULT_SUFFIXES:
+        raise ValueError(f"Unsupported results file type: {output.suffix}; expected one of {RESULT_SUFFIXES}")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    log = progress_path(output)
+    if restart and log.exists():
+        log.unlink()
+
+    runs = expand(spec)
+    done = _read_progress(log)
+    pending = [run for run in runs if run.run_id not in done]
+    failed = []
+    if pending:
+        # Spawned workers are safe to start from any process, threaded or not
+        context = multiprocessing.get_context('spawn')
+        with open(log, 'a') as f, ProcessPoolExecutor(
+                max_workers, mp_context=context, initializer=_start_worker,
+                initargs=(spec['experiment'],)) as pool:
+            futures = {pool.submit(_execute, spec['experiment'], run.params, run.seed): run
+                       for run in pending}
+            try:
+                for future in as_completed(futures):
+                    run = futures[future]
+                    try:
+                        metrics, seconds = future.result()
+                    except Exception as e:
+                        failed.append((run, f"{type(e).__name__}: {e}"))
+                        seconds, error = 0.0, failed[-1][1]
+                    else:
+                        error = None
+                        record = {'run_id': run.run_id, 'params': run.params, 'seed': run.seed,
+                                  'metrics': metrics, 'seconds': seconds}
+                        done[run.run_id] = record
+                        f.write(json.dumps(record, default=str) + '\n')
+                        f.flush()
+                    if progress is not None:
+                        progress(len(done) + len(failed), len(runs), run, seconds, error)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    write_results(spec, [done[run.run_id] for run in runs if run.run_id in done], output)
+    return failed
+
+
+def write_results(spec, records, output):
+    """Write run records as one table (atomically), with the spec in its metadata."""
+    import pandas as pd
+    import pyarrow as pa
+
+    parameters = list(dict.fromkeys(key for record in records for key in record['params']))
+    metrics = list(dict.fromkeys(key for record in records for key in record['metrics']))
+    frame = pd.DataFrame({
+        'run_id': [record['run_id'] for record in records],
+        **{key: [record['params'].get(key) for record in records] for key in parameters},
+        'seed': pd.array([record['seed'] for record in records], dtype='int64'),
+        **{key: [record['metrics'].get(key) for record in records] for key in metrics},
+        'seconds': pd.array([record['seconds'] for record in records], dtype='float64'),
+    })
+    metadata = {'spec': spec, 'parameters': parameters, 'metrics': metrics,
+                'created': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           METADATA_KEY: json.dumps(metadata, default=str).encode()})
+
+    output = Path(output)
+    tmp = output.with_name(output.name + '.tmp')
+    if output.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, tmp)
+    os.replace(tmp, output)
+    return output
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+@dataclass(frozen=True)
+class ExperimentResults:
+    """Rows of a results file, with the spec that produced them."""
+    spec: dict
+    parameters: tuple  # parameter columns, fixed and swept (seed not included)
+    metrics: tuple     # metric columns; curve metrics hold one array per row
+    created: str
+    frame: object      # pandas.DataFrame, one row per run
+
+    @property
+    def swept(self):
+        """Parameters that take more than one value."""
+        return tuple(p for p in self.parameters if self.frame[p].astype(str).nunique() > 1)
+
+    @property
+    def scalar_metrics(self):
+        return tuple(m for m in self.metrics if self.frame[m].map(np.ndim).max() == 0)
+
+    @property
+    def curve_metrics(self):
+        return tuple(m for m in self.metrics if m not in self.scalar_metrics)
+
+    def summary(self, metric, by, rows=None):
+        """
+        Mean, standard deviation and count of ``metric`` over seeds, per
+        combination of the ``by`` parameters (restricted to ``rows`` if given).
+        """
+        frame = self.frame if rows is None else self.frame[rows]
+        return (frame.groupby(list(by), dropna=False)[metric]
+                .agg(['mean', 'std', 'count']).reset_index())
+
+
+@lru_cached(maxsize=8)
+def _read_results(path, modified):
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    try:
+        table = pq.read_table(path) if path.suffix == '.parquet' else feather.read_table(path)
+    except Exception as e:
+        raise ValueError(f"{path.name} is not a readable Parquet or Arrow file") from e
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    if raw is None:
+        raise ValueError(f"{path.name} was not written by the experiment runner")
+    metadata = json.loads(raw)
+    return ExperimentResults(metadata['spec'], tuple(metadata['parameters']),
+                             tuple(metadata['metrics']), metadata['created'], table.to_pandas())
+
+
+def load_results(path):
+    """
+    Open a results file written by ``run_spec``; memoised until the file changes.
+
+    Returns:
+    --------
+    results : ExperimentResults
+    """
+    path = Path(path)
+    return _read_results(str(path), path.stat().st_mtime_ns)
+
+
+def save_upload(data, name):
+    """Store the bytes of an uploaded results file under ``UPLOAD_DIR`` and validate it."""
+    suffix = Path(name).suffix.lower()
+    if suffix not in RESULT_SUFFIXES:
+        raise ValueError(f"Unsupported results file type: {suffix}")
+    return store_validated(data, UPLOAD_DIR, name, suffix, load_results)
+
+
+def list_results(directory=EXPERIMENT_DIR):
+    """Results files in ``directory`` and its uploads, newest first."""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    files = [p for p in directory.rglob('*')
+             if p.suffix in RESULT_SUFFIXES and '.incoming' not in p.parts]
+    return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run an ML Explorer experiment spec without a browser")
+    parser.add_argument('spec', help="Experiment spec (.json, .yaml or .yml)")
+    parser.add_argument('--output', default=None,
+                        help="Results file, .parquet or .arrow (default: <cache>/experiments/<name>.parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--restart', action='store_true', help="Ignore the progress of earlier runs")
+    args = parser.parse_args(argv)
+
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError, ImportError) as e:
+        parser.error(str(e))
+    output = Path(args.output) if args.output else EXPERIMENT_DIR / f"{spec['name']}.parquet"
+
+    def report(done, total, run, seconds, error):
+        status = f"FAILED {error}" if error else f"{seconds:.2f}s"
+        print(f"[{done:>{len(str(total))}}/{total}] {run.label}  {status}", flush=True)
+
+    total = len(expand(spec))
+    print(f"{spec['name']}: {spec['experiment']}, {total} runs", flush=True)
+    try:
+        failed = run_spec(spec, output, args.workers, args.restart, progress=report)
+    except KeyboardInterrupt:
+        print(f"Interrupted; finished runs are kept in {progress_path(output)}, run again to resume")
+        return 130
+    print(f"Wrote {total - len(failed)} runs to {output}")
+    if failed:
+        print(f"{len(failed)} runs failed and will be retried on the next invocation")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
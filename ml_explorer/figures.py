@@ -0,0 +1,96 @@
+"""
+Cached Plotly figures.
+
+Pages would otherwise rebuild every figure on every rerun, even when
+nothing about the chart changed: traces, layout and Plotly's validation
+of both. A ``FigurePayload`` is a built figure, produced once:
+
+- pipeline stages declared with ``figure=True`` store the payload of the
+  figure they return, keyed like any other stage (their upstream stages
+  and style inputs);
+- ``cached_figure`` does the same for charts built outside a pipeline,
+  keyed by a hash of the data they show and their style options.
+
+Both live in size-bounded caches under the shared memory budget of
+``ml_explorer.cache``. ``overlay.show_figure`` draws a payload with
+``st.plotly_chart``, so an unchanged chart is not rebuilt. Streamlit
+still serialises it to JSON on every rerun; the performance overlay
+times that call.
+"""
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import LRUCache
+
+# Charts kept by ``cached_figure`` (payloads also count towards the memory budget)
+FIGURE_CACHE_SIZE = 64
+
+_figures = LRUCache(FIGURE_CACHE_SIZE, name='figures.cached_figure')
+
+
+@dataclass(frozen=True)
+class FigurePayload:
+    """A built Plotly figure, shared between sessions: draw it, never modify it."""
+    figure: object  # plotly.graph_objects.Figure
+
+
+def to_payload(fig):
+    """Wrap a built Plotly figure for a cache."""
+    return FigurePayload(fig)
+
+
+def _update(digest, part):
+    if isinstance(part, np.ndarray):
+        digest.update(f'{part.dtype.str}{part.shape}'.encode())
+        digest.update(np.ascontiguousarray(part).view(np.uint8).data if part.dtype != object
+                      else repr(part.tolist()).encode())
+    elif hasattr(part, 'columns') and hasattr(part, 'index'):  # pandas.DataFrame
+        import pandas as pd
+        digest.update(repr(list(part.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().data)
+    elif isinstance(part, (list, tuple)):
+        digest.update(f'{type(part).__name__}{len(part)}'.encode())
+        for item in part:
+            _update(digest, item)
+    else:
+        digest.update(repr(part).encode())
+
+
+def data_hash(*parts):
+    """
+    Digest of the data a chart shows.
+
+    Arrays are hashed by dtype, shape and bytes, DataFrames by columns and
+    per-row hashes, lists and tuples item by item and anything else by its
+    ``repr``.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+def cached_figure(name, build, data=(), **style):
+    """
+    Payload of a chart, built only when its data or style changed.
+
+    Parameters:
+    -----------
+    name : str
+        Identifies the chart
+    build : callable
+        Called without arguments to build the Plotly figure on a miss
+    data : tuple
+        Arrays, frames and values the figure is drawn from; they are hashed
+        with ``data_hash``
+    **style
+        Hashable options that change the figure's look (titles, axes, colors)
+
+    Returns:
+    --------
+    payload : FigurePayload
+    """
+    key = (name, data_hash(*data), tuple(sorted(style.items())))
+    return _figures.get_or_compute(key, lambda: to_payload(build()))
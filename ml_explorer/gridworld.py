@@ -0,0 +1,203 @@
+"""
+Grid World environments with precomputed transition and reward tables.
+
+A ``GridWorld`` turns a layout (size, walls, pits, goals) into dense
+``next_state`` and ``rewards`` arrays of shape (states × actions) once,
+when it is built. Stepping an agent is then a single array lookup, so
+the cost of a step does not depend on how complicated the layout is.
+States are numbered row by row: ``state = row * cols + col``.
+"""
+from collections import deque
+from functools import cached_property
+
+import numpy as np
+
+ACTIONS = np.array([(0, 1), (1, 0), (0, -1), (-1, 0)])  # right, down, left, up
+ACTION_NAMES = ['→', '↓', '←', '↑']
+
+MAX_GRID_SIZE = 200
+
+
+class GridWorld:
+    """
+    Rectangular grid with walls, pits and one or more goals.
+
+    Moving off the grid or into a wall leaves the agent where it is.
+    Entering a goal or a pit ends the episode.
+
+    Parameters:
+    -----------
+    rows, cols : int
+        Grid dimensions (at most MAX_GRID_SIZE each)
+    start : tuple
+        (row, col) where every episode begins
+    goals : list of tuple
+        Terminal cells worth ``goal_reward``; defaults to the bottom-right corner
+    walls : list of tuple
+        Cells the agent can never enter
+    pits : list of tuple
+        Terminal cells worth ``pit_reward``
+    goal_reward, pit_reward, step_reward : float
+        Reward for entering a goal, entering a pit, or any other move
+    max_steps : int, optional
+        Episode length limit; defaults to a value that grows with the grid
+    """
+
+    def __init__(self, rows, cols, start=(0, 0), goals=None, walls=(), pits=(),
+                 goal_reward=100, pit_reward=-100, step_reward=-1, max_steps=None):
+        if not (1 <= rows <= MAX_GRID_SIZE and 1 <= cols <= MAX_GRID_SIZE):
+            raise ValueError(f"Grid size must be between 1 and {MAX_GRID_SIZE} per side")
+
+        if goals is None:
+            goals = [(rows - 1, cols - 1)]
+
+        self.rows = rows
+        self.cols = cols
+        self.start = tuple(start)
+        self.goals = [tuple(g) for g in goals]
+        self.walls = [tuple(w) for w in walls]
+        self.pits = [tuple(p) for p in pits]
+        self.goal_reward = goal_reward
+        self.max_steps = max_steps or max(50, 4 * (rows + cols))
+
+        special = {self.start, *self.goals}
+        if special & set(self.walls) or special & set(self.pits):
+            raise ValueError("Start and goal cells cannot be walls or pits")
+
+        self.n_states = rows * cols
+        self.n_actions = len(ACTIONS)
+        self.start_state = self.state_index(*self.start)
+
+        self.is_wall = self._mask(self.walls)
+        self.is_goal = self._mask(self.goals)
+        self.is_pit = self._mask(self.pits)
+        self.terminal = self.is_goal | self.is_pit
+
+        self.next_state, self.rewards = self._build_tables(goal_reward, pit_reward, step_reward)
+
+    def state_index(self, row, col):
+        """Flat state number of a (row, col) cell."""
+        return row * self.cols + col
+
+    def _mask(self, cells):
+        mask = np.zeros(self.n_states, dtype=bool)
+        if cells:
+            cells = np.asarray(cells)
+            mask[cells[:, 0] * self.cols + cells[:, 1]] = True
+        return mask
+
+    def _build_tables(self, goal_reward, pit_reward, step_reward):
+        """Precompute next state and reward for every (state, action) pair."""
+        rows, cols = np.divmod(np.arange(self.n_states), self.cols)
+
+        new_rows = np.clip(rows[:, None] + ACTIONS[:, 0], 0, self.rows - 1)
+        new_cols = np.clip(cols[:, None] + ACTIONS[:, 1], 0, self.cols - 1)
+        next_state = new_rows * self.cols + new_cols
+
+        # Bumping into a wall means staying put
+        blocked = self.is_wall[next_state]
+        next_state = np.where(blocked, np.arange(self.n_states)[:, None], next_state)
+
+        rewards = np.full(next_state.shape, step_reward, dtype=np.float32)
+        rewards[self.is_goal[next_state]] = goal_reward
+        rewards[self.is_pit[next_state]] = pit_reward
+
+        return next_state.astype(np.int32), rewards
+
+    def step(self, states, actions):
+        """
+        Apply actions to a batch of states with two table lookups.
+
+        Returns:
+        --------
+        next_states, rewards, done : numpy.ndarray
+        """
+        next_states = self.next_state[states, actions]
+        return next_states, self.rewards[states, actions], self.terminal[next_states]
+
+    @cached_property
+    def predecessors(self):
+        """
+        State-action pairs leading into each state, for backward sweeps.
+
+        Returns:
+        --------
+        pairs : numpy.ndarray
+            int32 array (states × k) of ``state * n_actions + action`` codes,
+            padded with -1; only moves out of non-terminal, non-wall cells
+        """
+        pairs = np.arange(self.n_states * self.n_actions)
+        sources = pairs // self.n_actions
+        pairs = pairs[~(self.terminal | self.is_wall)[sources]]
+        targets = self.next_state.ravel()[pairs]
+
+        order = np.argsort(targets, kind='stable')
+        pairs, targets = pairs[order], targets[order]
+        counts = np.bincount(targets, minlength=self.n_states)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        slots = np.arange(len(pairs)) - starts[targets]
+
+        table = np.full((self.n_states, max(int(counts.max(initial=0)), 1)), -1, dtype=np.int32)
+        table[targets, slots] = pairs
+        return table
+
+    def reachable(self):
+        """Whether at least one goal can be reached from the start."""
+        seen = np.zeros(self.n_states, dtype=bool)
+        seen[self.start_state] = True
+        queue = deque([self.start_state])
+        while queue:
+            state = queue.popleft()
+            if self.is_goal[state]:
+                return True
+            if self.terminal[state]:
+                continue
+            for nxt in self.next_state[state]:
+                if not seen[nxt]:
+                    seen[nxt] = True
+                    queue.append(nxt)
+        return False
+
+    @classmethod
+    def classic(cls):
+        """The original 5×5 world: start top-left, goal bottom-right, no obstacles."""
+        return cls(5, 5, start=(0, 0), goals=[(4, 4)], max_steps=50)
+
+    @classmethod
+    def random(cls, rows, cols, wall_density=0.15, n_pits=0, n_goals=1, seed=0,
+               max_tries=20):
+        """
+        Generate a random layout where a goal is reachable from the start.
+
+        The start is the top-left cell and the first goal the bottom-right
+        cell; extra goals, pits and walls are scattered over the remaining
+        cells.
+        """
+        rng = np.random.default_rng(seed)
+        start = (0, 0)
+        corner = (rows - 1, cols - 1)
+        free = np.setdiff1d(np.arange(rows * cols), [0, corner[0] * cols + corner[1]])
+
+        def to_cells(ids):
+            return [tuple(divmod(int(i), cols)) for i in ids]
+
+        for _ in range(max_tries):
+            order = rng.permutation(free)
+            n_extra_goals = min(max(n_goals - 1, 0), len(order))
+            n_pits_used = min(n_pits, len(order) - n_extra_goals)
+            n_walls = int(wall_density * len(order))
+            n_walls = min(n_walls, len(order) - n_extra_goals - n_pits_used)
+
+            goal_ids = order[:n_extra_goals]
+            pit_ids = order[n_extra_goals:n_extra_goals + n_pits_used]
+            wall_ids = order[n_extra_goals + n_pits_used:n_extra_goals + n_pits_used + n_walls]
+
+            world = cls(rows, cols, start=start,
+                        goals=[corner] + to_cells(goal_ids),
+                        walls=to_cells(wall_ids),
+                        pits=to_cells(pit_ids))
+            if world.reachable():
+                return world
+
+        raise ValueError("Could not generate a layout with a reachable goal; "
+                         "try fewer walls or pits")
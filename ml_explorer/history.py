@@ -0,0 +1,139 @@
+"""
+Compact, array-backed storage for Q-learning reward history.
+
+``RewardHistory`` keeps every episode's per-agent rewards in one
+growable float32 block and maintains the per-episode summary curves
+(mean, percentile band, moving average) as episodes are appended, so
+drawing the learning curve never has to revisit the full history.
+"""
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+
+
+class RewardHistory:
+    """
+    Growable float32 history of episode rewards for a batch of agents.
+
+    Storage doubles when full, so appending is amortised O(1) per
+    episode. Summary curves are computed only for the newly appended
+    episodes.
+
+    Parameters:
+    -----------
+    n_agents : int
+        Number of agents whose rewards are recorded per episode
+    window : int
+        Length of the moving average over the mean reward
+    lower, upper : float
+        Percentiles bounding the band shown around the mean
+    """
+
+    def __init__(self, n_agents, window=10, lower=10, upper=90, capacity=INITIAL_CAPACITY):
+        self.n_agents = n_agents
+        self.window = window
+        self.percentiles = (lower, upper)
+        self._size = 0
+        self._rewards = np.empty((capacity, n_agents), dtype=np.float32)
+        self._summary = np.empty((capacity, 4), dtype=np.float32)  # mean, low, high, moving avg
+
+    @classmethod
+    def from_arrays(cls, rewards, summary, window=10, lower=10, upper=90):
+        """
+        Wrap stored rewards and summary curves without recomputing them.
+
+        The arrays (e.g. read-only memory maps of a checkpoint) are used as
+        they are until the next ``extend`` grows the history into a copy.
+
+        Parameters:
+        -----------
+        rewards : numpy.ndarray
+            float32 episode rewards (episodes × agents)
+        summary : numpy.ndarray
+            float32 mean, low, high and moving average (episodes × 4)
+        """
+        history = cls(rewards.shape[1], window, lower, upper)
+        if len(rewards):
+            history._rewards, history._summary = rewards, summary
+            history._size = len(rewards)
+        return history
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Bytes held by the backing arrays (including spare capacity)."""
+        return self._rewards.nbytes + self._summary.nbytes
+
+    @property
+    def rewards(self):
+        """Episode rewards (episodes × agents), a view without spare capacity."""
+        return self._rewards[:self._size]
+
+    @property
+    def summary(self):
+        """Mean, low, high and moving average (episodes × 4), as ``from_arrays`` takes them."""
+        return self._summary[:self._size]
+
+    @property
+    def mean(self):
+        return self._summary[:self._size, 0]
+
+    @property
+    def low(self):
+        return self._summary[:self._size, 1]
+
+    @property
+    def high(self):
+        return self._summary[:self._size, 2]
+
+    @property
+    def moving_average(self):
+        """Moving average of the mean reward; NaN until a full window exists."""
+        return self._summary[:self._size, 3]
+
+    def _reserve(self, size):
+        capacity = len(self._rewards)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._rewards = np.resize(self._rewards, (capacity, self.n_agents))
+        self._summary = np.resize(self._summary, (capacity, 4))
+
+    def extend(self, rewards):
+        """
+        Append a block of episodes.
+
+        Parameters:
+        -----------
+        rewards : array-like
+            Episode rewards (episodes × agents)
+        """
+        rewards = np.asarray(rewards, dtype=np.float32).reshape(-1, self.n_agents)
+        n_new = len(rewards)
+        if n_new == 0:
+            return
+
+        start, end = self._size, self._size + n_new
+        self._reserve(end)
+        self._rewards[start:end] = rewards
+
+        summary = self._summary[start:end]
+        summary[:, 0] = rewards.mean(axis=1)
+        if self.n_agents > 1:
+            summary[:, 1:3] = np.percentile(rewards, self.percentiles, axis=1).T
+        else:
+            summary[:, 1] = summary[:, 2] = rewards[:, 0]
+
+        # Moving average over the previous window-1 means plus the new block
+        w = self.window
+        tail_start = max(0, start - (w - 1))
+        means = self._summary[tail_start:end, 0].astype(np.float64)
+        summary[:, 3] = np.nan
+        if len(means) >= w:
+            sums = np.convolve(means, np.ones(w), mode='valid') / w
+            summary[n_new - len(sums):, 3] = sums
+
+        self._size = end
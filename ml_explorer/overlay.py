@@ -0,0 +1,134 @@
+"""
+Streamlit side of the performance overlay.
+
+This is the only module in the package that imports Streamlit. Pages call
+``start_profiling`` right after ``st.set_page_config`` and
+``finish_profiling`` at the end. The overlay is on when
+``ML_EXPLORER_PROFILE=1`` is set or the sidebar toggle is switched on. The
+toggle's state is kept per session, so it stays on across pages.
+
+Every run also records the session's footprint (``st.session_state``), and
+the overlay lists it next to the shared caches' memory use.
+
+``show_figure`` draws a figure or a cached ``FigurePayload`` without
+rebuilding it, and times the call when the overlay is on.
+"""
+from contextlib import nullcontext
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from ml_explorer.cache import MEMORY_BUDGET_MB, cache_stats, record_session, session_footprints
+from ml_explorer.figures import FigurePayload
+from ml_explorer.profiling import ENABLED, Profiler
+
+
+def start_profiling(page):
+    """Show the sidebar toggle and return this run's ``Profiler``."""
+    enabled = ENABLED or st.sidebar.toggle(
+        "⏱️ Performance overlay",
+        key='profile_enabled',
+        help="Time every section of the page and log the results"
+    )
+    ctx = get_script_run_ctx()
+    return Profiler(page, enabled=enabled, session=ctx.session_id if ctx else None)
+
+
+def finish_profiling(profiler):
+    """Record the session's footprint; render the per-section breakdown and append the run to the log."""
+    if profiler.session is not None:
+        record_session(profiler.session, profiler.page, st.session_state)
+    if not profiler.enabled:
+        return
+    profiler.close()
+    profiler.write_log()
+
+    import pandas as pd
+    frame = pd.DataFrame([vars(r) for r in profiler.records])
+    with st.expander(f"⏱️ Performance: {profiler.total_seconds * 1000:.0f} ms this run"):
+        if frame.empty:
+            st.caption("No instrumented sections ran.")
+        else:
+            frame['ms'] = frame.pop('seconds') * 1000
+            frame['payload_kb'] = pd.to_numeric(frame.pop('payload_bytes')) / 1000
+            st.dataframe(
+                frame[['name', 'ms', 'peak_mb', 'payload_kb', 'cached']],
+                hide_index=True,
+                column_config={
+                    'name': 'Section',
+                    'ms': st.column_config.NumberColumn('Time (ms)', format='%.1f'),
+                    'peak_mb': st.column_config.NumberColumn(
+                        'Peak memory (MB, approx.)' if profiler.concurrent else 'Peak memory (MB)',
+                        format='%.2f'
+                    ),
+                    'payload_kb': st.column_config.NumberColumn('Payload (KB)', format='%.1f'),
+                    'cached': 'Cached',
+                }
+            )
+            st.caption(
+                f"Sections cover {frame['ms'].sum():.0f} ms; the rest is Streamlit rendering. "
+                f"Peak memory counts Python and NumPy allocations, and is traced only while a "
+                f"profiled run is active."
+                + (" Another session was profiled at the same time, so peaks include its "
+                   "allocations and are approximate." if profiler.concurrent else "")
+            )
+        render_memory(profiler.session)
+
+
+def render_memory(session=None):
+    """Tables of the shared caches' memory use and of every recent session's own state."""
+    import pandas as pd
+
+    stats = pd.DataFrame([vars(s) | {'hit_rate': s.hit_rate} for s in cache_stats() if s.entries or s.hits])
+    total_mb = stats['nbytes'].sum() / 2**20 if not stats.empty else 0.0
+    st.markdown(f"**Shared caches:** {total_mb:.1f} of {MEMORY_BUDGET_MB:.0f} MB")
+    if not stats.empty:
+        stats['mb'] = stats.pop('nbytes') / 2**20
+        st.dataframe(
+            stats[['name', 'entries', 'mb', 'hit_rate', 'hits', 'misses', 'evictions']],
+            hide_index=True,
+            column_config={
+                'name': 'Cache',
+                'entries': 'Entries',
+                'mb': st.column_config.NumberColumn('Size (MB)', format='%.2f'),
+                'hit_rate': st.column_config.NumberColumn('Hit rate', format='percent'),
+                'hits': 'Hits',
+                'misses': 'Misses',
+                'evictions': 'Evictions',
+            }
+        )
+
+    footprints = session_footprints()
+    st.markdown(f"**Sessions:** {len(footprints)} recently active")
+    if footprints:
+        sessions = pd.DataFrame([{
+            'session': ('▶ ' if f.session == session else '') + f.session[:8],
+            'page': f.page,
+            'mb': f.nbytes / 2**20,
+            'largest': ', '.join(key for key, _ in sorted(f.items.items(), key=lambda kv: -kv[1])[:3]),
+            'last_seen': pd.Timestamp(f.last_seen, unit='s'),
+        } for f in footprints])
+        st.dataframe(
+            sessions,
+            hide_index=True,
+            column_config={
+                'session': 'Session',
+                'page': 'Last page',
+                'mb': st.column_config.NumberColumn('State (MB)', format='%.2f'),
+                'largest': 'Largest keys',
+                'last_seen': st.column_config.DatetimeColumn('Last seen (UTC)', format='HH:mm:ss'),
+            }
+        )
+
+
+def show_figure(fig, profiler=None, name=None, config=None, key=None):
+    """
+    ``st.plotly_chart`` for a Plotly figure or a ``FigurePayload``, full container width.
+
+    Streamlit serialises the figure in every call, cached or not; with a
+    ``profiler`` the call is timed as chart ``name``.
+    """
+    if isinstance(fig, FigurePayload):
+        fig = fig.figure
+    with profiler.chart(name, fig) if profiler is not None else nullcontext():
+        return st.plotly_chart(fig, width='stretch', config=config, key=key)
@@ -0,0 +1,104 @@
+"""
+Thread pools that fit several models at once.
+
+scikit-learn spends its time in native code (BLAS, OpenMP) that releases
+the GIL, so a pool of Python threads, one per core, fits models in
+parallel. That native code runs its own threads too, by default one per
+core, so each fit gets a budget instead: ``cores // pool threads`` native
+threads, and pool threads × native threads stays at the number of cores.
+
+OpenMP limits belong to the thread that sets them, so each pool thread
+caps its own fits. BLAS limits are process-wide: they are lowered while
+any ``fit_map`` runs, to the smallest budget of the maps running (so maps
+of several Streamlit sessions do not oversubscribe the cores either), and
+restored when the last one finishes.
+"""
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+_blas_lock = threading.Lock()
+_blas_budgets = Counter()  # budget -> fit_map calls running with it
+_blas_original = None      # limiter that restores the limits found before the first one
+
+
+def native_threads():
+    """
+    Most threads any loaded BLAS / OpenMP library uses per call (1 if none reports).
+
+    Not cached: libraries such as scikit-learn's OpenMP runtime load lazily.
+    """
+    from threadpoolctl import threadpool_info
+
+    return max((info['num_threads'] for info in threadpool_info()), default=1)
+
+
+def pool_size(n_tasks, max_workers=None):
+    """Threads for a pool running ``n_tasks`` fits: ``max_workers`` if given, else one per task up to the cores."""
+    if max_workers:
+        return max_workers
+    return max(1, min(n_tasks, os.cpu_count() or 1))
+
+
+def thread_budget(workers):
+    """Native threads each of ``workers`` concurrent fits may use without oversubscribing the cores."""
+    return max(1, min(native_threads(), (os.cpu_count() or 1) // workers))
+
+
+@contextmanager
+def _blas_limit(budget):
+    global _blas_original
+    from threadpoolctl import threadpool_limits
+
+    with _blas_lock:
+        if _blas_budgets:
+            threadpool_limits(limits=min(budget, *_blas_budgets), user_api='blas')
+        else:
+            _blas_original = threadpool_limits(limits=budget, user_api='blas')
+        _blas_budgets[budget] += 1
+    try:
+        yield
+    finally:
+        with _blas_lock:
+            _blas_budgets[budget] -= 1
+            if not _blas_budgets[budget]:
+                del _blas_budgets[budget]
+            if _blas_budgets:
+                threadpool_limits(limits=min(_blas_budgets), user_api='blas')
+            else:
+                _blas_original.restore_original_limits()
+                _blas_original = None
+
+
+def fit_map(fn, items, max_workers=None):
+    """
+    ``[fn(item) for item in items]``, in parallel on a thread pool.
+
+    Parameters:
+    -----------
+    fn : callable
+        Fits one model; spends its time in native code
+    items : iterable
+        Arguments of ``fn``, one per fit
+    max_workers : int, optional
+        Pool threads (default: ``pool_size``)
+
+    Returns:
+    --------
+    results : list
+        ``fn``'s results, in the order of ``items``
+    """
+    from threadpoolctl import threadpool_limits
+
+    items = list(items)
+    workers = pool_size(len(items), max_workers)
+    budget = thread_budget(workers)
+
+    def fit(item):
+        with threadpool_limits(limits=budget, user_api='openmp'):
+            return fn(item)
+
+    with _blas_limit(budget), ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(fit, items))
@@ -0,0 +1,173 @@
+"""
+Dependency-aware recomputation for page scripts.
+
+A ``Pipeline`` is a list of named stages (data → fit → metrics →
+projection → figure). Each stage declares the page parameters it reads
+and the stages it consumes, and is memoised on exactly those: the cache
+key of a stage is its own inputs plus the keys of its upstream stages.
+When a rerun changes one parameter, only the stages that depend on it
+(directly or through an upstream stage) are recomputed.
+
+Stages declared with ``figure=True`` return a Plotly figure and store it
+as a ``FigurePayload``, so an unchanged chart is not rebuilt on later runs.
+
+Stage caches are registered by ``(pipeline name, stage name)`` at module
+level, so a page can re-declare its pipeline on every rerun and still
+hit the results of previous runs and of other sessions. They count
+towards the shared memory budget of ``ml_explorer.cache``.
+
+    pipeline = Pipeline('unsupervised')
+
+    @pipeline.stage(inputs=('n_samples',))
+    def data(n_samples):
+        ...
+
+    @pipeline.stage(inputs=('n_clusters',), after=('data',))
+    def fit(data, n_clusters):
+        ...
+
+    run = pipeline.run(n_samples=300, n_clusters=3)
+    run['fit'], run.computed, run.reused
+"""
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+from ml_explorer.cache import LRUCache
+from ml_explorer.figures import to_payload
+
+_stage_caches = {}
+
+
+def _stage_cache(pipeline_name, stage_name, maxsize):
+    key = (pipeline_name, stage_name)
+    if key not in _stage_caches:
+        _stage_caches[key] = LRUCache(maxsize, name=f'pipeline.{pipeline_name}.{stage_name}')
+    return _stage_caches[key]
+
+
+@dataclass
+class Stage:
+    """One memoised step of a pipeline."""
+    name: str
+    fn: object
+    inputs: tuple = ()
+    after: tuple = ()
+    uses: tuple = ()
+    cache: LRUCache = None
+    figure: bool = False
+
+
+@dataclass
+class PipelineRun:
+    """Results of one ``Pipeline.run`` and which stages were recomputed."""
+    results: dict = field(default_factory=dict)
+    computed: list = field(default_factory=list)
+    reused: list = field(default_factory=list)
+    seconds: dict = field(default_factory=dict)
+
+    def __getitem__(self, stage_name):
+        return self.results[stage_name]
+
+    def __contains__(self, stage_name):
+        return stage_name in self.results
+
+
+class Pipeline:
+    """
+    Named set of memoised stages.
+
+    Parameters:
+    -----------
+    name : str
+        Identifies the pipeline's stage caches across reruns
+    maxsize : int
+        Entries kept per stage cache
+    """
+
+    def __init__(self, name, maxsize=32):
+        self.name = name
+        self.maxsize = maxsize
+        self.stages = {}
+
+    def stage(self, inputs=(), after=(), uses=(), name=None, figure=False):
+        """
+        Decorator registering a stage.
+
+        Parameters:
+        -----------
+        inputs : tuple of str
+            Run parameters the stage depends on; they form its cache key
+            and are passed as keyword arguments (must be hashable)
+        after : tuple of str
+            Upstream stages; their results are passed as keyword arguments
+            named after the stage
+        uses : tuple of str
+            Run parameters passed to the stage but left out of the key,
+            for unhashable objects whose version is already one of ``inputs``
+        name : str, optional
+            Stage name, defaults to the function name
+        figure : bool
+            The stage returns a Plotly figure; its result is the figure's
+            ``FigurePayload`` instead
+        """
+        def decorator(fn):
+            stage_name = name or fn.__name__
+            missing = [dep for dep in after if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage_name}' declared before its upstream stages {missing}")
+            self.stages[stage_name] = Stage(
+                stage_name, fn, tuple(inputs), tuple(after), tuple(uses),
+                _stage_cache(self.name, stage_name, self.maxsize), figure,
+            )
+            return fn
+        return decorator
+
+    def run(self, targets=None, profiler=None, **params):
+        """
+        Compute the requested stages (all by default) and their upstream stages.
+
+        If a ``Profiler`` is given, every recomputed stage is timed as a
+        section of it and every reused stage is recorded as a cache hit.
+
+        Returns:
+        --------
+        run : PipelineRun
+        """
+        targets = list(self.stages) if targets is None else list(targets)
+        run = PipelineRun()
+        keys = {}
+
+        def evaluate(stage_name):
+            if stage_name in keys:
+                return
+            stage = self.stages[stage_name]
+            for dep in stage.after:
+                evaluate(dep)
+
+            key = (tuple((p, params[p]) for p in stage.inputs)
+                   + tuple(keys[dep] for dep in stage.after))
+            keys[stage_name] = (stage_name, key)
+
+            computed = []
+
+            def compute():
+                start = time.perf_counter()
+                kwargs = {p: params[p] for p in stage.inputs + stage.uses}
+                kwargs.update({dep: run.results[dep] for dep in stage.after})
+                with profiler.section(stage_name) if profiler is not None else nullcontext():
+                    value = stage.fn(**kwargs)
+                    if stage.figure:
+                        value = to_payload(value)
+                run.seconds[stage_name] = time.perf_counter() - start
+                computed.append(True)
+                return value
+
+            run.results[stage_name] = stage.cache.get_or_compute(key, compute)
+            (run.computed if computed else run.reused).append(stage_name)
+            if not computed and profiler is not None:
+                profiler.hit(stage_name)
+
+        for target in targets:
+            evaluate(target)
+        return run
@@ -0,0 +1,193 @@
+"""
+Exact solution of a Grid World, and how far learned agents are from it.
+
+``value_iteration`` computes the optimal Q-function Q* with Bellman
+backups applied to the whole (states × actions) table at once, using the
+environment's precomputed transition and reward tables. States that
+cannot be reached from the start are left out (NaN): the agents never
+see them, and with γ = 1 their values would not converge.
+
+``OptimalityTracker`` measures a batch of learning agents against Q*
+during training. It starts with one full pass over the Q-tensor, then
+follows the updates ``train_episode`` reports, so each step costs time
+proportional to the number of active agents rather than the grid size.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import lru_cached
+
+
+@dataclass(frozen=True)
+class QStar:
+    """Optimal Q-function of one environment and discount."""
+    q: np.ndarray         # states × actions, NaN at unreachable states
+    discount: float
+    iterations: int
+    converged: bool
+    counted: np.ndarray   # states the agents can be compared on (reachable, not terminal)
+
+    @property
+    def values(self):
+        """Optimal state values (states,), NaN where Q* is undefined."""
+        with np.errstate(invalid='ignore'):
+            return np.max(self.q, axis=1)
+
+    @property
+    def optimal_actions(self):
+        """Boolean (states × actions), True for every action that is optimal (ties allowed)."""
+        with np.errstate(invalid='ignore'):
+            return self.q >= np.max(self.q, axis=1, keepdims=True) - 1e-6
+
+
+def reachable_states(env):
+    """
+    States the agent can reach from the start.
+
+    Breadth-first search done one frontier at a time with array lookups
+    in the transition table; terminal states are reached but not left.
+
+    Returns:
+    --------
+    mask : numpy.ndarray
+        Boolean array (states,)
+    """
+    seen = np.zeros(env.n_states, dtype=bool)
+    seen[env.start_state] = True
+    frontier = np.array([env.start_state])
+    while frontier.size:
+        frontier = frontier[~env.terminal[frontier]]
+        successors = np.unique(env.next_state[frontier])
+        frontier = successors[~seen[successors]]
+        seen[frontier] = True
+    return seen
+
+
+@lru_cached(maxsize=16)
+def value_iteration(env, discount, tol=1e-6, max_iter=None):
+    """
+    Optimal Q-function by synchronous, fully vectorized Bellman backups.
+
+    Each iteration applies
+    ``Q(s, a) = r(s, a) + γ · max_a' Q(s', a')`` (no future value when
+    ``s'`` is terminal) to every state-action pair at once. Results are
+    memoised per environment object and discount.
+
+    Parameters:
+    -----------
+    env : GridWorld
+        Environment providing the transition and reward tables
+    discount : float
+        Discount factor γ (0-1)
+    tol : float
+        Stop once no reachable Q-value changes by more than this
+    max_iter : int, optional
+        Iteration limit; defaults to twice the number of states, enough for
+        the value of the farthest cell to propagate back along any path
+
+    Returns:
+    --------
+    q_star : QStar
+    """
+    max_iter = max_iter or 2 * env.n_states + 10
+    reachable = reachable_states(env)
+
+    # Successors of reachable states are reachable, so iterate on those alone,
+    # renumbered 0..n-1. Tables are laid out actions × states: NumPy reduces
+    # over a short leading axis far faster than over a short trailing one.
+    states = np.flatnonzero(reachable)
+    renumber = np.zeros(env.n_states, dtype=np.intp)
+    renumber[states] = np.arange(len(states))
+    next_state = np.ascontiguousarray(renumber[env.next_state[states]].T)
+    rewards = np.ascontiguousarray(env.rewards[states].T, dtype=np.float64)
+    # γ where the episode goes on, 0 after entering a terminal state
+    continues = np.ascontiguousarray(discount * ~env.terminal[env.next_state[states]].T)
+
+    q_reachable = np.zeros((env.n_actions, len(states)))
+    converged = False
+    for iteration in range(1, max_iter + 1):
+        new_q = rewards + continues * np.max(q_reachable, axis=0)[next_state]
+        delta = np.max(np.abs(new_q - q_reachable))
+        q_reachable = new_q
+        if delta <= tol:
+            converged = True
+            break
+
+    q = np.full((env.n_states, env.n_actions), np.nan)
+    q[states] = q_reachable.T
+    q.setflags(write=False)
+    counted = reachable & ~env.terminal
+    counted.setflags(write=False)
+    return QStar(q, float(discount), iteration, converged, counted)
+
+
+class OptimalityTracker:
+    """
+    Running distance between a batch of Q-tables and Q*.
+
+    Tracks, per agent, the root-mean-square error of Q against Q* and the
+    fraction of states whose greedy action is optimal, both over the
+    states in ``q_star.counted``. Pass it to ``train_episode`` so it sees
+    every update.
+
+    Parameters:
+    -----------
+    q_star : QStar
+        Optimal Q-function to compare against
+    q_tables : numpy.ndarray
+        Q-tensor (agents × rows × cols × actions) the agents will update
+    """
+
+    def __init__(self, q_star, q_tables):
+        n_agents = q_tables.shape[0]
+        q = q_tables.reshape(n_agents, -1, q_tables.shape[-1])
+        self.counted = q_star.counted
+        self.n_counted = max(int(self.counted.sum()), 1)
+        self._target = np.nan_to_num(q_star.q)  # counted states are never NaN
+        self._optimal = q_star.optimal_actions & self.counted[:, None]
+
+        # One full pass; afterwards only updated entries are revisited
+        error = (q - self._target) ** 2
+        self._sse = np.einsum('nsa,s->n', error, self.counted.astype(np.float64))
+        greedy = np.argmax(q, axis=2)
+        self._greedy_ok = self._optimal[np.arange(q.shape[1]), greedy]  # agents × states
+        self._agree = self._greedy_ok.sum(axis=1).astype(np.int64)
+
+    def update(self, agents, states, actions, old_values, new_values, q, batched=False):
+        """
+        Account for one step of updates ``q[agents, states, actions]: old → new``.
+
+        ``q`` is the (agents × states × actions) view after the update.
+        Updated states are never terminal and always reachable, so they are
+        always counted. A real step updates each agent once; pass
+        ``batched=True`` for planning batches, where an agent (and a state)
+        may appear several times but each (agent, state, action) only once.
+        """
+        target = self._target[states, actions]
+        change = (new_values - target) ** 2 - (old_values - target) ** 2
+        if not batched:
+            self._sse[agents] += change
+        else:
+            np.add.at(self._sse, agents, change)
+            # The greedy action of a state changes once, however many of its actions moved
+            _, first = np.unique(agents * q.shape[1] + states, return_index=True)
+            agents, states = agents[first], states[first]
+
+        ok = self._optimal[states, np.argmax(q[agents, states, :], axis=1)]
+        delta = ok.astype(np.int64) - self._greedy_ok[agents, states]
+        if not batched:
+            self._agree[agents] += delta
+        else:
+            np.add.at(self._agree, agents, delta)
+        self._greedy_ok[agents, states] = ok
+
+    @property
+    def error(self):
+        """RMS error of Q against Q* per agent."""
+        return np.sqrt(np.maximum(self._sse, 0.0) / (self.n_counted * self._target.shape[1]))
+
+    @property
+    def agreement(self):
+        """Fraction of counted states where each agent's greedy action is optimal."""
+        return self._agree / self.n_counted
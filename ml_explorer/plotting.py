@@ -0,0 +1,286 @@
+"""
+Scatter plots that stay responsive as the number of points grows.
+
+Below ``WEBGL_THRESHOLD`` points, plots use regular SVG traces. Up to
+``DENSITY_THRESHOLD`` they switch to WebGL (``Scattergl``). Above that,
+sending every point is the bottleneck, so the points are binned on the
+server into a 2D density heatmap with the per-cluster centroids drawn on
+top. Hover text always comes from plotly templates over the trace data
+(``%{x}``, ``%{customdata}``) instead of a Python string per point.
+
+The other figure builders the pages share live here too, so the
+benchmarks time exactly what the pages render.
+
+``plotly.express`` (which imports pandas) is only imported by the
+builders that use it.
+"""
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+WEBGL_THRESHOLD = 1_000
+DENSITY_THRESHOLD = 50_000
+DENSITY_BINS = 150
+
+
+def render_mode(n_points):
+    """'svg', 'webgl' or 'density' depending on how many points will be drawn."""
+    if n_points > DENSITY_THRESHOLD:
+        return 'density'
+    if n_points > WEBGL_THRESHOLD:
+        return 'webgl'
+    return 'svg'
+
+
+def _density_heatmap(x, y, colorscale='Blues'):
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=DENSITY_BINS)
+    counts = counts.T.astype(np.int32)  # heatmap rows are y
+    # Plotly ships arrays as typed binary, so 32-bit values halve the payload
+    log_counts = np.log10(np.maximum(counts, 1)).astype(np.float32)
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts > 0, log_counts, np.nan),
+        customdata=counts,
+        colorscale=colorscale,
+        colorbar=dict(title='log₁₀ Points'),
+        hovertemplate='%{customdata:.0f} points<extra></extra>',
+        name='Density'
+    )
+
+
+def cluster_scatter(x, y, labels, centers=None, title=None, x_title='x', y_title='y',
+                    label_title='Cluster', colors=qualitative.Set3, mode=None):
+    """
+    Scatter plot of 2D points colored by label, or a density map when huge.
+
+    Parameters:
+    -----------
+    x, y : numpy.ndarray
+        Point coordinates
+    labels : numpy.ndarray
+        Group of every point (one trace or centroid per group)
+    centers : numpy.ndarray, optional
+        (groups × 2) centroid coordinates to overlay; in density mode the
+        mean of each group's points is used when not given
+    title, x_title, y_title, label_title : str
+        Figure, axis and legend titles
+    colors : list
+        Color per group, cycled
+    mode : str, optional
+        Force 'svg', 'webgl' or 'density' instead of choosing by size
+
+    Returns:
+    --------
+    fig : plotly.graph_objects.Figure
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    groups, codes = np.unique(labels, return_inverse=True)
+    mode = mode or render_mode(len(x))
+    fig = go.Figure()
+
+    if mode == 'density':
+        fig.add_trace(_density_heatmap(x, y))
+        if centers is None:
+            counts = np.bincount(codes, minlength=len(groups))
+            centers = np.column_stack([
+                np.bincount(codes, weights=x, minlength=len(groups)) / counts,
+                np.bincount(codes, weights=y, minlength=len(groups)) / counts,
+            ])
+        fig.add_trace(go.Scatter(
+            x=centers[:, 0],
+            y=centers[:, 1],
+            mode='markers+text',
+            text=[str(g) for g in groups],
+            textposition='top center',
+            customdata=np.bincount(codes, minlength=len(groups)),
+            marker=dict(size=16, symbol='x', color=[colors[i % len(colors)] for i in range(len(groups))],
+                        line=dict(width=2, color='black')),
+            hovertemplate=f'{label_title} %{{text}}<br>%{{customdata:,}} points<extra></extra>',
+            name='Centroids'
+        ))
+    else:
+        Trace = go.Scattergl if mode == 'webgl' else go.Scatter
+        hover = f'{label_title}: %{{fullData.name}}<br>{x_title}: %{{x:.2f}}<br>{y_title}: %{{y:.2f}}<extra></extra>'
+        for i, group in enumerate(groups):
+            mask = codes == i
+            fig.add_trace(Trace(
+                x=x[mask],
+                y=y[mask],
+                mode='markers',
+                name=str(group),
+                marker=dict(color=colors[i % len(colors)]),
+                hovertemplate=hover
+            ))
+        if centers is not None:
+            fig.add_trace(go.Scatter(
+                x=centers[:, 0],
+                y=centers[:, 1],
+                mode='markers',
+                marker=dict(
+                    size=20,
+                    symbol='x',
+                    color='black',
+                    line=dict(width=2, color='white')
+                ),
+                name='Centroids',
+                showlegend=True
+            ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        legend_title_text=label_title
+    )
+    return fig
+
+
+def prediction_scatter(actual, predicted, title='Predictions vs Actual Values',
+                       x_title='Actual', y_title='Predicted', mode=None):
+    """
+    Predicted-vs-actual plot with a perfect-prediction line.
+
+    Points are colored by absolute error (SVG or WebGL); above the density
+    threshold they are binned into a heatmap instead.
+    """
+    actual = np.asarray(actual)
+    predicted = np.asarray(predicted)
+    mode = mode or render_mode(len(actual))
+    fig = go.Figure()
+
+    if mode == 'density':
+        fig.add_trace(_density_heatmap(actual, predicted, colorscale='Viridis'))
+    else:
+        Trace = go.Scattergl if mode == 'webgl' else go.Scatter
+        fig.add_trace(Trace(
+            x=actual,
+            y=predicted,
+            mode='markers',
+            name='Predictions',
+            marker=dict(
+                size=6,
+                color=np.abs(actual - predicted),
+                colorscale='Viridis',
+                showscale=True,
+                colorbar=dict(title="Error")
+            ),
+            hovertemplate='Actual: %{x:.1f}<br>Predicted: %{y:.1f}<extra></extra>'
+        ))
+
+    # Add perfect prediction line
+    max_val = max(actual.max(), predicted.max())
+    min_val = min(actual.min(), predicted.min())
+    fig.add_trace(go.Scatter(
+        x=[min_val, max_val],
+        y=[min_val, max_val],
+        mode='lines',
+        name='Perfect Predictions',
+        line=dict(color='red', dash='dash', width=2)
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        hovermode='closest'
+    )
+    return fig
+
+
+def confusion_heatmap(confusion, class_names, title='Confusion Matrix'):
+    """Annotated confusion matrix (rows are actual, columns predicted classes)."""
+    import plotly.express as px
+
+    return px.imshow(
+        confusion,
+        text_auto=True,
+        labels=dict(x="Predicted Class", y="actual Class"),
+        x=class_names,
+        y=class_names,
+        title=title,
+        color_continuous_scale='Blues'
+    )
+
+
+def q_value_heatmap(env, values, title='Q-Values Heatmap (brighter = better)'):
+    """
+    Heatmap of per-cell values of a grid world with START, GOAL and PIT markers.
+
+    Small grids get a label in every cell and text annotations for the
+    markers; large grids get one marker trace per kind instead.
+
+    Parameters:
+    -----------
+    env : GridWorld
+        Environment the values belong to
+    values : numpy.ndarray
+        2D array (rows × cols), NaN cells are left blank
+    """
+    # Cell labels are only readable on small grids
+    small_grid = env.n_states <= 400
+
+    fig = go.Figure(data=go.Heatmap(
+        z=values,
+        colorscale='Viridis',
+        text=np.round(values, 1) if small_grid else None,
+        texttemplate='%{text}' if small_grid else None,
+        textfont={"size": 10},
+        colorbar=dict(title="Q-Value")
+    ))
+
+    # Add START, GOAL and PIT annotations
+    markers = [(env.start, "START")] + [(g, "GOAL") for g in env.goals]
+    markers += [(p, "PIT") for p in env.pits]
+    if small_grid:
+        for (row, col), label in markers:
+            fig.add_annotation(
+                x=col, y=row,
+                text=label,
+                showarrow=False,
+                font=dict(color='white', size=14, family='Arial Black'),
+                yshift=15
+            )
+    else:
+        # One marker trace per kind instead of thousands of annotations
+        for label, symbol in [("START", "circle"), ("GOAL", "star"), ("PIT", "x")]:
+            cells = np.array([cell for cell, kind in markers if kind == label])
+            if cells.size:
+                fig.add_trace(go.Scatter(
+                    x=cells[:, 1], y=cells[:, 0],
+                    mode='markers',
+                    marker=dict(symbol=symbol, size=9, color='white',
+                                line=dict(width=1, color='black')),
+                    name=label
+                ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title='Column',
+        yaxis_title='Row',
+        height=500
+    )
+    return fig
+
+
+def fold_scores(values, title, y_title, color='#45B7D1', tickformat=None):
+    """Box plot of per-fold cross-validation scores with every fold drawn as a point."""
+    fig = go.Figure(go.Box(
+        y=values,
+        name=y_title,
+        boxpoints='all',
+        jitter=0.4,
+        pointpos=0,
+        marker=dict(color=color, size=5),
+        line=dict(color=color),
+        hovertemplate=f'{y_title}: %{{y:.3f}}<extra></extra>',
+        showlegend=False
+    ))
+    fig.update_layout(
+        title=title,
+        yaxis_title=y_title,
+        yaxis_tickformat=tickformat,
+        height=400
+    )
+    return fig
@@ -0,0 +1,104 @@
+"""
+Warm the shared caches before the first visitor arrives.
+
+``prewarm`` imports the heavy modules the pages load lazily, loads the
+bundled datasets, and fits the default-parameter models into the same
+process-wide caches the pages read from. Starting the server through this
+module runs it in a background thread while Streamlit boots, in the same
+process::
+
+    python -m ml_explorer.prewarm                 # instead of: streamlit run Home.py
+    python -m ml_explorer.prewarm -- --server.port 8080
+
+Any arguments after ``--`` are passed on to ``streamlit run``.
+"""
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Imported by the pages on their first cache miss
+HEAVY_MODULES = (
+    'pandas',
+    'plotly.express',
+    'sklearn.cluster',
+    'sklearn.datasets',
+    'sklearn.decomposition',
+    'sklearn.linear_model',
+    'sklearn.metrics',
+    'sklearn.model_selection',
+)
+
+HOME = Path(__file__).resolve().parent.parent / 'Home.py'
+
+
+def prewarm(log=None):
+    """
+    Import heavy modules and fill the caches with the pages' default results.
+
+    Parameters:
+    -----------
+    log : callable, optional
+        Called with a message after each step
+
+    Returns:
+    --------
+    seconds : dict
+        Time spent on each step
+    """
+    from ml_explorer.clustering import fit_kmeans, make_data, project_pca, score_kmeans
+    from ml_explorer.gridworld import GridWorld
+    from ml_explorer.supervised import fit_classifier, fit_regressor, load_dataset
+    from ml_explorer.sweep import get_grid_store
+
+    steps = [
+        ('imports', lambda: [importlib.import_module(name) for name in HEAVY_MODULES]),
+        ('datasets', lambda: (load_dataset('iris'), load_dataset('diabetes'))),
+        # Defaults of the Supervised Learning sliders
+        ('supervised models', lambda: (fit_classifier('iris', test_size=0.2, random_state=42, max_iter=200),
+                                       fit_regressor('diabetes', test_size=0.2, random_state=42))),
+        # Loads the precomputed grid, or starts building it in the background
+        ('grid store', get_grid_store),
+        # Defaults of the Unsupervised Learning sliders (300 samples, k=3)
+        ('clustering', lambda: (make_data(300), fit_kmeans(300, 3), score_kmeans(300, 3), project_pca(300))),
+        ('grid world', GridWorld.classic),
+    ]
+
+    seconds = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        seconds[name] = time.perf_counter() - start
+        if log is not None:
+            log(f"prewarm: {name} in {seconds[name]:.2f}s")
+    return seconds
+
+
+def start_prewarm(log=None):
+    """Run ``prewarm`` on a daemon thread and return the thread."""
+    def run():
+        try:
+            prewarm(log)
+        except Exception as e:  # a failed prewarm only costs the first visitor time
+            if log is not None:
+                log(f"prewarm failed: {e}")
+
+    thread = threading.Thread(target=run, name='ml-explorer-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def main():
+    from streamlit.web import cli
+
+    args = sys.argv[1:]
+    if args and args[0] == '--':
+        args = args[1:]
+    start_prewarm(log=lambda message: print(message, flush=True))
+    sys.argv = ['streamlit', 'run', str(HOME), *args]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Opt-in timing of page sections, with peak memory and chart payload sizes.
+
+A ``Profiler`` is created once per page run. Wrapping a block in
+``profiler.section(name)`` records its wall time and (through
+``tracemalloc``) the peak of Python and NumPy allocations made inside it.
+``profiler.chart(name, fig)`` times drawing a Plotly figure (Streamlit
+serialises it in ``st.plotly_chart``) and records how many bytes it sends
+to the browser. When the profiler
+is disabled every call is a no-op, so pages can stay instrumented at no
+cost.
+
+Memory tracing slows down every thread in the process, so it only runs
+while at least one profiled run is active: ``close`` stops it after the
+last one. ``tracemalloc`` is process-wide, so when profiled runs overlap
+(several sessions with the overlay on) each one's peaks include the
+others' allocations and are flagged as approximate.
+
+Every profiled run is appended to a JSON-lines log. The log can be
+aggregated across sessions::
+
+    python -m ml_explorer.profiling            # median / p95 per page section
+"""
+import argparse
+import json
+import os
+import time
+import threading
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ml_explorer.cache import CACHE_DIR
+
+# Set to 1 to profile every page run without the sidebar toggle
+ENABLED = os.environ.get('ML_EXPLORER_PROFILE', '') not in ('', '0')
+LOG_PATH = Path(os.environ.get('ML_EXPLORER_PROFILE_LOG', CACHE_DIR / 'profile.jsonl'))
+
+# Profiled runs in progress (runs that end without ``close`` drop out when collected)
+_active = weakref.WeakSet()
+_tracing_lock = threading.Lock()
+_started_tracing = False  # True when tracing was started here, so ours to stop
+
+
+@dataclass(frozen=True)
+class SectionRecord:
+    """Timing of one section of a page run."""
+    name: str
+    seconds: float
+    peak_mb: float = None
+    payload_bytes: int = None
+    cached: bool = False
+
+
+class Profiler:
+    """
+    Collects section timings for one run of one page.
+
+    Parameters:
+    -----------
+    page : str
+        Page name written to the log
+    enabled : bool
+        When False, sections are not timed and nothing is logged
+    session : str, optional
+        Identifies the browser session in the log
+    """
+
+    def __init__(self, page, enabled=ENABLED, session=None):
+        self.page = page
+        self.enabled = enabled
+        self.session = session
+        self.records = []
+        self.concurrent = False  # another profiled run overlapped this one
+        self._started = time.perf_counter()
+        self._stack = []  # highest traced memory seen by each open section
+        if enabled:
+            global _started_tracing
+            with _tracing_lock:
+                _active.add(self)
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _started_tracing = True
+
+    def close(self):
+        """End this run; stop memory tracing if no other profiled run is active."""
+        global _started_tracing
+        if not self.enabled:
+            return
+        with _tracing_lock:
+            _active.discard(self)
+            if not _active and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+    @contextmanager
+    def section(self, name):
+        """Time the enclosed block (sections may nest)."""
+        if not self.enabled:
+            yield
+            return
+        if len(_active) > 1:
+            self.concurrent = True
+        # reset_peak() is global, so an enclosing section keeps the highest
+        # peak seen before each nested reset
+        if self._stack:
+            self._stack[-1] = max(self._stack[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        self._stack.append(before)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = max(self._stack.pop(), tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                self._stack[-1] = max(self._stack[-1], peak)
+            self.records.append(SectionRecord(name, seconds, (peak - before) / 1e6))
+
+    def hit(self, name):
+        """Record a section that was served from a cache."""
+        if self.enabled:
+            self.records.append(SectionRecord(name, 0.0, cached=True))
+
+    @contextmanager
+    def chart(self, name, fig):
+        """
+        Time the enclosed ``st.plotly_chart`` call drawing ``fig`` and record its payload size.
+
+        The size takes one more serialisation after the timed block, paid
+        only while profiling.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        seconds = time.perf_counter() - start
+        self.records.append(SectionRecord(f'{name} (draw)', seconds, payload_bytes=len(fig.to_json())))
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self._started
+
+    def write_log(self, path=LOG_PATH):
+        """Append this run as one JSON line (no-op when disabled)."""
+        if not self.enabled:
+            return
+        entry = {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'page': self.page,
+            'session': self.session,
+            'total_seconds': self.total_seconds,
+            'concurrent': self.concurrent,
+            'sections': [asdict(r) for r in self.records],
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as log:
+            log.write(json.dumps(entry) + '\n')
+
+
+def read_log(path=LOG_PATH):
+    """
+    Load a profile log into one row per (run, section).
+
+    Returns:
+    --------
+    frame : pandas.DataFrame
+        Columns timestamp, page, session, name, seconds, peak_mb,
+        payload_bytes and cached
+    """
+    import pandas as pd
+
+    rows = []
+    with open(path) as log:
+        for line in log:
+            entry = json.loads(line)
+            run = {key: entry[key] for key in ('timestamp', 'page', 'session')}
+            rows.extend({**run, **section} for section in entry['sections'])
+    return pd.DataFrame(rows)
+
+
+def summarize(path=LOG_PATH):
+    """
+    Per page section: runs, cache hit rate, median / p95 seconds, max peak MB
+    and payload. Times are over the runs where the section was not cached.
+    """
+    frame = read_log(path)
+    frame['seconds'] = frame['seconds'].where(~frame['cached'])
+    grouped = frame.groupby(['page', 'name'], sort=False)
+    return grouped.agg(
+        runs=('cached', 'size'),
+        cached=('cached', 'mean'),
+        median_s=('seconds', 'median'),
+        p95_s=('seconds', lambda s: s.quantile(0.95)),
+        max_peak_mb=('peak_mb', 'max'),
+        payload_bytes=('payload_bytes', 'median'),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise the ML Explorer profile log")
+    parser.add_argument('--log', default=str(LOG_PATH), help="JSON-lines profile log")
+    args = parser.parse_args()
+
+    import pandas as pd
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200):
+        print(summarize(args.log))
+
+
+if __name__ == '__main__':
+    main()
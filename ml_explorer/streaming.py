@@ -0,0 +1,250 @@
+"""
+Out-of-core clustering and PCA for user-supplied feature files.
+
+CSV and Parquet files are streamed in row chunks and ``.npy`` files are
+memory-mapped, so the full feature matrix is never held in RAM. Models
+are fitted incrementally (``StandardScaler``, ``MiniBatchKMeans`` and
+``IncrementalPCA`` all support ``partial_fit``) and only a bounded
+random sample of rows is kept for plotting and silhouette scoring.
+pandas, pyarrow and scikit-learn are imported only when a file is read.
+"""
+import hashlib
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR, lru_cached
+from ml_explorer.silhouette import SilhouetteEstimate, silhouette_sampled
+
+SUPPORTED_SUFFIXES = ('.csv', '.parquet', '.npy')
+CHUNK_ROWS = 50_000
+SAMPLE_ROWS = 5_000
+MAX_COMPONENTS = 10
+UPLOAD_DIR = CACHE_DIR / 'uploads'
+
+
+@dataclass(frozen=True)
+class OutOfCoreResult:
+    """Summary of a streamed clustering + PCA run."""
+    n_rows: int
+    columns: list
+    cluster_sizes: np.ndarray
+    inertia: float
+    explained_variance_ratio: np.ndarray
+    sample_pca: np.ndarray
+    sample_labels: np.ndarray
+    centers_pca: np.ndarray
+    silhouette_estimate: SilhouetteEstimate
+
+
+# ========================================
+# READING
+# ========================================
+
+def numeric_columns(path):
+    """Names of the numeric columns of a CSV/Parquet file (column numbers for .npy)."""
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == '.csv':
+        head = pd.read_csv(path, nrows=1000)
+        return list(head.select_dtypes('number').columns)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        schema = pq.read_schema(path)
+        return [f.name for f in schema
+                if pd.api.types.is_numeric_dtype(f.type.to_pandas_dtype())]
+    if path.suffix == '.npy':
+        array = np.load(path, mmap_mode='r')
+        if array.ndim != 2:
+            raise ValueError("Expected a 2D array (rows × features)")
+        return list(range(array.shape[1]))
+    raise ValueError(f"Unsupported file type: {path.suffix}")
+
+
+def iter_chunks(path, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Yield float32 row blocks of the selected columns, dropping rows with missing values.
+    """
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == '.csv':
+        for frame in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            block = frame[columns].to_numpy(dtype=np.float32)
+            yield block[~np.isnan(block).any(axis=1)]
+    elif path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            block = batch.to_pandas()[columns].to_numpy(dtype=np.float32)
+            yield block[~np.isnan(block).any(axis=1)]
+    elif path.suffix == '.npy':
+        array = np.load(path, mmap_mode='r')
+        for start in range(0, len(array), chunk_rows):
+            block = np.asarray(array[start:start + chunk_rows, columns], dtype=np.float32)
+            yield block[~np.isnan(block).any(axis=1)]
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+
+
+def _rebatch(chunks, min_rows):
+    """Merge small chunks so every block except possibly the last has min_rows rows."""
+    buffer = []
+    n_buffered = 0
+    for block in chunks:
+        buffer.append(block)
+        n_buffered += len(block)
+        if n_buffered >= min_rows:
+            yield np.concatenate(buffer)
+            buffer, n_buffered = [], 0
+    if n_buffered:
+        yield np.concatenate(buffer)
+
+
+def save_upload(uploaded_file):
+    """
+    Spill an uploaded file to disk (in chunks) so it can be streamed like a path.
+
+    Files are named after a hash of their contents, so re-uploading the
+    same file reuses both the copy and any cached results.
+    """
+    suffix = Path(uploaded_file.name).suffix.lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported file type: {suffix}")
+
+    digest = hashlib.sha1()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(1 << 20), b''):
+        digest.update(block)
+
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = UPLOAD_DIR / f"{digest.hexdigest()}{suffix}"
+    if not path.exists():
+        uploaded_file.seek(0)
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(uploaded_file, out)
+    return path
+
+
+# ========================================
+# FITTING
+# ========================================
+
+def fit_out_of_core(path, k, columns=None, standardize=True, chunk_rows=CHUNK_ROWS,
+                    sample_rows=SAMPLE_ROWS, seed=42):
+    """
+    Cluster a file with MiniBatchKMeans and project it with IncrementalPCA.
+
+    The file is read up to three times: once to fit the scaler (if
+    ``standardize``), once to fit K-Means and PCA, and once to assign
+    labels, count cluster sizes and keep a uniform random sample of rows.
+    Memory use depends on ``chunk_rows`` and ``sample_rows``, not on the
+    file size.
+
+    Parameters:
+    -----------
+    path : str or Path
+        CSV, Parquet or .npy file
+    k : int
+        Number of clusters
+    columns : list, optional
+        Feature columns; defaults to every numeric column
+    standardize : bool
+        Scale features to zero mean and unit variance first
+    chunk_rows : int
+        Rows read per chunk
+    sample_rows : int
+        Rows kept for the scatter plot and silhouette estimate
+    seed : int
+        Seed for K-Means and the row sample
+
+    Returns:
+    --------
+    result : OutOfCoreResult
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import IncrementalPCA
+    from sklearn.preprocessing import StandardScaler
+
+    columns = list(columns) if columns is not None else numeric_columns(path)
+    if len(columns) < 2:
+        raise ValueError("Need at least two numeric columns")
+
+    n_components = min(len(columns), MAX_COMPONENTS)
+    scaler = StandardScaler()
+    if standardize:
+        for block in iter_chunks(path, columns, chunk_rows):
+            if len(block):
+                scaler.partial_fit(block)
+    else:
+        # Fitting on a single zero row gives the identity transform
+        scaler.fit(np.zeros((1, len(columns))))
+
+    kmeans = MiniBatchKMeans(n_clusters=k, random_state=seed, n_init=3, batch_size=4096)
+    ipca = IncrementalPCA(n_components=n_components)
+    min_rows = max(k, n_components)
+    fitted = False
+    for block in _rebatch(iter_chunks(path, columns, chunk_rows), min_rows):
+        if len(block) < min_rows:
+            continue
+        block = scaler.transform(block)
+        kmeans.partial_fit(block)
+        ipca.partial_fit(block)
+        fitted = True
+    if not fitted:
+        raise ValueError(f"Need at least {min_rows} complete rows")
+
+    # Final pass: labels, sizes, inertia and a bounded uniform sample
+    rng = np.random.default_rng(seed)
+    sizes = np.zeros(k, dtype=np.int64)
+    inertia = 0.0
+    n_rows = 0
+    sample = np.empty((0, len(columns)), dtype=np.float32)
+    sample_keys = np.empty(0)
+    for block in iter_chunks(path, columns, chunk_rows):
+        if not len(block):
+            continue
+        block = scaler.transform(block)
+        labels = kmeans.predict(block)
+        sizes += np.bincount(labels, minlength=k)
+        inertia += float(((block - kmeans.cluster_centers_[labels]) ** 2).sum())
+        n_rows += len(block)
+
+        # Keep the rows with the smallest random keys seen so far
+        keys = rng.random(len(block))
+        sample = np.concatenate([sample, block])
+        sample_keys = np.concatenate([sample_keys, keys])
+        if len(sample) > sample_rows:
+            keep = np.argpartition(sample_keys, sample_rows)[:sample_rows]
+            sample, sample_keys = sample[keep], sample_keys[keep]
+
+    sample_labels = kmeans.predict(sample)
+    if len(np.unique(sample_labels)) > 1:
+        estimate = silhouette_sampled(sample, sample_labels, sample_size=min(2000, len(sample)), seed=seed)
+    else:
+        estimate = SilhouetteEstimate(float('nan'), float('nan'), float('nan'), 0, exact=False)
+
+    return OutOfCoreResult(
+        n_rows=n_rows,
+        columns=columns,
+        cluster_sizes=sizes,
+        inertia=inertia,
+        explained_variance_ratio=ipca.explained_variance_ratio_,
+        sample_pca=ipca.transform(sample)[:, :2],
+        sample_labels=sample_labels,
+        centers_pca=ipca.transform(kmeans.cluster_centers_)[:, :2],
+        silhouette_estimate=estimate,
+    )
+
+
+@lru_cached(maxsize=16)
+def fit_file(path, k, columns=None, standardize=True, modified=None):
+    """
+    Cached ``fit_out_of_core`` for a file path.
+
+    ``columns`` must be a tuple (or None); ``modified`` should be the file's
+    modification time so an edited file is not served stale results.
+    """
+    return fit_out_of_core(path, k, columns=columns, standardize=standardize)
@@ -0,0 +1,163 @@
+"""
+Dataset loading and model fitting for the Supervised Learning page.
+
+Every function is memoised with ``lru_cached`` on its full argument
+list (dataset, test size, random state and model parameters), so a
+parameter combination that any session has already seen is served from
+memory instead of being reloaded or refitted.
+
+scikit-learn and pandas are imported inside the functions, so pages that
+are served from the cache (or the precomputed grid) never pay their
+import time.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import lru_cached
+
+IRIS_SPECIES = {0: 'setosa', 1: 'versicolor', 2: 'virginica'}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Feature matrix, target and a display frame for one bundled dataset."""
+    name: str
+    X: np.ndarray
+    y: np.ndarray
+    feature_names: list
+    frame: object  # pandas.DataFrame
+
+
+@dataclass(frozen=True)
+class ClassificationResult:
+    """Held-out predictions and metrics of a fitted classifier."""
+    model: object
+    y_test: np.ndarray
+    y_pred: np.ndarray
+    accuracy: float
+    confusion: np.ndarray
+    n_train: int
+    n_test: int
+
+
+@dataclass(frozen=True)
+class RegressionResult:
+    """Held-out predictions and metrics of a fitted regressor."""
+    model: object
+    y_test: np.ndarray
+    y_pred: np.ndarray
+    rmse: float
+    r2: float
+    n_train: int
+    n_test: int
+
+
+def _read_only(*arrays):
+    # Cached results are shared between sessions, guard against in-place edits
+    for a in arrays:
+        a.setflags(write=False)
+
+
+@lru_cached(maxsize=8)
+def load_dataset(name):
+    """
+    Load a bundled scikit-learn dataset by name ('iris' or 'diabetes').
+    """
+    import pandas as pd
+    from sklearn.datasets import load_diabetes, load_iris
+
+    if name == 'iris':
+        data = load_iris()
+        frame = pd.DataFrame(data.data, columns=data.feature_names)
+        frame['target'] = data.target
+        frame['species'] = frame['target'].map(IRIS_SPECIES)
+    elif name == 'diabetes':
+        data = load_diabetes()
+        frame = pd.DataFrame(data.data, columns=data.feature_names)
+        frame['progression'] = data.target
+    else:
+        raise ValueError(f"Unknown dataset: {name}")
+
+    _read_only(data.data, data.target)
+    return Dataset(name, data.data, data.target, list(data.feature_names), frame)
+
+
+def split_dataset(name, test_size, random_state):
+    """Train/test split of a bundled dataset (X_train, X_test, y_train, y_test)."""
+    from sklearn.model_selection import train_test_split
+
+    dataset = load_dataset(name)
+    return train_test_split(dataset.X, dataset.y, test_size=test_size, random_state=random_state)
+
+
+@lru_cached(maxsize=256)
+def fit_classifier(dataset='iris', test_size=0.2, random_state=42, max_iter=200):
+    """
+    Fit LogisticRegression on a train/test split and score it.
+
+    Parameters:
+    -----------
+    dataset : str
+        Name of the bundled dataset
+    test_size : float
+        Fraction of samples held out for testing (0-1)
+    random_state : int
+        Seed of the train/test split
+    max_iter : int
+        Iteration limit of the solver
+
+    Returns:
+    --------
+    result : ClassificationResult
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, confusion_matrix
+
+    X_train, X_test, y_train, y_test = split_dataset(dataset, test_size, random_state)
+
+    model = LogisticRegression(max_iter=max_iter)
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    cm = confusion_matrix(y_test, y_pred)
+
+    _read_only(y_test, y_pred, cm)
+    return ClassificationResult(
+        model=model,
+        y_test=y_test,
+        y_pred=y_pred,
+        accuracy=float(accuracy_score(y_test, y_pred)),
+        confusion=cm,
+        n_train=len(X_train),
+        n_test=len(X_test),
+    )
+
+
+@lru_cached(maxsize=256)
+def fit_regressor(dataset='diabetes', test_size=0.2, random_state=42):
+    """
+    Fit LinearRegression on a train/test split and score it.
+
+    Returns:
+    --------
+    result : RegressionResult
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    X_train, X_test, y_train, y_test = split_dataset(dataset, test_size, random_state)
+
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    _read_only(y_test, y_pred)
+    return RegressionResult(
+        model=model,
+        y_test=y_test,
+        y_pred=y_pred,
+        rmse=float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        r2=float(r2_score(y_test, y_pred)),
+        n_train=len(X_train),
+        n_test=len(X_test),
+    )
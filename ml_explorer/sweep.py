@@ -0,0 +1,289 @@
+"""
+Precomputed parameter grid for the Supervised Learning page.
+
+The page only offers ``test_size`` 10-50% in steps of 5 and
+``random_state`` 0-100, i.e. 909 combinations. ``build_grid_store`` fits
+both models for every combination in a process pool and writes the
+metrics (plus the regression predictions needed for the scatter plot) to
+a single ``.npz`` file. Once that file exists, moving a slider is an
+array lookup instead of a model fit.
+
+Build it ahead of time with::
+
+    python -m ml_explorer.sweep
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR
+from ml_explorer.supervised import (ClassificationResult, RegressionResult, fit_classifier,
+                                    fit_regressor, load_dataset)
+
+TEST_SIZES = np.arange(10, 55, 5)     # percent, matches the page slider
+RANDOM_STATES = np.arange(0, 101)     # matches the page number input
+STORE_PATH = CACHE_DIR / 'supervised_grid.npz'
+FORMAT_VERSION = 1
+
+# Checked against the store without importing scikit-learn itself
+SKLEARN_VERSION = version('scikit-learn')
+
+
+def _split_indices(n_samples, test_size_pct, random_state):
+    from sklearn.model_selection import train_test_split
+
+    # Same shuffle as splitting X and y directly, but returns row indices
+    return train_test_split(np.arange(n_samples), test_size=test_size_pct / 100,
+                            random_state=int(random_state))
+
+
+def _evaluate_test_size(test_size_pct):
+    """Fit both models for every random state at one test size."""
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    from sklearn.metrics import accuracy_score, confusion_matrix, mean_squared_error, r2_score
+
+    iris = load_dataset('iris')
+    diabetes = load_dataset('diabetes')
+    n_seeds = len(RANDOM_STATES)
+    n_classes = len(np.unique(iris.y))
+
+    accuracy = np.empty(n_seeds)
+    confusion = np.empty((n_seeds, n_classes, n_classes), dtype=np.int16)
+    rmse = np.empty(n_seeds)
+    r2 = np.empty(n_seeds)
+    reg_pred = np.full((n_seeds, len(diabetes.y)), np.nan, dtype=np.float32)
+
+    for j, seed in enumerate(RANDOM_STATES):
+        train, test = _split_indices(len(iris.y), test_size_pct, seed)
+        model = LogisticRegression(max_iter=200).fit(iris.X[train], iris.y[train])
+        y_pred = model.predict(iris.X[test])
+        accuracy[j] = accuracy_score(iris.y[test], y_pred)
+        confusion[j] = confusion_matrix(iris.y[test], y_pred, labels=np.arange(n_classes))
+
+        train, test = _split_indices(len(diabetes.y), test_size_pct, seed)
+        reg = LinearRegression().fit(diabetes.X[train], diabetes.y[train])
+        y_pred = reg.predict(diabetes.X[test])
+        rmse[j] = np.sqrt(mean_squared_error(diabetes.y[test], y_pred))
+        r2[j] = r2_score(diabetes.y[test], y_pred)
+        reg_pred[j, test] = y_pred
+
+    return accuracy, confusion, rmse, r2, reg_pred
+
+
+def compute_grid(max_workers=None):
+    """
+    Evaluate the whole (test_size × random_state) grid in a process pool.
+
+    Returns:
+    --------
+    arrays : dict of numpy.ndarray
+        Grid axes and metrics, ready for ``np.savez``
+    """
+    # Spawned workers are safe to start from Streamlit's multi-threaded server
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        rows = list(pool.map(_evaluate_test_size, TEST_SIZES.tolist()))
+
+    accuracy, confusion, rmse, r2, reg_pred = (np.stack(cols) for cols in zip(*rows))
+    return {
+        'format_version': np.array(FORMAT_VERSION),
+        'sklearn_version': np.array(SKLEARN_VERSION),
+        'test_sizes': TEST_SIZES,
+        'random_states': RANDOM_STATES,
+        'accuracy': accuracy,
+        'confusion': confusion,
+        'rmse': rmse,
+        'r2': r2,
+        'reg_pred': reg_pred,
+    }
+
+
+# Arrays every store file must hold
+STORE_KEYS = frozenset(('format_version', 'sklearn_version', 'test_sizes', 'random_states',
+                        'accuracy', 'confusion', 'rmse', 'r2', 'reg_pred'))
+
+
+def build_grid_store(path=STORE_PATH, max_workers=None):
+    """Compute the grid and write it atomically to ``path``."""
+    arrays = compute_grid(max_workers)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.npz')
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+    return GridStore(arrays)
+
+
+class GridStore:
+    """
+    Read-only view of a precomputed grid.
+
+    Lookups return the same result records as ``fit_classifier`` and
+    ``fit_regressor``, without the fitted model (``model`` is None). For
+    classification, ``y_test`` and ``y_pred`` are not stored either.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.test_sizes = arrays['test_sizes']
+        self.random_states = arrays['random_states']
+
+    def __len__(self):
+        return len(self.test_sizes) * len(self.random_states)
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        """
+        Load a store, or return None if it is missing, unreadable or was
+        built by another version (so that it gets rebuilt).
+
+        A truncated file (e.g. from a killed build) raises ``BadZipFile`` or
+        ``EOFError``, and a file from an older layout may lack some arrays.
+        """
+        try:
+            with np.load(path) as data:
+                arrays = {key: data[key] for key in data.files}
+            if (int(arrays['format_version']) != FORMAT_VERSION
+                    or str(arrays['sklearn_version']) != SKLEARN_VERSION):
+                return None
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return None
+        if not STORE_KEYS <= arrays.keys():
+            return None
+        return cls(arrays)
+
+    def _index(self, test_size_pct, random_state):
+        i = np.searchsorted(self.test_sizes, test_size_pct)
+        j = np.searchsorted(self.random_states, random_state)
+        if (i < len(self.test_sizes) and self.test_sizes[i] == test_size_pct
+                and j < len(self.random_states) and self.random_states[j] == random_state):
+            return i, j
+        return None
+
+    def classification(self, test_size_pct, random_state):
+        """Stored LogisticRegression result on iris, or None if off-grid."""
+        index = self._index(test_size_pct, random_state)
+        if index is None:
+            return None
+        n_test = int(self.arrays['confusion'][index].sum())
+        return ClassificationResult(
+            model=None,
+            y_test=None,
+            y_pred=None,
+            accuracy=float(self.arrays['accuracy'][index]),
+            confusion=self.arrays['confusion'][index],
+            n_train=len(load_dataset('iris').y) - n_test,
+            n_test=n_test,
+        )
+
+    def regression(self, test_size_pct, random_state):
+        """Stored LinearRegression result on diabetes, or None if off-grid."""
+        index = self._index(test_size_pct, random_state)
+        if index is None:
+            return None
+        y = load_dataset('diabetes').y
+        pred = self.arrays['reg_pred'][index]
+        test = ~np.isnan(pred)
+        return RegressionResult(
+            model=None,
+            y_test=y[test],
+            y_pred=pred[test].astype(float),
+            rmse=float(self.arrays['rmse'][index]),
+            r2=float(self.arrays['r2'][index]),
+            n_train=int(len(y) - test.sum()),
+            n_test=int(test.sum()),
+        )
+
+    def accuracy_by_test_size(self):
+        """Test sizes (percent) and accuracy for every seed (test sizes × seeds)."""
+        return self.test_sizes, self.arrays['accuracy']
+
+
+def classify(test_size_pct, random_state, store=None):
+    """
+    LogisticRegression result on iris, from ``store`` when it covers the
+    parameters and from a (cached) fit otherwise.
+    """
+    result = store.classification(test_size_pct, random_state) if store is not None else None
+    if result is None:
+        result = fit_classifier('iris', test_size=test_size_pct / 100,
+                                random_state=int(random_state), max_iter=200)
+    return result
+
+
+def regress(test_size_pct, random_state, store=None):
+    """LinearRegression result on diabetes, from ``store`` or a (cached) fit."""
+    result = store.regression(test_size_pct, random_state) if store is not None else None
+    if result is None:
+        result = fit_regressor('diabetes', test_size=test_size_pct / 100,
+                               random_state=int(random_state))
+    return result
+
+
+# ========================================
+# BACKGROUND BUILD
+# ========================================
+
+_store = None
+_build_thread = None
+_build_error = None
+_build_lock = threading.Lock()
+
+
+def _build_in_background(path, max_workers):
+    global _store, _build_error
+    try:
+        _store = build_grid_store(path, max_workers)
+    except Exception as e:  # reported by grid_store_status()
+        _build_error = e
+
+
+def get_grid_store(path=STORE_PATH, build=True, max_workers=None):
+    """
+    Return the precomputed grid, starting a background build if needed.
+
+    The first call in a process loads the store from disk. If there is no
+    usable file and ``build`` is True, a single background thread builds
+    it (using a process pool) while callers keep getting None.
+    """
+    global _store, _build_thread
+    with _build_lock:
+        if _store is None and _build_thread is None:
+            _store = GridStore.load(path)
+            if _store is None and build:
+                _build_thread = threading.Thread(
+                    target=_build_in_background, args=(path, max_workers), daemon=True
+                )
+                _build_thread.start()
+        return _store
+
+
+def grid_store_status():
+    """One of 'ready', 'building', 'failed' or 'missing'."""
+    if _store is not None:
+        return 'ready'
+    if _build_error is not None:
+        return 'failed'
+    if _build_thread is not None and _build_thread.is_alive():
+        return 'building'
+    return 'missing'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the Supervised Learning parameter grid")
+    parser.add_argument('--path', default=str(STORE_PATH), help="Output .npz file")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    store = build_grid_store(path=Path(args.path), max_workers=args.workers)
+    print(f"Wrote {len(store)} combinations to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
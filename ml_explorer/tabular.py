@@ -0,0 +1,542 @@
+"""
+Bring-your-own tabular datasets for the Supervised Learning page.
+
+CSV and Parquet files are read in row chunks. A first pass profiles every
+column: its kind (numeric or categorical), missing values, mean and
+spread, and its distinct values up to a cap. Every later pass converts
+each chunk to a typed Arrow table. Numbers become float32, and text
+becomes dictionary-encoded categories with the same codes in every
+chunk. The profile also suggests a target column, the task
+(classification or regression) and the feature columns.
+
+Files up to ``INCREMENTAL_ROWS`` rows are loaded into one Arrow-backed
+frame and fitted like the bundled datasets, with LogisticRegression or
+LinearRegression on a train/test split. Larger files are never loaded
+whole. ``SGDClassifier`` / ``SGDRegressor`` are fitted with
+``partial_fit`` over the chunks, and the test metrics are accumulated
+chunk by chunk. Only a bounded sample of test predictions is kept for the
+charts. pandas, pyarrow and scikit-learn are imported only when a file is
+read.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ml_explorer.cache import lru_cached
+from ml_explorer.supervised import ClassificationResult, RegressionResult
+
+SUPPORTED_SUFFIXES = ('.csv', '.parquet')
+CHUNK_ROWS = 50_000
+# Above this many rows, fit incrementally instead of loading the file
+INCREMENTAL_ROWS = 100_000
+# Categorical columns with more distinct values are not used as features
+MAX_CATEGORIES = 50
+# Numeric targets with at most this many distinct integer values are classes
+MAX_CLASSES = 20
+SGD_EPOCHS = 3
+SAMPLE_ROWS = 5_000
+TARGET_NAMES = ('target', 'label', 'class', 'y', 'outcome')
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    """Type and summary statistics of one column, from a full pass over the file."""
+    name: str
+    kind: str            # 'numeric' or 'categorical'
+    n_missing: int
+    mean: float          # numeric columns only
+    std: float
+    values: tuple        # distinct values, None if there are too many to list
+
+    @property
+    def n_values(self):
+        return None if self.values is None else len(self.values)
+
+
+@dataclass(frozen=True)
+class TableProfile:
+    """Columns of a tabular file, with a suggested target, task and features."""
+    n_rows: int
+    columns: tuple       # ColumnProfile per column, in file order
+    target: str
+    task: str
+    features: tuple
+
+    @property
+    def names(self):
+        return [column.name for column in self.columns]
+
+    @property
+    def incremental(self):
+        """Whether models are fitted chunk by chunk (the file is too large to load)."""
+        return self.n_rows > INCREMENTAL_ROWS
+
+    def column(self, name):
+        return self.columns[self.names.index(name)]
+
+    def task_for(self, target):
+        """
+        'classification' for few categories or integer values, 'regression' for
+        other numbers, None for text with too many distinct values.
+        """
+        column = self.column(target)
+        if column.kind == 'categorical':
+            return 'classification' if column.values is not None else None
+        if (column.values is not None and len(column.values) <= MAX_CLASSES
+                and all(float(v).is_integer() for v in column.values)):
+            return 'classification'
+        return 'regression'
+
+    def usable_features(self, target):
+        """Columns other than ``target`` that can be features: varying numbers, or few categories."""
+        return tuple(
+            c.name for c in self.columns
+            if c.name != target and (c.std > 0 if c.kind == 'numeric' else c.values is not None)
+        )
+
+
+@dataclass(frozen=True)
+class TableFit:
+    """A model fitted on a user file, with held-out predictions and metrics."""
+    task: str
+    target: str
+    features: tuple
+    class_names: tuple     # classification only
+    result: object         # ClassificationResult or RegressionResult
+    model_name: str
+    incremental: bool      # fitted with partial_fit over chunks
+    n_chunks: int
+    sampled: bool          # y_test / y_pred hold a random sample of the test rows
+
+
+# ========================================
+# READING
+# ========================================
+
+def _raw_chunks(path, chunk_rows=CHUNK_ROWS, columns=None):
+    """Yield the file as pandas frames of up to ``chunk_rows`` rows, types as stored or inferred."""
+    import pandas as pd
+
+    path = Path(path)
+    if path.suffix == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns)
+    elif path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported file type: {path.suffix}")
+
+
+def _number_text(value):
+    """A number as category text: ``'1'`` for 1 and 1.0, ``'2.5'`` for 2.5."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _as_text(series):
+    """
+    A column's values as strings, missing values kept as ``<NA>``.
+
+    A column can be read as numbers in some chunks and as text in others,
+    so numbers are written with ``_number_text`` whatever dtype (int, float,
+    bool) a chunk gave them; every chunk then maps to the same categories.
+    """
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return pd.Series([None if np.isnan(v) else _number_text(v) for v in values],
+                         index=series.index, dtype='string')
+    return series.astype('string')
+
+
+def _suggest_target(profile):
+    """A column named like a target, else the last column that can be predicted."""
+    candidates = [name for name in profile.names if profile.task_for(name) is not None]
+    if not candidates:
+        raise ValueError("No column can be predicted: every text column has too many distinct values")
+    for name in candidates:
+        if name.strip().lower() in TARGET_NAMES:
+            return name
+    return candidates[-1]
+
+
+@lru_cached(maxsize=16)
+def profile_table(path, modified=None):
+    """
+    Profile every column of a CSV or Parquet file in one chunked pass.
+
+    ``modified`` should be the file's modification time so an edited file
+    is profiled again.
+
+    Returns:
+    --------
+    profile : TableProfile
+    """
+    import pandas as pd
+
+    names, n_rows = None, 0
+    numeric, count, total, squares, distinct = {}, {}, {}, {}, {}
+    for chunk in _raw_chunks(path):
+        if names is None:
+            names = [str(name) for name in chunk.columns]
+            chunk.columns = names
+            numeric = {name: True for name in names}
+            count = dict.fromkeys(names, 0)
+            total = dict.fromkeys(names, 0.0)
+            squares = dict.fromkeys(names, 0.0)
+            distinct = {name: set() for name in names}
+        chunk.columns = names
+        n_rows += len(chunk)
+        for name in names:
+            series = chunk[name].dropna()
+            count[name] += len(series)
+            if numeric[name] and (pd.api.types.is_numeric_dtype(series) or series.empty):
+                values = series.to_numpy(dtype=np.float64)
+                total[name] += values.sum()
+                squares[name] += np.square(values).sum()
+                cap = MAX_CLASSES
+            else:
+                if numeric[name]:
+                    # Text after numbers: the column is categorical after all
+                    numeric[name] = False
+                    distinct[name] = ({_number_text(v) for v in distinct[name]}
+                                      if distinct[name] is not None else None)
+                values = _as_text(series).unique().tolist()
+                cap = MAX_CATEGORIES
+            if distinct[name] is not None:
+                distinct[name].update(np.unique(values).tolist())
+                if len(distinct[name]) > cap:
+                    distinct[name] = None  # too many to list; stop tracking
+    if not names or n_rows == 0:
+        raise ValueError("The file has no rows")
+
+    columns = []
+    for name in names:
+        n = max(count[name], 1)
+        mean = total[name] / n if numeric[name] else float('nan')
+        variance = squares[name] / n - mean ** 2 if numeric[name] else float('nan')
+        values = None if distinct[name] is None else tuple(sorted(distinct[name]))
+        columns.append(ColumnProfile(name, 'numeric' if numeric[name] else 'categorical',
+                                     n_rows - count[name], float(mean),
+                                     float(np.sqrt(max(variance, 0.0))), values))
+
+    profile = TableProfile(n_rows, tuple(columns), None, None, ())
+    target = _suggest_target(profile)
+    return TableProfile(n_rows, tuple(columns), target, profile.task_for(target),
+                        profile.usable_features(target))
+
+
+def _to_arrow(chunk, profile):
+    """Typed Arrow table of a raw chunk: float32 numbers and profile-wide category codes."""
+    import pandas as pd
+    import pyarrow as pa
+
+    chunk.columns = [str(name) for name in chunk.columns]
+    arrays = {}
+    for name in chunk.columns:
+        column = profile.column(name)
+        series = chunk[name]
+        if column.kind == 'numeric':
+            values = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+            arrays[name] = pa.array(values, from_pandas=True)
+        elif column.values is not None:
+            strings = _as_text(series)
+            codes = pd.Index(column.values).get_indexer(strings).astype(np.int32)  # -1 for missing
+            arrays[name] = pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0),
+                                                          pa.array(column.values, pa.string()))
+        else:
+            arrays[name] = pa.array(_as_text(series), pa.string()).dictionary_encode()
+    return pa.table(arrays)
+
+
+def _typed_chunks(path, profile, columns=None, chunk_rows=CHUNK_ROWS):
+    for chunk in _raw_chunks(path, chunk_rows, columns):
+        yield _to_arrow(chunk, profile)
+
+
+@lru_cached(maxsize=8)
+def load_table(path, modified=None):
+    """
+    Whole file as one Arrow-backed pandas frame (float32 and dictionary columns).
+
+    Raises:
+    -------
+    ValueError
+        If the file has more than ``INCREMENTAL_ROWS`` rows
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    profile = profile_table(path, modified)
+    if profile.incremental:
+        raise ValueError(f"{profile.n_rows:,} rows is too many to load; fit it incrementally")
+    table = pa.concat_tables(list(_typed_chunks(path, profile))).unify_dictionaries()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@lru_cached(maxsize=16)
+def preview_table(path, modified=None, n_rows=100):
+    """First ``n_rows`` rows as an Arrow-backed frame, without reading the rest of the file."""
+    import pandas as pd
+
+    profile = profile_table(path, modified)
+    first = next(_raw_chunks(path, n_rows))
+    return _to_arrow(first, profile).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# ========================================
+# DESIGN MATRIX
+# ========================================
+
+def _design(table, profile, target, features, task):
+    """
+    Feature matrix and target of a typed table.
+
+    Missing numbers are filled with the column mean and categories are
+    one-hot encoded (a missing category is all zeros). Rows without a
+    target are dropped. Class labels are codes into the target's values.
+
+    Returns:
+    --------
+    X : numpy.ndarray
+        float32 (rows × encoded features)
+    y : numpy.ndarray
+        int64 class codes or float64 values
+    """
+    import pyarrow.compute as pc
+
+    blocks = []
+    for name in features:
+        column = profile.column(name)
+        data = table.column(name).combine_chunks()
+        if column.kind == 'numeric':
+            blocks.append(pc.fill_null(data, column.mean).to_numpy(zero_copy_only=False)[:, None])
+        else:
+            codes = pc.fill_null(data.indices, -1).to_numpy(zero_copy_only=False)
+            blocks.append((codes[:, None] == np.arange(len(column.values))).astype(np.float32))
+    X = np.hstack(blocks).astype(np.float32, copy=False) if blocks else np.empty((table.num_rows, 0), np.float32)
+
+    column = profile.column(target)
+    data = table.column(target).combine_chunks()
+    if column.kind == 'categorical':
+        y = pc.fill_null(data.indices, -1).to_numpy(zero_copy_only=False).astype(np.int64)
+        keep = y >= 0
+    else:
+        y = data.to_numpy(zero_copy_only=False).astype(np.float64)
+        keep = ~np.isnan(y)
+        if task == 'classification':
+            y = np.searchsorted(np.asarray(column.values, dtype=np.float64), np.where(keep, y, 0.0))
+    return X[keep], y[keep]
+
+
+def feature_names(profile, features):
+    """Names of the encoded feature columns (``column=value`` for categories)."""
+    names = []
+    for name in features:
+        column = profile.column(name)
+        names += [name] if column.kind == 'numeric' else [f"{name}={value}" for value in column.values]
+    return names
+
+
+def _class_names(profile, target, task):
+    if task != 'classification':
+        return ()
+    return tuple(f"{v:g}" if isinstance(v, float) else str(v) for v in profile.column(target).values)
+
+
+# ========================================
+# FITTING
+# ========================================
+
+@lru_cached(maxsize=32)
+def fit_table(path, target, features, task, test_size=0.2, random_state=42, modified=None):
+    """
+    Fit and score a classifier or regressor on a user file.
+
+    Files the profile marks as incremental are streamed (``SGD_EPOCHS``
+    passes of ``partial_fit``); others are loaded and fitted exactly.
+
+    Parameters:
+    -----------
+    path : str
+        CSV or Parquet file
+    target : str
+        Column to predict
+    features : tuple of str
+        Columns to predict it from
+    task : str
+        'classification' or 'regression'
+    test_size : float
+        Fraction of rows held out for testing (0-1)
+    random_state : int
+        Seed of the train/test split (and of SGD)
+    modified : float, optional
+        The file's modification time, so an edited file is not served stale results
+
+    Returns:
+    --------
+    fit : TableFit
+    """
+    profile = profile_table(path, modified)
+    features = tuple(features)
+    if not features:
+        raise ValueError("Choose at least one feature column")
+    if target in features:
+        raise ValueError(f"'{target}' cannot be both the target and a feature")
+    if task == 'classification' and profile.task_for(target) != 'classification':
+        raise ValueError(f"'{target}' has too many distinct values to classify")
+    if task == 'regression' and profile.column(target).kind != 'numeric':
+        raise ValueError(f"'{target}' is not numeric; use classification")
+
+    if profile.incremental:
+        return _fit_incremental(path, profile, target, features, task, test_size, random_state)
+    return _fit_in_memory(path, profile, target, features, task, test_size, random_state, modified)
+
+
+def _fit_in_memory(path, profile, target, features, task, test_size, random_state, modified):
+    import pyarrow as pa
+    from sklearn.linear_model import LinearRegression, LogisticRegression
+    from sklearn.metrics import confusion_matrix, mean_squared_error, r2_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    table = pa.Table.from_pandas(load_table(path, modified), preserve_index=False)
+    X, y = _design(table, profile, target, features, task)
+    if len(y) < 4:
+        raise ValueError("Need at least 4 rows with a target value")
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    if task == 'classification':
+        n_classes = len(profile.column(target).values)
+        if len(np.unique(y_train)) < 2:
+            raise ValueError("The training rows hold a single class; nothing to learn")
+        model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=200)).fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        result = ClassificationResult(
+            model=model, y_test=y_test, y_pred=y_pred,
+            accuracy=float(np.mean(y_pred == y_test)),
+            confusion=confusion_matrix(y_test, y_pred, labels=np.arange(n_classes)),
+            n_train=len(y_train), n_test=len(y_test),
+        )
+        name = 'LogisticRegression'
+    else:
+        model = LinearRegression().fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        result = RegressionResult(
+            model=model, y_test=y_test, y_pred=y_pred,
+            rmse=float(np.sqrt(mean_squared_error(y_test, y_pred))),
+            r2=float(r2_score(y_test, y_pred)),
+            n_train=len(y_train), n_test=len(y_test),
+        )
+        name = 'LinearRegression'
+    for a in (result.y_test, result.y_pred):
+        a.setflags(write=False)
+    return TableFit(task, target, features, _class_names(profile, target, task), result, name,
+                    incremental=False, n_chunks=1, sampled=False)
+
+
+def _split_chunks(path, profile, target, features, task, test_size, random_state):
+    """Yield (X, y, is_test) per chunk; the split of a chunk is the same on every pass."""
+    columns = [target, *features]
+    for i, table in enumerate(_typed_chunks(path, profile, columns)):
+        X, y = _design(table, profile, target, features, task)
+        rng = np.random.default_rng([random_state, i])
+        yield X, y, rng.random(len(y)) < test_size
+
+
+def _fit_incremental(path, profile, target, features, task, test_size, random_state):
+    from sklearn.linear_model import SGDClassifier, SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    def chunks():
+        return _split_chunks(path, profile, target, features, task, test_size, random_state)
+
+    # Pass 1: feature scaling (and target scaling for regression) on the training rows
+    scaler = StandardScaler()
+    y_sum = y_squares = 0.0
+    n_train = n_chunks = 0
+    for X, y, test in chunks():
+        n_chunks += 1
+        if (~test).any():
+            scaler.partial_fit(X[~test])
+            y_sum += y[~test].sum()
+            y_squares += np.square(y[~test], dtype=np.float64).sum()
+            n_train += int((~test).sum())
+    if n_train == 0:
+        raise ValueError("No training rows")
+
+    if task == 'classification':
+        classes = np.arange(len(profile.column(target).values))
+        model = SGDClassifier(loss='log_loss', random_state=random_state)
+
+        def fit(X, y):
+            model.partial_fit(X, y, classes=classes)
+    else:
+        y_mean = y_sum / n_train
+        y_std = np.sqrt(max(y_squares / n_train - y_mean ** 2, 0.0)) or 1.0
+        model = SGDRegressor(random_state=random_state)
+
+        def fit(X, y):
+            model.partial_fit(X, (y - y_mean) / y_std)
+
+    # Passes 2..: stochastic gradient descent over the training rows of every chunk
+    for _ in range(SGD_EPOCHS):
+        for X, y, test in chunks():
+            if (~test).any():
+                fit(scaler.transform(X[~test]), y[~test])
+
+    # Last pass: metrics over every test row, plus a bounded sample for the charts
+    rng = np.random.default_rng(random_state)
+    n_test = 0
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64) if task == 'classification' else None
+    sse = test_sum = test_squares = 0.0
+    sample_true, sample_pred, sample_keys = np.empty(0), np.empty(0), np.empty(0)
+    for X, y, test in chunks():
+        if not test.any():
+            continue
+        y_true = y[test]
+        y_pred = model.predict(scaler.transform(X[test]))
+        if task == 'classification':
+            confusion += np.bincount(y_true * len(classes) + y_pred,
+                                     minlength=len(classes) ** 2).reshape(confusion.shape)
+        else:
+            y_pred = y_pred * y_std + y_mean
+            sse += np.square(y_true - y_pred).sum()
+            test_sum += y_true.sum()
+            test_squares += np.square(y_true).sum()
+        n_test += len(y_true)
+
+        # Keep the test rows with the smallest random keys seen so far
+        sample_true = np.concatenate([sample_true, y_true])
+        sample_pred = np.concatenate([sample_pred, y_pred])
+        sample_keys = np.concatenate([sample_keys, rng.random(len(y_true))])
+        if len(sample_keys) > SAMPLE_ROWS:
+            keep = np.argpartition(sample_keys, SAMPLE_ROWS)[:SAMPLE_ROWS]
+            sample_true, sample_pred, sample_keys = sample_true[keep], sample_pred[keep], sample_keys[keep]
+    if n_test == 0:
+        raise ValueError("No test rows")
+
+    if task == 'classification':
+        sample_true, sample_pred = sample_true.astype(np.int64), sample_pred.astype(np.int64)
+        result = ClassificationResult(
+            model=model, y_test=sample_true, y_pred=sample_pred,
+            accuracy=float(np.trace(confusion) / n_test), confusion=confusion,
+            n_train=n_train, n_test=n_test,
+        )
+        name = 'SGDClassifier'
+    else:
+        total_squares = test_squares - test_sum ** 2 / n_test
+        result = RegressionResult(
+            model=model, y_test=sample_true, y_pred=sample_pred,
+            rmse=float(np.sqrt(sse / n_test)),
+            r2=float(1 - sse / total_squares) if total_squares > 0 else float('nan'),
+            n_train=n_train, n_test=n_test,
+        )
+        name = 'SGDRegressor'
+    for a in (result.y_test, result.y_pred):
+        a.setflags(write=False)
+    return TableFit(task, target, features, _class_names(profile, target, task), result, name,
+                    incremental=True, n_chunks=n_chunks, sampled=n_test > len(sample_true))
@@ -0,0 +1,136 @@
+"""
+Background training for the Grid World page.
+
+``TrainingWorker`` runs Q-learning episodes on a daemon thread so the
+Streamlit script can return immediately and poll for progress instead
+of blocking the session until training ends. The worker trains its own
+copy of the Q-tensor and only ever stops between episodes, so whatever
+it hands back always reflects a whole number of finished episodes.
+"""
+import copy
+import threading
+import time
+
+from ml_explorer.history import RewardHistory
+from ml_explorer.planning import OptimalityTracker
+from ml_explorer.qlearning import train_episode
+
+
+class TrainingWorker:
+    """
+    Train a batch of agents for a fixed number of episodes on a thread.
+
+    Parameters:
+    -----------
+    env : GridWorld
+        Environment to train in
+    q_tables : numpy.ndarray
+        Starting Q-tensor (agents × rows × cols × actions); it is copied,
+        the caller's array is never modified
+    n_episodes : int
+        Episodes to run unless stopped early
+    learning_rate, discount, epsilon : float
+        Q-learning hyperparameters
+    rng : numpy.random.Generator
+        Source of randomness for exploration; it is copied, the worker's
+        advanced generator is ``self.rng``
+    q_star : QStar, optional
+        Optimal Q-function; when given, every episode also records each
+        agent's RMS error against it and its optimal-action agreement
+    planner : DynaPlanner, optional
+        Model-based planning after every real step; its model is updated in
+        place, so the caller must not change its mode or update count
+        while the worker runs
+    """
+
+    def __init__(self, env, q_tables, n_episodes, learning_rate, discount, epsilon, rng, q_star=None,
+                 planner=None):
+        self.env = env
+        self.q_tables = q_tables.copy()
+        self.n_episodes = n_episodes
+        self.params = (learning_rate, discount, epsilon)
+        self.rng = copy.deepcopy(rng)
+        self.q_star = q_star
+        self.planner = planner
+        self.seconds = 0.0  # time spent training so far
+        self._planner_start = (planner.steps, planner.planning_updates) if planner is not None else (0, 0)
+        self.error = None
+
+        self._history = RewardHistory(q_tables.shape[0])
+        self._q_error = RewardHistory(q_tables.shape[0])
+        self._agreement = RewardHistory(q_tables.shape[0])
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ask the worker to finish after the episode it is currently running."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    @property
+    def episodes_done(self):
+        with self._lock:
+            return len(self._history)
+
+    def rewards(self):
+        """Rewards of the finished episodes so far (episodes × agents)."""
+        with self._lock:
+            return self._history.rewards.copy()
+
+    def mean_rewards(self):
+        """Mean reward over agents of each finished episode so far."""
+        with self._lock:
+            return self._history.mean.copy()
+
+    @property
+    def env_steps(self):
+        """Real agent-steps taken by this worker (counted by its planner)."""
+        return self.planner.steps - self._planner_start[0] if self.planner is not None else 0
+
+    @property
+    def planning_updates(self):
+        """Simulated updates applied by this worker's planner."""
+        return self.planner.planning_updates - self._planner_start[1] if self.planner is not None else 0
+
+    def optimality(self):
+        """Per-episode RMS error against Q* and optimal-action agreement (episodes × agents each)."""
+        with self._lock:
+            return self._q_error.rewards.copy(), self._agreement.rewards.copy()
+
+    def _run(self):
+        learning_rate, discount, epsilon = self.params
+        try:
+            tracker = None
+            if self.q_star is not None:
+                tracker = OptimalityTracker(self.q_star, self.q_tables)
+            start = time.perf_counter()
+            for _ in range(self.n_episodes):
+                if self._stop.is_set():
+                    break
+                reward = train_episode(
+                    self.env, self.q_tables, learning_rate, discount, epsilon, self.rng, tracker,
+                    self.planner
+                )
+                self.seconds = time.perf_counter() - start
+                with self._lock:
+                    self._history.extend(reward)
+                    if tracker is not None:
+                        self._q_error.extend(tracker.error)
+                        self._agreement.extend(tracker.agreement)
+        except Exception as e:  # surfaced to the UI on the next poll
+            self.error = e
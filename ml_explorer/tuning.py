@@ -0,0 +1,320 @@
+"""
+Q-learning hyperparameter sweeps over the learning rate, discount and exploration.
+
+Every cell of an α × γ × ε grid is trained with several seeds. The batched
+engine accepts one value of each hyperparameter per agent, so a chunk of
+cells (with all their seeds) trains as a single batch of agents. Chunks
+are spread over a process pool, one per core.
+
+Per cell, ``HyperparameterGrid`` keeps the final reward (mean over the
+last ``FINAL_EPISODES`` episodes) and the episodes to convergence. An agent
+has converged once the moving average of its reward stays within
+``SETTLE_FRACTION`` of the goal reward of its final value. Agents
+still moving in the last window count as not converged and are given the
+full episode count.
+
+A ``SweepRunner`` trains on a background thread so the page can poll it.
+Finished grids are kept in a shared in-memory cache and as ``.npz``
+files, so revisiting a sweep (in any session, or after a restart) is a
+lookup.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+
+from ml_explorer.cache import CACHE_DIR, LRUCache
+
+# Values offered on the page, from the sidebar slider grids
+ALPHAS = tuple(np.round(np.arange(0.1, 1.01, 0.1), 2).tolist())
+GAMMAS = tuple(np.round(np.arange(0.1, 1.01, 0.05), 2).tolist())
+EPSILONS = tuple(np.round(np.arange(0.0, 1.01, 0.05), 2).tolist())
+
+FINAL_EPISODES = 10
+SETTLE_WINDOW = 10
+SETTLE_FRACTION = 0.05
+
+SWEEP_DIR = CACHE_DIR / 'qlearning_sweeps'
+FORMAT_VERSION = 2  # 2: 64-agent chunks, so grids of version 1 had other seeds
+
+_finished = LRUCache(maxsize=32, name='tuning.sweeps')
+
+
+@dataclass(frozen=True)
+class HyperparameterGrid:
+    """Final reward and convergence speed of every α × γ × ε cell, over seeds."""
+    alphas: np.ndarray
+    gammas: np.ndarray
+    epsilons: np.ndarray
+    n_seeds: int
+    n_episodes: int
+    final_reward: np.ndarray       # α × γ × ε, mean over seeds
+    final_reward_std: np.ndarray   # α × γ × ε
+    convergence: np.ndarray        # α × γ × ε, mean episodes to converge
+    converged: np.ndarray          # α × γ × ε, fraction of seeds that converged
+    seconds: float                 # wall-clock time of the sweep
+
+    @property
+    def n_cells(self):
+        return self.final_reward.size
+
+    def best(self):
+        """(α, γ, ε) of the cell with the highest mean final reward."""
+        i, j, k = np.unravel_index(np.nanargmax(self.final_reward), self.final_reward.shape)
+        return float(self.alphas[i]), float(self.gammas[j]), float(self.epsilons[k])
+
+
+def settle_episodes(rewards, goal_reward, window=SETTLE_WINDOW, fraction=SETTLE_FRACTION):
+    """
+    Episodes each agent needed for its reward to settle.
+
+    Parameters:
+    -----------
+    rewards : numpy.ndarray
+        Episode rewards (episodes × agents)
+    goal_reward : float
+        Scale of the tolerance: ``fraction × goal_reward`` around the final
+        moving average
+    window : int
+        Moving-average window, in episodes
+
+    Returns:
+    --------
+    episodes : numpy.ndarray
+        Episode (1-based) from which each agent's moving average stays within
+        the tolerance; the episode count for agents that never settle
+    settled : numpy.ndarray
+        Boolean, False for agents that were still moving in the last window
+    """
+    n_episodes = rewards.shape[0]
+    window = min(window, n_episodes)
+    totals = np.cumsum(rewards, axis=0, dtype=np.float64)
+    moving = totals[window - 1:].copy()
+    moving[1:] -= totals[:-window]
+    moving /= window
+
+    outside = np.abs(moving - moving[-1]) > fraction * abs(goal_reward)
+    # Last moving-average position outside the band (-1 if none); it settles right after
+    last_out = np.where(outside.any(axis=0), outside.shape[0] - 1 - np.argmax(outside[::-1], axis=0), -1)
+    episodes = last_out + window + 1
+    settled = last_out < outside.shape[0] - window
+    return np.where(settled, np.minimum(episodes, n_episodes), n_episodes), settled
+
+
+# ============================================================================
+# TRAINING
+# ============================================================================
+
+def _build_world(layout_key):
+    from ml_explorer.gridworld import GridWorld
+
+    if layout_key is None:
+        return GridWorld.classic()
+    grid_size, wall_density, n_pits, n_goals, seed = layout_key
+    return GridWorld.random(grid_size, grid_size, wall_density, n_pits, n_goals, seed)
+
+
+def _train_chunk(layout_key, params, n_episodes, seed):
+    """Worker: train one agent per row of ``params`` (α, γ, ε) as a single batch."""
+    from ml_explorer.qlearning import init_q_tables, train_episodes
+
+    env = _build_world(layout_key)
+    q_tables = init_q_tables(env, len(params))
+    # float32 like the Q-tensor, so per-agent values update exactly like scalars
+    alpha, gamma, epsilon = (np.ascontiguousarray(column, dtype=np.float32) for column in params.T)
+    rewards = train_episodes(env, q_tables, n_episodes, alpha, gamma, epsilon, np.random.default_rng(seed))
+    final = rewards[-min(FINAL_EPISODES, n_episodes):].mean(axis=0)
+    episodes, settled = settle_episodes(rewards, env.goal_reward)
+    return final, episodes, settled
+
+
+def _sweep_key(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed):
+    def as_floats(values):
+        return tuple(round(float(v), 6) for v in values)
+
+    return (None if layout_key is None else tuple(layout_key), as_floats(alphas), as_floats(gammas),
+            as_floats(epsilons), int(n_seeds), int(n_episodes), int(seed))
+
+
+def _sweep_path(key):
+    digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()[:16]
+    return SWEEP_DIR / f'sweep-{digest}.npz'
+
+
+def find_sweep(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed=0):
+    """
+    A finished sweep with exactly these settings, from memory or disk, or None.
+    """
+    key = _sweep_key(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed)
+    grid = _finished.get(key)
+    if grid is None:
+        grid = _load_grid(_sweep_path(key), key)
+        if grid is not None:
+            _finished.put(key, grid)
+    return grid
+
+
+def _load_grid(path, key):
+    try:
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+    except (OSError, ValueError):
+        return None
+    meta = json.loads(str(arrays.pop('meta')))
+    if meta['format_version'] != FORMAT_VERSION or meta['key'] != json.loads(json.dumps(key)):
+        return None
+    for a in arrays.values():
+        a.setflags(write=False)
+    return HyperparameterGrid(n_seeds=meta['n_seeds'], n_episodes=meta['n_episodes'],
+                              seconds=meta['seconds'], **arrays)
+
+
+def _save_grid(path, key, grid):
+    meta = {'format_version': FORMAT_VERSION, 'key': key, 'n_seeds': grid.n_seeds,
+            'n_episodes': grid.n_episodes, 'seconds': grid.seconds}
+    arrays = {name: getattr(grid, name) for name in
+              ('alphas', 'gammas', 'epsilons', 'final_reward', 'final_reward_std', 'convergence', 'converged')}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.npz')
+    np.savez(tmp, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, path)
+
+
+class SweepRunner:
+    """
+    Train an α × γ × ε grid on a background thread, over a process pool.
+
+    The grid's agents (every cell × ``n_seeds``) are cut into chunks of
+    ``CHUNK_AGENTS`` that each train as one batch in a worker process. Chunks
+    are small enough that the page's default grid (750 agents) fills a pool
+    of a dozen processes. The chunks and their seeds do not depend on the
+    number of workers, so the same settings always give the same grid.
+
+    Parameters:
+    -----------
+    layout_key : tuple or None
+        Grid World layout parameters, None for the classic grid
+    alphas, gammas, epsilons : sequence of float
+        Learning rates, discount factors and exploration rates of the grid
+    n_seeds : int
+        Agents trained per cell
+    n_episodes : int
+        Episodes every agent trains for
+    seed : int
+        Base seed of the exploration generators
+    max_workers : int, optional
+        Worker processes (default: all cores, at most one per chunk)
+    """
+
+    CHUNK_AGENTS = 64
+
+    def __init__(self, layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed=0, max_workers=None):
+        self.key = _sweep_key(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed)
+        self.shape = (len(alphas), len(gammas), len(epsilons))
+        self.n_agents = int(np.prod(self.shape)) * n_seeds
+        self.max_workers = max_workers
+        self.agents_done = 0
+        self.result = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Cancel the chunks that have not started; the sweep then ends without a result."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    @property
+    def progress(self):
+        """Fraction of the grid's agents trained so far."""
+        return self.agents_done / self.n_agents
+
+    def _run(self):
+        layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed = self.key
+        try:
+            start = time.perf_counter()
+            # One row (α, γ, ε) per agent, cells in C order with their seeds adjacent
+            cells = np.stack(np.meshgrid(alphas, gammas, epsilons, indexing='ij'), axis=-1).reshape(-1, 3)
+            params = np.repeat(cells, n_seeds, axis=0)
+            bounds = list(range(0, len(params), self.CHUNK_AGENTS)) + [len(params)]
+            chunks = list(zip(bounds[:-1], bounds[1:]))
+
+            final = np.empty(len(params))
+            episodes = np.empty(len(params))
+            settled = np.empty(len(params), dtype=bool)
+            workers = min(self.max_workers or os.cpu_count() or 1, len(chunks))
+            # Spawned workers are safe to start from Streamlit's multi-threaded server
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                futures = {pool.submit(_train_chunk, layout_key, params[lo:hi], n_episodes, (seed, i)): (lo, hi)
+                           for i, (lo, hi) in enumerate(chunks)}
+                for future in as_completed(futures):
+                    if self._stop.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        return
+                    lo, hi = futures[future]
+                    final[lo:hi], episodes[lo:hi], settled[lo:hi] = future.result()
+                    self.agents_done += hi - lo
+
+            def per_cell(values):
+                # agents × ... -> cells × seeds
+                return values.reshape(-1, n_seeds)
+
+            arrays = dict(
+                alphas=np.array(alphas), gammas=np.array(gammas), epsilons=np.array(epsilons),
+                final_reward=per_cell(final).mean(axis=1).reshape(self.shape),
+                final_reward_std=per_cell(final).std(axis=1).reshape(self.shape),
+                convergence=per_cell(episodes).mean(axis=1).reshape(self.shape),
+                converged=per_cell(settled).mean(axis=1).reshape(self.shape),
+            )
+            for a in arrays.values():
+                a.setflags(write=False)
+            grid = HyperparameterGrid(n_seeds=n_seeds, n_episodes=n_episodes,
+                                      seconds=time.perf_counter() - start, **arrays)
+            _finished.put(self.key, grid)
+            _save_grid(_sweep_path(self.key), self.key, grid)
+            self.result = grid
+        except Exception as e:  # surfaced to the UI on the next poll
+            self.error = e
+
+
+def sweep_hyperparameters(layout_key, alphas=ALPHAS, gammas=GAMMAS, epsilons=EPSILONS, n_seeds=5,
+                          n_episodes=100, seed=0, max_workers=None):
+    """
+    Final reward and convergence of every α × γ × ε cell, trained on all cores.
+
+    Finished grids are cached in memory and on disk, so repeating a call
+    with the same settings returns immediately.
+
+    Returns:
+    --------
+    grid : HyperparameterGrid
+    """
+    grid = find_sweep(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed)
+    if grid is None:
+        runner = SweepRunner(layout_key, alphas, gammas, epsilons, n_seeds, n_episodes, seed, max_workers)
+        runner.start().join()
+        if runner.error is not None:
+            raise runner.error
+        grid = runner.result
+    return grid
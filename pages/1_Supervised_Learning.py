@@ -1,12 +1,19 @@
+from pathlib import Path
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-from sklearn.datasets import load_iris, load_diabetes
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression, LinearRegression
-from sklearn.metrics import accuracy_score, confusion_matrix, mean_squared_error, r2_score
-import plotly.express as px
 import plotly.graph_objects as go
+from ml_explorer.crossval import cross_validate_classifier, cross_validate_regressor
+from ml_explorer.figures import cached_figure
+from ml_explorer.overlay import finish_profiling, show_figure, start_profiling
+from ml_explorer.pipeline import Pipeline
+from ml_explorer.plotting import cluster_scatter, confusion_heatmap, fold_scores, prediction_scatter
+from ml_explorer.regularization import C_GRID, SOLVERS, regularization_paths
+from ml_explorer.streaming import save_upload
+from ml_explorer.supervised import load_dataset
+from ml_explorer.sweep import classify, get_grid_store, grid_store_status, regress
+from ml_explorer.tabular import (CHUNK_ROWS, INCREMENTAL_ROWS, SGD_EPOCHS, fit_table, load_table,
+                                 preview_table, profile_table)
 
 # Page configuration - MUST be first Streamlit command
 st.set_page_config(
@@ -14,20 +21,43 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
+profiler = start_profiling('Supervised Learning')
 
 #Page title
 st.title("📊 Supervised Learning")
 st.markdown("## Classification and Regression Demos")
 
 # Sidebar for parameters
+st.sidebar.header("Data Source")
+source = st.sidebar.radio(
+    "Data",
+    ["Bundled datasets", "Upload a file", "File path on server"],
+    label_visibility="collapsed"
+)
+
+own_data = source != "Bundled datasets"
+
 st.sidebar.header("Parameters")
-test_size = st.sidebar.slider(
-    "Test Set Size (%)",
-    min_value=10,
-    max_value=50,
-    value=20,
-    step=5
+# Your own files are scored on a single split only
+evaluation = "Single split" if own_data else st.sidebar.radio(
+    "Evaluation",
+    ["Single split", "Cross-validation"],
+    help="Cross-validation scores every model on k folds (optionally reshuffled and repeated)"
 )
+cross_validation = evaluation == "Cross-validation"
+if cross_validation:
+    test_size = None
+    n_splits = st.sidebar.slider("Folds (k)", min_value=2, max_value=20, value=5)
+    n_repeats = st.sidebar.slider("Repeats", min_value=1, max_value=10, value=1)
+else:
+    n_splits = n_repeats = None
+    test_size = st.sidebar.slider(
+        "Test Set Size (%)",
+        min_value=10,
+        max_value=50,
+        value=20,
+        step=5
+    )
 random_state = st.sidebar.number_input(
     "Random State",
     min_value=0,
@@ -35,16 +65,363 @@ random_state = st.sidebar.number_input(
     value=42
 )
 
+# =========================================
+# YOUR OWN DATA (chunked, typed ingestion)
+# =========================================
+
+if own_data:
+    st.subheader("📂 Your Dataset")
+    st.caption(
+        f"CSV and Parquet files are read in chunks of {CHUNK_ROWS:,} rows into typed Arrow columns "
+        f"(float32 numbers, category codes for text). Files above {INCREMENTAL_ROWS:,} rows are never "
+        f"loaded whole: SGD models are fitted chunk by chunk, so memory stays bounded."
+    )
+
+    data_path = None
+    try:
+        if source == "Upload a file":
+            uploaded = st.file_uploader("Data file", type=['csv', 'parquet'])
+            if uploaded is not None:
+                data_path = save_upload(uploaded)
+        else:
+            typed_path = st.text_input("Path to a .csv or .parquet file")
+            if typed_path:
+                data_path = Path(typed_path).expanduser()
+                if not data_path.is_file():
+                    st.error(f"❌ File not found: {data_path}")
+                    st.stop()
+
+        if data_path is None:
+            st.info("👆 Choose a file to train on")
+            st.stop()
+
+        modified = data_path.stat().st_mtime
+        with st.spinner("Profiling columns..."), profiler.section('profile file'):
+            profile = profile_table(str(data_path), modified)
+        with profiler.section('load file'):
+            # Large files only show their first rows; they are never loaded whole
+            frame = (preview_table if profile.incremental else load_table)(str(data_path), modified)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Dataset Preview:**")
+            st.dataframe(frame.head(10))
+            size = f"{frame.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory"
+            st.write(f"📊 Shape: {profile.n_rows:,} rows, {len(profile.columns)} columns"
+                     + ("" if profile.incremental else f" ({size})"))
+        with col2:
+            st.write("**Columns:**")
+            st.dataframe(
+                {
+                    'column': profile.names,
+                    'type': [c.kind for c in profile.columns],
+                    'missing': [c.n_missing for c in profile.columns],
+                    'distinct': [c.n_values for c in profile.columns],  # blank = too many to count
+                },
+                hide_index=True
+            )
+
+        targets = [name for name in profile.names if profile.task_for(name) is not None]
+        col1, col2 = st.columns(2)
+        with col1:
+            target = st.selectbox("Target column", targets, index=targets.index(profile.target))
+        with col2:
+            column = profile.column(target)
+            tasks = ['classification', 'regression'] if column.kind == 'numeric' else ['classification']
+            if profile.task_for(target) == 'regression':
+                tasks = ['regression']
+            task = st.radio("Task", tasks, horizontal=True, format_func=str.capitalize)
+        candidates = profile.usable_features(target)
+        features = st.multiselect("Feature columns", candidates, default=list(candidates))
+
+        with st.spinner("Training..."), profiler.section('fit file'):
+            fit = fit_table(str(data_path), target, tuple(features), task, test_size / 100,
+                            int(random_state), modified)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+
+    result = fit.result
+    if fit.incremental:
+        how = (f"fitted incrementally: {SGD_EPOCHS} passes of `partial_fit` over {fit.n_chunks} chunks"
+               + (f"; the chart shows a random sample of {len(result.y_test):,} test rows" if fit.sampled else ""))
+    else:
+        how = "fitted in memory on standardized features" if task == 'classification' else "fitted in memory"
+    st.subheader("🎯 Model Performance")
+    st.caption(f"**{fit.model_name}** predicting `{target}` from {len(features)} columns, {how}.")
+
+    metric_col1, metric_col2, metric_col3 = st.columns(3)
+    if task == 'classification':
+        with metric_col1:
+            st.metric("Accuracy", f"{result.accuracy:.2%}")
+        with metric_col2:
+            st.metric("Train Size", f"{result.n_train:,}")
+        with metric_col3:
+            st.metric("Test Size", f"{result.n_test:,}")
+        fig_cm = cached_figure(
+            'file confusion',
+            lambda: confusion_heatmap(result.confusion, list(fit.class_names)),
+            data=(result.confusion, fit.class_names)
+        )
+        show_figure(fig_cm, profiler, 'file confusion')
+    else:
+        with metric_col1:
+            st.metric("RMSE", f"{result.rmse:.3g}")
+            st.caption("(Lower is better)")
+        with metric_col2:
+            st.metric("R² Score", f"{result.r2:.3f}")
+            st.caption("(Closer to 1.0 is better)")
+        with metric_col3:
+            st.metric("Test samples", f"{result.n_test:,}")
+
+        def build_file_figure():
+            fig = prediction_scatter(result.y_test, result.y_pred)
+            fig.update_layout(xaxis_title=f'Actual {target}', yaxis_title=f'Predicted {target}')
+            return fig
+
+        fig_file = cached_figure('file predictions', build_file_figure,
+                                 data=(result.y_test, result.y_pred), target=target)
+        show_figure(fig_file, profiler, 'file predictions')
+
+    finish_profiling(profiler)
+    st.stop()
+
+# Regularization path of the classifier (single split only)
+show_path = not cross_validation and st.sidebar.checkbox(
+    "Regularization path (C)",
+    help="Fit LogisticRegression over a grid of C values; moving the C slider never refits"
+)
+solver = C = None
+if show_path:
+    solver = st.sidebar.selectbox("Solver", SOLVERS)
+    C = st.sidebar.select_slider(
+        "Inverse Regularization (C)",
+        options=C_GRID,
+        value=min(C_GRID, key=lambda c: abs(np.log(c))),
+        format_func=lambda c: f"{c:.3g}"
+    )
+
+# Precomputed results for every slider position (built in the background on first use)
+with profiler.section('grid store'):
+    store = get_grid_store()
+if store is not None:
+    st.sidebar.caption(f"⚡ Serving {len(store)} precomputed parameter combinations")
+elif grid_store_status() == 'building':
+    st.sidebar.caption("⏳ Precomputing all parameter combinations in the background...")
+
+# =========================================
+# PIPELINE
+# =========================================
+
+# Datasets, models and figures are memoised on the parameters they depend
+# on, so a rerun only recomputes the stages whose inputs changed
+pipeline = Pipeline('supervised')
+
+@pipeline.stage()
+def iris():
+    # Load Iris dataset (cached, shared by every session)
+    return load_dataset('iris')
+
+@pipeline.stage(after=('iris',), figure=True)
+def iris_figure(iris):
+    df = iris.frame
+    return cluster_scatter(
+        df['sepal length (cm)'].to_numpy(),
+        df['sepal width (cm)'].to_numpy(),
+        df['species'].to_numpy(),
+        title='Iris Dataset - Sepal Dimensions',
+        x_title='sepal length (cm)',
+        y_title='sepal width (cm)',
+        label_title='species',
+        colors=['#FF6B6B', '#4ECDC4', '#45B7D1']
+    )
+
+@pipeline.stage(inputs=('test_size', 'random_state', 'store_ready'), after=('iris',), uses=('store',))
+def classifier(iris, test_size, random_state, store_ready, store):
+    # Look up the precomputed grid, or train the model (reused if any session
+    # already fitted these parameters)
+    return classify(test_size, random_state, store if store_ready else None)
+
+@pipeline.stage(after=('classifier',), figure=True)
+def confusion_figure(classifier):
+    return confusion_heatmap(classifier.confusion, ['Setosa', 'Versicolor', 'Virginica'])
+
+@pipeline.stage(inputs=('test_size', 'random_state'), after=('classifier',), uses=('store',), figure=True)
+def accuracy_figure(classifier, test_size, random_state, store):
+    # Accuracy across every seed, from the precomputed grid
+    test_sizes, grid_accuracy = store.accuracy_by_test_size()
+    fig_sweep = go.Figure()
+    for ts, acc in zip(test_sizes, grid_accuracy):
+        fig_sweep.add_trace(go.Box(
+            y=acc,
+            name=f'{ts}%',
+            marker_color='#45B7D1',
+            boxpoints=False,
+            showlegend=False
+        ))
+    fig_sweep.add_trace(go.Scatter(
+        x=[f'{test_size}%'],
+        y=[classifier.accuracy],
+        mode='markers',
+        marker=dict(size=12, color='#FF6B6B', symbol='diamond'),
+        name=f'Random State {random_state}'
+    ))
+    fig_sweep.update_layout(
+        title=f'Accuracy vs. Test Size across {len(store.random_states)} Seeds',
+        xaxis_title='Test Set Size',
+        yaxis_title='Accuracy',
+        yaxis_tickformat='.0%',
+        height=400
+    )
+    return fig_sweep
+
+@pipeline.stage(inputs=('n_splits', 'n_repeats', 'random_state'), after=('iris',))
+def classifier_cv(iris, n_splits, n_repeats, random_state):
+    # Accuracy on every fold, folds fitted in parallel
+    return cross_validate_classifier('iris', n_splits, n_repeats, random_state)
+
+@pipeline.stage(after=('classifier_cv',), figure=True)
+def cv_accuracy_figure(classifier_cv):
+    return fold_scores(
+        classifier_cv.scores['accuracy'],
+        title=f'Accuracy on {classifier_cv.n_folds} Folds',
+        y_title='Accuracy',
+        tickformat='.0%'
+    )
+
+@pipeline.stage(inputs=('test_size', 'random_state'), after=('iris',))
+def paths(iris, test_size, random_state):
+    # Whole path per solver, warm-started along C, solvers in parallel
+    return regularization_paths(test_size=test_size/100, random_state=random_state)
+
+@pipeline.stage(inputs=('solver', 'C'), after=('paths',), figure=True)
+def path_accuracy_figure(paths, solver, C):
+    fig = go.Figure()
+    colors = {'lbfgs': '#2c5aa0', 'newton-cg': '#4ECDC4', 'saga': '#FF6B6B'}
+    for name, path in paths.items():
+        fig.add_trace(go.Scatter(
+            x=path.Cs,
+            y=path.test_accuracy,
+            mode='lines+markers',
+            name=f'{name} (test)',
+            line=dict(color=colors.get(name), width=3 if name == solver else 1)
+        ))
+    fig.add_trace(go.Scatter(
+        x=paths[solver].Cs,
+        y=paths[solver].train_accuracy,
+        mode='lines',
+        name=f'{solver} (train)',
+        line=dict(color=colors.get(solver), dash='dash')
+    ))
+    fig.add_vline(x=C, line_dash='dot', line_color='gray')
+    fig.update_layout(
+        title='Accuracy along the Regularization Path',
+        xaxis_title='C (inverse regularization strength)',
+        yaxis_title='Accuracy',
+        xaxis_type='log',
+        yaxis_tickformat='.0%',
+        height=400
+    )
+    return fig
+
+@pipeline.stage(inputs=('solver', 'C'), after=('iris', 'paths'), figure=True)
+def coef_figure(iris, paths, solver, C):
+    path = paths[solver]
+    fig = go.Figure()
+    feature_colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#F7B32B']
+    class_dashes = ['solid', 'dash', 'dot']
+    for k, species in enumerate(['Setosa', 'Versicolor', 'Virginica']):
+        for j, feature in enumerate(iris.feature_names):
+            fig.add_trace(go.Scatter(
+                x=path.Cs,
+                y=path.coefs[:, k, j],
+                mode='lines',
+                name=f'{species}: {feature}',
+                line=dict(color=feature_colors[j % len(feature_colors)], dash=class_dashes[k])
+            ))
+    fig.add_vline(x=C, line_dash='dot', line_color='gray')
+    fig.update_layout(
+        title=f'Coefficient Trajectories ({solver})',
+        xaxis_title='C (inverse regularization strength)',
+        yaxis_title='Coefficient',
+        xaxis_type='log',
+        height=450
+    )
+    return fig
+
+@pipeline.stage()
+def diabetes():
+    # Load Diabetes progression dataset
+    return load_dataset('diabetes')
+
+@pipeline.stage(inputs=('test_size', 'random_state', 'store_ready'), after=('diabetes',), uses=('store',))
+def regressor(diabetes, test_size, random_state, store_ready, store):
+    # Train regression model (Linear Regression, looked up or cached like the classifier)
+    return regress(test_size, random_state, store if store_ready else None)
+
+@pipeline.stage(after=('regressor',), figure=True)
+def regression_figure(regressor):
+    # Predictions vs Actual scatter plot (WebGL or binned when large)
+    fig_reg = prediction_scatter(regressor.y_test, regressor.y_pred)
+    fig_reg.update_layout(
+        xaxis_title='Actual Progression',
+        yaxis_title='Predicted Progression',
+        legend=dict(
+            orientation="h",  # Horizontal
+            yanchor="bottom",
+            y=1.02,          # Just above plot
+            xanchor="center",
+            x=0.5            # Centered
+        ),
+        margin=dict(t=100)   # Space for legend
+    )
+    return fig_reg
+
+@pipeline.stage(inputs=('n_splits', 'n_repeats', 'random_state'), after=('diabetes',))
+def regressor_cv(diabetes, n_splits, n_repeats, random_state):
+    # RMSE and R² on every fold, all folds solved as one batched least-squares problem
+    return cross_validate_regressor('diabetes', n_splits, n_repeats, random_state)
+
+@pipeline.stage(after=('regressor_cv',), figure=True)
+def cv_rmse_figure(regressor_cv):
+    return fold_scores(
+        regressor_cv.scores['rmse'],
+        title=f'RMSE on {regressor_cv.n_folds} Folds',
+        y_title='RMSE',
+        color='#2c5aa0'
+    )
+
+if cross_validation:
+    targets = ['iris_figure', 'cv_accuracy_figure', 'cv_rmse_figure']
+else:
+    targets = ['iris_figure', 'confusion_figure', 'regression_figure']
+    if store is not None:
+        targets.append('accuracy_figure')
+    if show_path:
+        targets += ['path_accuracy_figure', 'coef_figure']
+run = pipeline.run(
+    targets,
+    profiler=profiler,
+    test_size=test_size,
+    n_splits=n_splits,
+    n_repeats=n_repeats,
+    random_state=int(random_state),
+    solver=solver,
+    C=C,
+    store_ready=store is not None,
+    store=store
+)
+st.sidebar.caption(
+    f"⚙️ Recomputed: {', '.join(run.computed) or 'nothing'} · "
+    f"reused: {', '.join(run.reused) or 'nothing'}"
+)
+
 # =========================================
 # CLASSIFICATION SECTION
 # =========================================
 st.subheader("🌸 Classification: Iris Flowers")
 
-# Load Iris dataset
-iris = load_iris()
-df = pd.DataFrame(iris.data, columns=iris.feature_names)
-df['target'] = iris.target
-df['species'] = df['target'].map({0: 'setosa', 1: 'versicolor', 2: 'virginica'})
+df = run['iris'].frame
 
 # Show dataset preview
 col1, col2 = st.columns(2)
@@ -55,64 +432,76 @@ with col1:
     st.write(f"📊 Shape: {df.shape[0]} samples, {df.shape[1]-2} features")
 
 with col2:
-    # Create scatter plot
-    fig = px.scatter(
-        df,
-        x='sepal length (cm)',
-        y='sepal width (cm)',
-        color='species',
-        title='Iris Dataset - Sepal Dimensions',
-        color_discrete_sequence=['#FF6B6B', '#4ECDC4', '#45B7D1']
-    )
-    st.plotly_chart(fig, width='stretch')
+    show_figure(run['iris_figure'], profiler, 'iris_figure')
 
-# Train model
-X = iris.data
-y = iris.target
+# Display metrics
+st.subheader("🎯 Model Performance")
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y,
-    test_size=test_size/100,
-    random_state=int(random_state)
-)
+metric_col1, metric_col2, metric_col3 = st.columns(3)
 
-model = LogisticRegression(max_iter=200)
-model.fit(X_train, y_train)
+if cross_validation:
+    clf_cv = run['classifier_cv']
+    n_samples = len(run['iris'].y)
 
-# Make predictions
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
+    with metric_col1:
+        st.metric("Accuracy", f"{clf_cv.mean('accuracy'):.2%}")
+        st.caption(f"± {clf_cv.std('accuracy'):.2%} (std over folds)")
 
-# Display metrics
-st.subheader("🎯 Model Performance")
+    with metric_col2:
+        st.metric("Folds", f"{n_splits} × {n_repeats}")
 
-metric_col1, metric_col2, metric_col3 = st.columns(3)
+    with metric_col3:
+        st.metric("Test Size per Fold", f"~{n_samples // n_splits}")
 
-with metric_col1:
-    st.metric("Accuracy", f"{accuracy:.2%}")
-
-with metric_col2:
-    st.metric("Train Size", len(X_train))
-
-with metric_col3:
-    st.metric("Test Size", len(X_test))
-
-# Confusion matrix
-cm = confusion_matrix(y_test, y_pred)
-fig_cm = px.imshow(
-    cm,
-    text_auto=True,
-    labels=dict(x="Predicted Class", y="actual Class"),
-    x=['Setosa', 'Versicolor', 'Virginica'],
-    y=['Setosa', 'Versicolor', 'Virginica'],
-    title='Confusion Matrix',
-    color_continuous_scale='Blues'
-)
+    show_figure(run['cv_accuracy_figure'], profiler, 'cv_accuracy_figure')
+
+    # Educational tip
+    st.info("💡 **Try this:** Add repeats and change the random state: the mean barely moves, "
+            "while a single split's accuracy jumps around!")
+else:
+    clf = run['classifier']
+    accuracy = clf.accuracy
+
+    with metric_col1:
+        st.metric("Accuracy", f"{accuracy:.2%}")
+
+    with metric_col2:
+        st.metric("Train Size", clf.n_train)
+
+    with metric_col3:
+        st.metric("Test Size", clf.n_test)
 
-st.plotly_chart(fig_cm, width='stretch')
+    # Confusion matrix
+    show_figure(run['confusion_figure'], profiler, 'confusion_figure')
 
-# Educational tip
-st.info("💡 **Try this:** Change the test size slider to see how it affects accuracy!")
+    if 'accuracy_figure' in run:
+        show_figure(run['accuracy_figure'], profiler, 'accuracy_figure')
+
+    # Educational tip
+    st.info("💡 **Try this:** Change the test size slider to see how it affects accuracy!")
+
+if show_path:
+    st.subheader("🎚️ Regularization Path")
+    path = run['paths'][solver]
+    i = path.index(C)
+
+    path_col1, path_col2, path_col3 = st.columns(3)
+
+    with path_col1:
+        st.metric("Test Accuracy", f"{path.test_accuracy[i]:.2%}")
+
+    with path_col2:
+        st.metric("Train Accuracy", f"{path.train_accuracy[i]:.2%}")
+
+    with path_col3:
+        st.metric("Solver Iterations", int(path.n_iter[i]))
+        if not path.converged[i]:
+            st.caption("⚠️ Hit the iteration limit")
+
+    show_figure(run['path_accuracy_figure'], profiler, 'path_accuracy_figure')
+    show_figure(run['coef_figure'], profiler, 'coef_figure')
+    st.caption(f"Each fit starts from the coefficients at the previous C (warm start), "
+               f"so {len(path.Cs)} fits per solver take only a few iterations each.")
 
 # ================================================
 # REGRESSION SECTION
@@ -121,99 +510,55 @@ st.info("💡 **Try this:** Change the test size slider to see how it affects ac
 st.markdown("---")
 st.subheader("🏠 Regression: Diabetes Progression")
 
-# Load Diabetes progression dataset
-
-diabetes = load_diabetes()
-diabetes_df = pd.DataFrame(diabetes.data, columns=diabetes.feature_names)
-diabetes_df['progression'] = diabetes.target
+diabetes_df = run['diabetes'].frame
 
 st.write("**Dataset Info:**")
 st.write("Predicting disease progression one year after baseline")
 st.write(f"📊 {diabetes_df.shape[0]} samples, {diabetes_df.shape[1]-1} features")
 
-# Train regression model
-X_diabetes = diabetes.data
-y_diabetes = diabetes.target
+if cross_validation:
+    reg_cv = run['regressor_cv']
+    show_figure(run['cv_rmse_figure'], profiler, 'cv_rmse_figure')
 
-X_train_d, X_test_d, y_train_d, y_test_d = train_test_split(
-    X_diabetes, y_diabetes,
-    test_size=test_size/100,
-    random_state=int(random_state)
-)
+    # Regression metrics
+    st.subheader("📈 Regression Metrics")
 
-# Linear Regression
-reg_model = LinearRegression()
-reg_model.fit(X_train_d, y_train_d)
-y_pred_d = reg_model.predict(X_test_d)
-
-#Calculate metrics
-rmse = np.sqrt(mean_squared_error(y_test_d, y_pred_d))
-r2 = r2_score(y_test_d, y_pred_d)
-
-# Predictions vs Actual scatter plot
-fig_reg = go.Figure()
-
-# Add scatter points
-fig_reg.add_trace(go.Scatter(
-    x=y_test_d,
-    y=y_pred_d,
-    mode='markers',
-    name='Predictions',
-    marker=dict(
-        size=6,
-        color=np.abs(y_test_d - y_pred_d),
-        colorscale='Viridis',
-        showscale=True,
-        colorbar=dict(title="Error")
-    ),
-    text=[f'Actual: {a:.1f}<br>Predicted: {p:.1f}'
-         for a, p in zip(y_test_d, y_pred_d)],
-    hovertemplate='%{text}<extra></extra>'
-))
-
-# Add perfect prediction line
-max_val = max(y_test_d.max(), y_pred_d.max())
-min_val = min(y_test_d.min(), y_pred_d.min())
-fig_reg.add_trace(go.Scatter(
-    x=[min_val, max_val],
-    y=[min_val, max_val],
-    mode='lines',
-    name='Perfect Predictions',
-    line=dict(color='red', dash='dash', width=2)
-))
-
-fig_reg.update_layout(
-    title='Predictions vs Actual Values',
-    xaxis_title='Actual Progression',
-    yaxis_title='Predicted Progression',
-    hovermode='closest',
-    legend=dict(
-        orientation="h",  # Horizontal
-        yanchor="bottom",
-        y=1.02,          # Just above plot
-        xanchor="center",
-        x=0.5            # Centered
-    ),
-    margin=dict(t=100)   # Space for legend
-)
+    reg_col1, reg_col2, reg_col3 = st.columns(3)
+
+    with reg_col1:
+        st.metric("RMSE", f"{reg_cv.mean('rmse'):.2f}")
+        st.caption(f"± {reg_cv.std('rmse'):.2f} (lower is better)")
+
+    with reg_col2:
+        st.metric("R² Score", f"{reg_cv.mean('r2'):.3f}")
+        st.caption(f"± {reg_cv.std('r2'):.3f} (closer to 1.0 is better)")
 
-st.plotly_chart(fig_reg, width='stretch')
+    with reg_col3:
+        st.metric("Folds", reg_cv.n_folds)
+else:
+    reg = run['regressor']
 
-# Regression metrics
-st.subheader("📈 Regression Metrics")
+    #Calculate metrics
+    rmse = reg.rmse
+    r2 = reg.r2
 
-reg_col1, reg_col2, reg_col3 = st.columns(3)
+    show_figure(run['regression_figure'], profiler, 'regression_figure')
 
-with reg_col1:
-    st.metric("RMSE", f"{rmse:.2f}")
-    st.caption("(Lower is better)")
+    # Regression metrics
+    st.subheader("📈 Regression Metrics")
 
-with reg_col2:
-    st.metric("R² Score", f"{r2:.3f}")
-    st.caption("(Closer to 1.0 is better)")
+    reg_col1, reg_col2, reg_col3 = st.columns(3)
 
-with reg_col3:
-    st.metric("Test samples", len(X_test_d))
+    with reg_col1:
+        st.metric("RMSE", f"{rmse:.2f}")
+        st.caption("(Lower is better)")
+
+    with reg_col2:
+        st.metric("R² Score", f"{r2:.3f}")
+        st.caption("(Closer to 1.0 is better)")
+
+    with reg_col3:
+        st.metric("Test samples", reg.n_test)
 
 
 st.info("""
@@ -222,3 +567,5 @@ st.info("""
 - **R²** (R-squared): How well the model explains the variance (1.0 = perfect)
 - Points near the red line = good predictions
 """)
+
+finish_profiling(profiler)
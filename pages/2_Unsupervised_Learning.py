@@ -1,12 +1,17 @@
+from pathlib import Path
+
 import streamlit as st
 import numpy as np
-import pandas as pd
-from sklearn.datasets import make_blobs
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from sklearn.metrics import silhouette_score
-import plotly.express as px
 import plotly.graph_objects as go
+from ml_explorer.clustering import K_VALUES, fit_kmeans, make_data, project_pca, score_kmeans, sweep_k
+from ml_explorer.figures import cached_figure
+from ml_explorer.overlay import finish_profiling, show_figure, start_profiling
+from ml_explorer.pipeline import Pipeline
+from ml_explorer.plotting import cluster_scatter, render_mode
+from ml_explorer.silhouette import EXACT_THRESHOLD
+from ml_explorer.streaming import fit_file, numeric_columns, save_upload
+
+SAMPLE_SIZES = list(range(100, 1001, 50)) + [2000, 5000, 10_000, 20_000, 50_000, 100_000, 200_000, 500_000]
 
 # Page configuration - MUST be first Streamlit command
 st.set_page_config(
@@ -14,12 +19,20 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
+profiler = start_profiling('Unsupervised Learning')
 
 # Page title
 st.title("🔍 Unsupervised Learning")
 st.markdown("## Clustering and Dimensionality Reduction")
 
 # Sidebar parameters
+st.sidebar.header("Data Source")
+source = st.sidebar.radio(
+    "Data",
+    ["Generated blobs", "Upload a file", "File path on server"],
+    label_visibility="collapsed"
+)
+
 st.sidebar.header("Clustering Parameters")
 n_clusters = st.sidebar.slider(
     "Number of Clusters (k)",
@@ -27,41 +40,244 @@ n_clusters = st.sidebar.slider(
     max_value=10,
     value=3
 )
-n_samples = st.sidebar.slider(
+
+# ========================================
+# OUT-OF-CORE MODE (uploaded or server-side files)
+# ========================================
+
+if source != "Generated blobs":
+    st.subheader("📂 Clustering Your Data")
+    st.caption(
+        "CSV and Parquet files are streamed in chunks and .npy files are memory-mapped; "
+        "MiniBatchKMeans and IncrementalPCA are fitted chunk by chunk, so memory stays bounded."
+    )
+
+    data_path = None
+    try:
+        if source == "Upload a file":
+            uploaded = st.file_uploader("Feature file", type=['csv', 'parquet', 'npy'])
+            if uploaded is not None:
+                data_path = save_upload(uploaded)
+        else:
+            typed_path = st.text_input("Path to a .csv, .parquet or .npy file")
+            if typed_path:
+                data_path = Path(typed_path).expanduser()
+                if not data_path.is_file():
+                    st.error(f"❌ File not found: {data_path}")
+                    st.stop()
+
+        if data_path is None:
+            st.info("👆 Choose a file to cluster")
+            st.stop()
+
+        with profiler.section('read columns'):
+            all_columns = numeric_columns(data_path)
+        selected = st.multiselect("Feature columns", all_columns, default=all_columns)
+        standardize = st.checkbox("Standardize features", value=True)
+
+        with st.spinner("Streaming file..."), profiler.section('out-of-core fit'):
+            result = fit_file(
+                str(data_path),
+                n_clusters,
+                columns=tuple(selected),
+                standardize=standardize,
+                modified=data_path.stat().st_mtime
+            )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Rows", f"{result.n_rows:,}")
+    with col2:
+        estimate = result.silhouette_estimate
+        st.metric("Silhouette Score (est.)", f"{estimate.score:.3f}")
+        st.caption(f"95% CI {estimate.ci_low:.3f}-{estimate.ci_high:.3f}")
+    with col3:
+        st.metric("Features", len(result.columns))
+
+    # Built once per fitted file, then served from the figure cache
+    def build_sizes():
+        import plotly.express as px
+
+        fig_sizes = px.bar(
+            x=[str(c) for c in range(n_clusters)],
+            y=result.cluster_sizes,
+            title='Cluster Sizes',
+            labels={'x': 'Cluster', 'y': 'Rows'}
+        )
+        fig_sizes.update_layout(height=350)
+        return fig_sizes
+
+    def build_variance():
+        import plotly.express as px
+
+        explained_var = result.explained_variance_ratio
+        fig_var = px.bar(
+            x=[f'PC{i+1}' for i in range(len(explained_var))],
+            y=explained_var,
+            title='Explained Variance by Component',
+            labels={'x': 'Component', 'y': 'Variance Explained'},
+            color=explained_var,
+            color_continuous_scale='Blues'
+        )
+        fig_var.update_layout(showlegend=False, height=350)
+        return fig_var
+
+    def build_sample():
+        fig = cluster_scatter(
+            result.sample_pca[:, 0],
+            result.sample_pca[:, 1],
+            result.sample_labels,
+            centers=result.centers_pca,
+            title=f'Random Sample of {len(result.sample_labels):,} Rows (PCA Projection)',
+            x_title='PC1',
+            y_title='PC2'
+        )
+        fig.update_layout(height=500)
+        return fig
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_sizes = cached_figure('cluster sizes', build_sizes, data=(result.cluster_sizes,))
+        show_figure(fig_sizes, profiler, 'cluster sizes')
+    with col2:
+        fig_var = cached_figure('variance', build_variance, data=(result.explained_variance_ratio,))
+        show_figure(fig_var, profiler, 'variance')
+
+    fig = cached_figure('sample scatter', build_sample,
+                        data=(result.sample_pca, result.sample_labels, result.centers_pca))
+    show_figure(fig, profiler, 'sample scatter')
+    finish_profiling(profiler)
+    st.stop()
+
+n_samples = st.sidebar.select_slider(
     "Number of Samples",
-    min_value=100,
-    max_value=1000,
+    options=SAMPLE_SIZES,
     value=300,
-    step=50
+    help=f"Above {EXACT_THRESHOLD:,} samples the silhouette score is estimated from a stratified sample"
+)
+sweep_mode = st.sidebar.checkbox(
+    f"Sweep k ({K_VALUES.start}-{K_VALUES.stop - 1})",
+    help="Fit every k at once so the slider just picks a cached result"
 )
 
 # ========================================
 # DATA GENERATION
 # ========================================
 
-# Generate sample data (4 features for PCA demo)
-X, true_labels = make_blobs(
-    n_samples=n_samples,
-    centers=5,
-    n_features=4,
-    random_state=42,
-    cluster_std=1.0
-)
+# Each stage is memoised on the parameters it depends on, so moving the
+# k slider reuses the data and the PCA projection instead of refitting them
+pipeline = Pipeline('unsupervised')
+
+@pipeline.stage(inputs=('n_samples',))
+def data(n_samples):
+    # Generate sample data (4 features for PCA demo)
+    return make_data(n_samples)
 
 # ========================================
 # CLUSTERING
 # ========================================
 
-# Perform K-Means clustering
-kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-cluster_labels = kmeans.fit_predict(X)
+@pipeline.stage(inputs=('n_samples', 'n_clusters'), after=('data',))
+def fit(data, n_samples, n_clusters):
+    # Perform K-Means clustering
+    return fit_kmeans(n_samples, n_clusters)
+
+@pipeline.stage(inputs=('n_samples', 'n_clusters'), after=('fit',))
+def metrics(fit, n_samples, n_clusters):
+    # Calculate silhouette score
+    return score_kmeans(n_samples, n_clusters)
+
+@pipeline.stage(inputs=('n_samples',), after=('data',))
+def sweep(data, n_samples):
+    # Fit and score every k in parallel; the fits land in the same caches
+    return sweep_k(n_samples)
+
+@pipeline.stage(inputs=('n_samples',), after=('data',))
+def projection(data, n_samples):
+    # Perform PCA for visualization (4D -> 2D)
+    return project_pca(n_samples)
+
+# ========================================
+# FIGURES
+# ========================================
+
+@pipeline.stage(after=('fit', 'projection'), figure=True)
+def cluster_figure(fit, projection):
+    # Visualize clusters (WebGL for many points, density map above that)
+    X_pca = projection.X_pca
+    fig = cluster_scatter(
+        X_pca[:, 0],
+        X_pca[:, 1],
+        fit.labels,
+        centers=projection.transform(fit.centers),
+        title='K-Means Clustering (PCA Visualization)',
+        x_title='First Principal Component (PC1)',
+        y_title='Second Principal Component (PC2)'
+    )
+    fig.update_layout(height=500)
+    return fig
+
+@pipeline.stage(inputs=('n_clusters',), after=('sweep',), figure=True)
+def sweep_figure(sweep, n_clusters):
+    # Elbow and silhouette curves from the sweep
+    from plotly.subplots import make_subplots
+
+    fig_sweep = make_subplots(specs=[[{"secondary_y": True}]])
+    fig_sweep.add_trace(go.Scatter(
+        x=sweep.ks,
+        y=sweep.inertia,
+        mode='lines+markers',
+        name='Inertia (elbow)',
+        line=dict(color='#2c5aa0')
+    ), secondary_y=False)
+    fig_sweep.add_trace(go.Scatter(
+        x=sweep.ks,
+        y=sweep.silhouette,
+        mode='lines+markers',
+        name='Silhouette Score',
+        line=dict(color='#ff6b6b')
+    ), secondary_y=True)
+    fig_sweep.add_vline(x=n_clusters, line_dash='dash', line_color='gray')
+    fig_sweep.update_layout(
+        title='Choosing k: Inertia and Silhouette Score',
+        xaxis_title='Number of Clusters (k)',
+        height=400
+    )
+    fig_sweep.update_yaxes(title_text='Inertia', secondary_y=False)
+    fig_sweep.update_yaxes(title_text='Silhouette Score', secondary_y=True)
+    return fig_sweep
+
+@pipeline.stage(after=('projection',), figure=True)
+def variance_figure(projection):
+    # Variance bar chart
+    import plotly.express as px
 
-# Calculate silhouette score
-silhouette = silhouette_score(X, cluster_labels)
+    explained_var = projection.explained_variance_ratio
+    fig_var = px.bar(
+        x=['PC1', 'PC2'],
+        y=explained_var,
+        title='Explained Variance by Component',
+        labels={'x': 'Component', 'y': 'Variance Explained'},
+        color=explained_var,
+        color_continuous_scale='Blues'
+    )
+    fig_var.update_layout(showlegend=False, height=300)
+    return fig_var
 
-# Perform PCA for visualization (4D -> 2D)
-pca = PCA(n_components=2)
-X_pca = pca.fit_transform(X)
+# Sweep first so the parallel fits fill the caches the k slider reads
+targets = ['sweep_figure'] if sweep_mode else []
+targets += ['metrics', 'cluster_figure', 'variance_figure']
+run = pipeline.run(targets, profiler=profiler, n_samples=n_samples, n_clusters=n_clusters)
+
+silhouette_estimate = run['metrics']
+silhouette = silhouette_estimate.score
+st.sidebar.caption(
+    f"⚙️ Recomputed: {', '.join(run.computed) or 'nothing'} · "
+    f"reused: {', '.join(run.reused) or 'nothing'}"
+)
 
 # ========================================
 # DISPLAY RESULTS
@@ -77,47 +293,33 @@ with col1:
 with col2:
     st.metric("Silhouette Score", f"{silhouette:.3f}")
     quality = "Excellent!" if silhouette > 0.7 else "Good!" if silhouette > 0.5 else "Fair"
-    st.caption(f"({quality})")
+    if silhouette_estimate.exact:
+        st.caption(f"({quality})")
+    else:
+        st.caption(
+            f"({quality}) 95% CI {silhouette_estimate.ci_low:.3f}-{silhouette_estimate.ci_high:.3f}, "
+            f"estimated from {silhouette_estimate.n_evaluated:,} stratified samples"
+        )
 
 with col3:
-    st.metric("Samples", n_samples)
+    st.metric("Samples", f"{n_samples:,}")
 
 # ========================================
 # CLUSTER VISUALIZATION
 # ========================================
 
-# Visualize clusters
-fig = px.scatter(
-    x=X_pca[:, 0],
-    y=X_pca[:, 1],
-    color=cluster_labels.astype(str),
-    title='K-Means Clustering (PCA Visualization)',
-    labels={
-        'x': 'First Principal Component (PC1)',
-        'y': 'Second Principal Component (PC2)',
-        'color': 'Cluster'
-    },
-    color_discrete_sequence=px.colors.qualitative.Set3
-)
+show_figure(run['cluster_figure'], profiler, 'cluster_figure')
+if render_mode(n_samples) == 'density':
+    st.caption(f"🗺️ {n_samples:,} points binned on the server into a density map; ✕ marks the cluster centroids")
+
+# Elbow and silhouette curves from the sweep
+if sweep_mode:
+    show_figure(run['sweep_figure'], profiler, 'sweep_figure')
 
-# Add cluster centers
-centers_pca = pca.transform(kmeans.cluster_centers_)
-fig.add_trace(go.Scatter(
-    x=centers_pca[:, 0],
-    y=centers_pca[:, 1],
-    mode='markers',
-    marker=dict(
-        size=20,
-        symbol='x',
-        color='black',
-        line=dict(width=2, color='white')
-    ),
-    name='Centroids',
-    showlegend=True
-))
-
-fig.update_layout(height=500)
-st.plotly_chart(fig, use_container_width=True)
+    sweep_result = run['sweep']
+    best = int(np.argmax(sweep_result.silhouette))
+    st.caption(f"🏆 Highest silhouette score at k={sweep_result.ks[best]} "
+               f"({sweep_result.silhouette[best]:.3f})")
 
 # Educational info
 st.info("""
@@ -138,7 +340,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.write("**Explained Variance:**")
-    explained_var = pca.explained_variance_ratio_
+    explained_var = run['projection'].explained_variance_ratio
     st.write(f"• PC1 explains: **{explained_var[0]:.1%}** of variance")
     st.write(f"• PC2 explains: **{explained_var[1]:.1%}** of variance")
     st.write(f"• Total explained: **{sum(explained_var):.1%}**")
@@ -148,17 +350,7 @@ with col1:
             """)
 
 with col2:
-    # Variance bar chart
-    fig_var = px.bar(
-        x=['PC1', 'PC2'],
-        y=explained_var,
-        title='Explained Variance by Component',
-        labels={'x': 'Component', 'y': 'Variance Explained'},
-        color=explained_var,
-        color_continuous_scale='Blues'
-    )
-    fig_var.update_layout(showlegend=False, height=300)
-    st.plotly_chart(fig_var, use_container_width=True)
+    show_figure(run['variance_figure'], profiler, 'variance_figure')
 
 # =====================================
 # EDUCATIONAL SECTION
@@ -185,3 +377,5 @@ st.markdown(f"""
 - Image compression (reducing file size)
 - Anomaly detection (finding outliers)
 """)
+
+finish_profiling(profiler)
@@ -1,6 +1,64 @@
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+from ml_explorer.checkpoint import CHECKPOINT_DIR, list_checkpoints, load_checkpoint, save_checkpoint, store_upload
+from ml_explorer.dyna import PLANNING_MODES, DynaPlanner, compare_planning
+from ml_explorer.downsample import lttb, minmax_downsample
+from ml_explorer.figures import cached_figure
+from ml_explorer.gridworld import MAX_GRID_SIZE, GridWorld
+from ml_explorer.history import RewardHistory
+from ml_explorer.overlay import finish_profiling, show_figure, start_profiling
+from ml_explorer.pipeline import Pipeline
+from ml_explorer.planning import value_iteration
+from ml_explorer.plotting import q_value_heatmap
+from ml_explorer.qlearning import init_q_tables, state_values
+from ml_explorer.training import TrainingWorker
+from ml_explorer.tuning import (ALPHAS, EPSILONS, FINAL_EPISODES, GAMMAS, SETTLE_FRACTION, SETTLE_WINDOW,
+                                SweepRunner, find_sweep)
+
+# Most Q-values kept per session (agents x states x actions)
+Q_TABLE_BUDGET = 20_000_000
+
+# Seconds between progress refreshes while training runs in the background
+REFRESH_SECONDS = 0.5
+
+# Most points per learning-curve trace sent to the browser
+MAX_CHART_POINTS = 2000
+
+PLANNING_LABELS = {
+    'none': "None (plain Q-learning)",
+    'dyna': "Dyna-Q",
+    'prioritized': "Prioritized sweeping",
+}
+
+# Initial values of the widgets a checkpoint restores. They are set through
+# session state (not the widgets' value=) so that resuming can override them.
+WIDGET_DEFAULTS = {
+    'layout': "Classic 5×5",
+    'grid_size': 20,
+    'wall_density': 0.15,
+    'n_pits': 3,
+    'n_goals': 1,
+    'layout_seed': 0,
+    'learning_rate': 0.8,
+    'discount': 0.95,
+    'epsilon': 0.1,
+    'planning': 'none',
+    'n_planning': 10,
+    'n_agents': 1,
+}
+
+# Grid values selected when the sweep section first opens
+SWEEP_DEFAULTS = {
+    'sweep_alphas': [0.1, 0.3, 0.5, 0.7, 0.9],
+    'sweep_gammas': [0.5, 0.7, 0.8, 0.9, 0.95, 1.0],
+    'sweep_epsilons': [0.0, 0.05, 0.1, 0.2, 0.3],
+}
 
 # Page configuration - MUST be first Streamlit command
 st.set_page_config(
@@ -8,221 +66,569 @@ st.set_page_config(
     page_icon="🤖",
     layout="wide"
 )
+profiler = start_profiling('Reinforcement Learning')
 
 # Page title
 st.title("🎮 Reinforcement Learning")
 st.markdown("## Q-Learning Grid World")
 
-# ====================================
-# SESSION STATE INITIALIZATION
-# ====================================
-
-# Initialize Q-table in session state
-if 'q_table' not in st.session_state:
-    st.session_state.q_table = np.zeros((5, 5, 4)) # 5x5 grid, 4 actions
-    st.session_state.episodes_run = 0
-    st.session_state.rewards_history = []
-
 # ====================================
 # PARAMETERS
 # ====================================
 
 # Sidebar parameters
+st.sidebar.header("Grid World")
+for key, default in WIDGET_DEFAULTS.items():
+    st.session_state.setdefault(key, default)
+
+layout = st.sidebar.selectbox("Layout", ["Classic 5×5", "Random"], key='layout')
+if layout == "Random":
+    grid_size = st.sidebar.slider("Grid Size", 5, MAX_GRID_SIZE, step=5, key='grid_size')
+    wall_density = st.sidebar.slider("Wall Density", 0.0, 0.4, step=0.05, key='wall_density')
+    n_pits = st.sidebar.slider("Pits", 0, 50, key='n_pits')
+    n_goals = st.sidebar.slider("Goals", 1, 5, key='n_goals')
+    layout_seed = st.sidebar.number_input("Layout Seed", min_value=0, max_value=1000, key='layout_seed')
+    layout_key = (grid_size, wall_density, n_pits, n_goals, int(layout_seed))
+else:
+    layout_key = None
+
 st.sidebar.header("Q-Learning Parameters")
-learning_rate = st.sidebar.slider("Learning Rate (α)", 0.1, 1.0, 0.8, 0.1)
-discount = st.sidebar.slider("Discount Factor (γ)", 0.1, 1.0, 0.95, 0.05)
-epsilon = st.sidebar.slider("Exploration Rate (ε)", 0.0, 1.0, 0.1, 0.05)
+learning_rate = st.sidebar.slider("Learning Rate (α)", 0.1, 1.0, step=0.1, key='learning_rate')
+discount = st.sidebar.slider("Discount Factor (γ)", 0.1, 1.0, step=0.05, key='discount')
+epsilon = st.sidebar.slider("Exploration Rate (ε)", 0.0, 1.0, step=0.05, key='epsilon')
+# The running worker uses the session's planner, so planning is fixed until it finishes
+training_now = st.session_state.get('worker') is not None
+planning = st.sidebar.selectbox(
+    "Planning",
+    PLANNING_MODES,
+    format_func=PLANNING_LABELS.get,
+    key='planning',
+    disabled=training_now,
+    help="Learn a model from real steps and replay simulated updates from it after every step"
+)
+n_planning = 0
+if planning != 'none':
+    n_planning = st.sidebar.slider("Planning updates per step", 1, 50, key='n_planning',
+                                   disabled=training_now)
 
 episodes_to_train = st.sidebar.number_input(
     "Episodes to train",
     min_value=1,
-    max_value=1000,
+    max_value=10000,
     value=100
 )
 
-# ===================================
-# GRID WORLD CONSTANTS
-# ===================================
-
-GRID_SIZE = 5
-START = (0, 0)
-GOAL = (4, 4)
-ACTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # right, down, left, up
-ACTION_NAMES = ['→', '↓', '←', '↑']
-
-# ==================================
-# Q-LEARNING ALGORITHM
-# ==================================
-
-def train_episode(q_table, learning_rate, discount, epsilon):
-    """
-    Run one episode of Q-learning.
-
-    The agent starts at START and tries to reach GOAL by:
-    1. Choosing actions (epsilon-greedy)
-    2. Receiving rewards
-    3. Updating Q-values using Bellman equation
-
-    Parameters:
-    -----------
-    q_table : numpy.ndarray
-        3D array of Q-values (rows × cols × actions)
-    learning_rate : float
-        How much to update Q-values (0-1)
-    discount : float
-        How much to value future rewards (0-1)
-    epsilon : float
-        Probability of random action (0-1)
-
-    Returns:
-    --------
-    episode_reward : float
-        Total reward accumulated in this episode
-    """
-
-    state = START
-    episode_reward = 0
-    steps = 0
-
-    while state != GOAL and steps < 50:
-        # Epsilon-greedy action selection
-        if np.random.random() < epsilon:
-            action = np.random.randint(4) # Explore
-        else:
-            action = np.argmax(q_table[state[0], state[1], :]) # Exploit
-
-        # Take action
-        new_row = max(0, min(GRID_SIZE-1, state[0] + ACTIONS[action][0]))
-        new_col = max(0, min(GRID_SIZE-1, state[1] + ACTIONS[action][1]))
-        new_state = (new_row, new_col)
-
-        # Calculate reward
-        if new_state == GOAL:
-            reward = 100
-        else:
-            reward = -1
-        episode_reward += reward
+# ====================================
+# ENVIRONMENT
+# ====================================
 
-        # Q-learning update (Bellman equation)
-        old_value = q_table[state[0], state[1], action]
+@st.cache_resource(max_entries=8)
+def build_world(layout_key):
+    """Build (and precompute the tables of) a grid world once per layout."""
+    if layout_key is None:
+        return GridWorld.classic()
+    grid_size, wall_density, n_pits, n_goals, seed = layout_key
+    return GridWorld.random(grid_size, grid_size, wall_density, n_pits, n_goals, seed)
+
+try:
+    with profiler.section('world'):
+        env = build_world(layout_key)
+except ValueError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+
+# Keep the Q-tensor (agents x states x 4 actions) within a fixed number of entries;
+# the planning model holds three more arrays of the same size
+tables = 4 if planning != 'none' else 1
+max_agents = int(np.clip(Q_TABLE_BUDGET // (env.n_states * env.n_actions * tables), 1, 500))
+n_agents = st.sidebar.slider(
+    "Agents (independent seeds)",
+    min_value=1,
+    max_value=max_agents,
+    key='n_agents',
+    help="Train many agents at once to see how much learning varies between runs"
+)
 
-        if new_state == GOAL:
-            next_max = 0 # No future value at terminal state
-        else:
-            next_max = np.max(q_table[new_state[0], new_state[1], :])
+# ====================================
+# SESSION STATE INITIALIZATION
+# ====================================
 
-        new_value = old_value + learning_rate * (
-            reward + discount * next_max - old_value
-        )
-        q_table[state[0], state[1], action] = new_value
+def reset_agents(n_agents):
+    """Start a fresh batch of agents with no training history."""
+    if st.session_state.get('worker') is not None:
+        st.session_state.worker.stop()
+    st.session_state.worker = None
+    st.session_state.q_table = init_q_tables(env, n_agents) # agents x rows x cols x 4 actions
+    st.session_state.episodes_run = 0
+    st.session_state.rewards_history = RewardHistory(n_agents)
+    st.session_state.q_error_history = RewardHistory(n_agents)    # RMS error against Q*
+    st.session_state.agreement_history = RewardHistory(n_agents)  # share of optimal greedy actions
+    st.session_state.rng = np.random.default_rng()
+    st.session_state.planner = None
+    st.session_state.layout_key = layout_key
+    st.session_state.q_version = uuid.uuid4().hex
+
+# Initialize Q-tables in session state (a new layout or agent count starts over)
+if ('q_table' not in st.session_state
+        or 'q_error_history' not in st.session_state
+        or st.session_state.q_table.shape[:3] != (n_agents, env.rows, env.cols)
+        or st.session_state.layout_key != layout_key):
+    reset_agents(n_agents)
+
+# Fresh agents (or resumed ones) start with an empty planning model, allocated on
+# first use; the model is kept when the planning mode changes
+if st.session_state.get('planner') is None:
+    st.session_state.planner = DynaPlanner(env, n_agents, planning, n_planning)
+elif not training_now:
+    st.session_state.planner.mode = planning
+    st.session_state.planner.n_updates = n_planning
 
-        state = new_state
-        steps += 1
+# ====================================
+# CHECKPOINTS
+# ====================================
 
-    return episode_reward
+def resume_checkpoint(path):
+    """Callback: restore agents, history and widget values from a checkpoint file."""
+    try:
+        checkpoint = load_checkpoint(path)
+    except (OSError, ValueError) as e:
+        st.session_state.flash = ("error", f"❌ Could not load checkpoint: {e}")
+        return
+
+    # Runs before the script, so the widgets pick these values up
+    if checkpoint.layout_key is None:
+        st.session_state.layout = "Classic 5×5"
+    else:
+        st.session_state.layout = "Random"
+        (st.session_state.grid_size, st.session_state.wall_density, st.session_state.n_pits,
+         st.session_state.n_goals, st.session_state.layout_seed) = checkpoint.layout_key
+    for name, value in checkpoint.params.items():
+        st.session_state[name] = value
+    st.session_state.n_agents = checkpoint.n_agents
+
+    if st.session_state.get('worker') is not None:
+        st.session_state.worker.stop()
+    st.session_state.worker = None
+    # Memory-mapped and read-only; the next training run works on a copy
+    st.session_state.q_table = checkpoint.q_tables
+    st.session_state.rewards_history = checkpoint.history()
+    # Distances to Q* are not stored; they are tracked again from here on
+    st.session_state.q_error_history = RewardHistory(checkpoint.n_agents)
+    st.session_state.agreement_history = RewardHistory(checkpoint.n_agents)
+    # The planning model is not stored either and is learned again
+    st.session_state.planner = None
+    st.session_state.episodes_run = checkpoint.episodes_run
+    st.session_state.rng = checkpoint.rng()
+    st.session_state.layout_key = checkpoint.layout_key
+    st.session_state.q_version = uuid.uuid4().hex
+    st.session_state.flash = ("success", f"📂 Resumed {Path(path).name} "
+                                         f"({checkpoint.episodes_run} episodes)")
+
+
+def resume_upload():
+    """Callback: store an uploaded checkpoint on the server, then resume it."""
+    uploaded = st.session_state.checkpoint_upload
+    if uploaded is None:
+        return
+    try:
+        path = store_upload(uploaded.getvalue(), uploaded.name)
+    except (OSError, ValueError) as e:
+        st.session_state.flash = ("error", f"❌ Could not load checkpoint: {e}")
+        return
+    resume_checkpoint(path)
+
+
+def write_checkpoint(path):
+    return save_checkpoint(
+        path,
+        st.session_state.q_table,
+        st.session_state.rewards_history,
+        st.session_state.episodes_run,
+        dict(learning_rate=learning_rate, discount=discount, epsilon=epsilon),
+        layout_key,
+        st.session_state.rng
+    )
+
+
+def save_to_server():
+    """Callback: write the current agents to the server's checkpoint folder."""
+    name = f"gridworld-{n_agents}x{st.session_state.episodes_run}-{time.strftime('%Y%m%d-%H%M%S')}.mlxq"
+    path = write_checkpoint(CHECKPOINT_DIR / name)
+    st.session_state.flash = ("success", f"💾 Saved {path.name}")
+
+
+def checkpoint_download():
+    """Serialiser of the agents as they are in this run, called only when Download is clicked."""
+    q_table, history = st.session_state.q_table, st.session_state.rewards_history
+    episodes_run = st.session_state.episodes_run
+    rng = np.random.default_rng()
+    rng.bit_generator.state = st.session_state.rng.bit_generator.state
+    params = dict(learning_rate=learning_rate, discount=discount, epsilon=epsilon)
+
+    def serialise():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'checkpoint.mlxq'
+            save_checkpoint(path, q_table, history, episodes_run, params, layout_key, rng)
+            return path.read_bytes()
+    return serialise
+
+
+# Re-checked: a layout or agent-count change above stops the worker
+training_now = st.session_state.worker is not None
+st.sidebar.header("Checkpoints")
+st.sidebar.button("💾 Save on Server", on_click=save_to_server, disabled=training_now,
+                  width='stretch')
+st.sidebar.download_button(
+    "⬇️ Download Checkpoint",
+    data=checkpoint_download(),
+    file_name=f"gridworld-{n_agents}x{st.session_state.episodes_run}.mlxq",
+    mime='application/octet-stream',
+    disabled=training_now,
+    width='stretch'
+)
+saved = list_checkpoints()
+if saved:
+    chosen = st.sidebar.selectbox("Saved checkpoints", saved, format_func=lambda p: p.name)
+    st.sidebar.button("📂 Resume", on_click=resume_checkpoint, args=(chosen,), disabled=training_now,
+                      width='stretch')
+st.sidebar.file_uploader("Upload checkpoint", type=['mlxq'], key='checkpoint_upload',
+                         on_change=resume_upload, disabled=training_now)
+
+# Exact solution for the current layout and discount, the reference the
+# agents are measured against while they train
+with profiler.section('optimal Q*'):
+    q_star = value_iteration(env, discount)
 
 # ========================================
 # INFO SECTION
 # ========================================
 
-st.info("""
-🎯 **Goal:** Train an agent to navigate from START (0,0) to GOAL (4,4)
+goals_text = ", ".join(str(g) for g in env.goals)
+st.info(f"""
+🎯 **Goal:** Train an agent to navigate from START {env.start} to GOAL {goals_text}
 
 **How it works:**
 - Agent learns through trial and error
 - Receives +100 reward for reaching goal, -1 for each step
+- Falling into a pit costs -100 and ends the episode; walls block movement
 - Q-values represent "quality" of taking each action in each state
 - Higher Q-value = better action
 """)
 
+if layout_key is not None:
+    st.caption(
+        f"🧱 {env.rows}×{env.cols} grid: {env.n_states:,} states, "
+        f"{len(env.walls):,} walls, {len(env.pits)} pits, {len(env.goals)} goals, "
+        f"episodes capped at {env.max_steps} steps"
+    )
+
 # ========================================
 # TRAINING SECTION
 # ========================================
 
-col1, col2 = st.columns([1, 2])
-
-with col1:
-    if st.button("🚀 Train Agent", type="primary"):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        rewards = []
-        for i in range(episodes_to_train):
-            reward = train_episode(
-                st.session_state.q_table,
-                learning_rate,
-                discount,
-                epsilon
+def collect_training(worker):
+    """Fold the episodes a finished or stopped worker completed into the session."""
+    st.session_state.worker = None
+    if worker.error is not None:
+        # A failed episode may have left the worker's copy half-updated, keep ours
+        st.session_state.flash = ("error", f"❌ Training failed: {worker.error}")
+        return
+
+    rewards = worker.rewards()
+    q_error, agreement = worker.optimality()
+    st.session_state.q_table = worker.q_tables
+    st.session_state.rng = worker.rng
+    st.session_state.rewards_history.extend(rewards)
+    st.session_state.q_error_history.extend(q_error)
+    st.session_state.agreement_history.extend(agreement)
+    st.session_state.episodes_run += len(rewards)
+    st.session_state.q_version = uuid.uuid4().hex
+    verb = "Stopped after" if worker.stopped else "Trained"
+    cost = f"{worker.env_steps / n_agents:,.0f} steps per agent"
+    if worker.planning_updates:
+        cost += f" + {worker.planning_updates / n_agents:,.0f} planning updates"
+    st.session_state.flash = ("success", f"✅ {verb} {len(rewards)} episodes x {n_agents} agents "
+                                         f"in {worker.seconds:.1f}s ({cost})")
+
+
+# While a worker is alive the panel polls it on a timer instead of on every episode
+training = st.session_state.worker is not None
+
+@st.fragment(run_every=REFRESH_SECONDS if training else None)
+def training_panel():
+    worker = st.session_state.worker
+    if worker is not None and not worker.running:
+        collect_training(worker)
+        st.rerun()
+
+    col1, col2 = st.columns([1, 2])
+
+    with col1:
+        if worker is None:
+            if st.button("🚀 Train Agent", type="primary"):
+                st.session_state.worker = TrainingWorker(
+                    env,
+                    st.session_state.q_table,
+                    episodes_to_train,
+                    learning_rate,
+                    discount,
+                    epsilon,
+                    st.session_state.rng,
+                    q_star=q_star,
+                    planner=st.session_state.planner
+                ).start()
+                st.rerun()
+        elif st.button("⏹️ Stop Training", disabled=worker.stopped):
+            worker.stop()
+
+        if st.button("🔄 Reset Agent"):
+            reset_agents(n_agents)
+            st.session_state.flash = ("success", "Agent reset!")
+            st.rerun()
+
+        if 'flash' in st.session_state:
+            kind, message = st.session_state.pop('flash')
+            getattr(st, kind)(message)
+
+    with col2:
+        if worker is None:
+            st.metric("Total Episodes Trained", st.session_state.episodes_run)
+            if n_agents > 1:
+                st.caption(f"Each episode runs {n_agents} independent agents in one batch")
+            return
+
+        done = worker.episodes_done
+        st.metric("Total Episodes Trained", st.session_state.episodes_run + done)
+        st.progress(done / worker.n_episodes)
+        status = "Stopping" if worker.stopped else "Training"
+        st.text(f"{status}... {done}/{worker.n_episodes}")
+
+        # Live reward curve for the episodes finished so far in this run
+        mean_reward = worker.mean_rewards()
+        if len(mean_reward):
+            x, y = minmax_downsample(np.arange(1, len(mean_reward) + 1), mean_reward, MAX_CHART_POINTS)
+            fig_live = go.Figure(go.Scatter(
+                x=x,
+                y=y,
+                mode='lines',
+                line=dict(color='#2c5aa0', width=1)
+            ))
+            fig_live.update_layout(
+                title='Live Episode Reward',
+                xaxis_title='Episode (this run)',
+                yaxis_title='Mean Reward',
+                height=250,
+                margin=dict(t=40, b=20)
             )
-            rewards.append(reward)
-            st.session_state.rewards_history.append(reward)
-
-            # Update progress
-            progress_bar.progress((i + 1) / episodes_to_train)
-            status_text.text(f"Training... {i+1}/{episodes_to_train}")
-
-        st.session_state.episodes_run += episodes_to_train
-        progress_bar.empty()
-        status_text.empty()
-        st.success(f"✅ Trained {episodes_to_train} episodes!")
+            st.plotly_chart(fig_live, width='stretch')
+        st.caption("The heatmap and learning curve below update when training finishes.")
 
-    if st.button("🔄 Reset Agent"):
-        st.session_state.q_table = np.zeros((5, 5, 4))
-        st.session_state.episodes_run = 0
-        st.session_state.rewards_history = []
-        st.success("Agent reset!")
-
-with col2:
-    st.metric("Total Episodes Trained", st.session_state.episodes_run)
+training_panel()
 
 # ========================================
-# Q-VALUES VISUALIZATION
+# FIGURES
 # ========================================
 
-st.subheader("🗺️ Learned Q-Values Heatmap")
+# Figures are rebuilt only when the Q-tables change (a finished run or a
+# reset issues a new q_version), not on every slider move
+pipeline = Pipeline('reinforcement')
+
+@pipeline.stage(inputs=('q_version', 'layout_key'), uses=('env', 'q_table', 'episodes_run'), figure=True)
+def q_heatmap(q_version, layout_key, env, q_table, episodes_run):
+    # Get max Q-value for each state, averaged over agents (walls left blank)
+    q_values = state_values(env, q_table, trained=episodes_run > 0)
+
+    title = 'Q-Values Heatmap (brighter = better)'
+    if q_table.shape[0] > 1:
+        title = f'Mean Q-Values over {q_table.shape[0]} Agents (brighter = better)'
+    return q_value_heatmap(env, q_values, title)
+
+@pipeline.stage(inputs=('layout_key', 'discount'), uses=('env', 'q_star'), figure=True)
+def optimal_heatmap(layout_key, discount, env, q_star):
+    # Unreachable cells and walls are NaN and left blank
+    values = q_star.values.reshape(env.rows, env.cols).copy()
+    values[env.is_goal.reshape(env.rows, env.cols)] = env.goal_reward
+    return q_value_heatmap(env, values, f'Optimal State Values V* (γ = {discount:g})')
+
+@pipeline.stage(inputs=('q_version',), uses=('history',), figure=True)
+def progress_figure(q_version, history):
+    # Summary curves are kept up to date by the history as episodes arrive;
+    # only a bounded number of points per trace is sent to the browser
+    n_agents = history.n_agents
+    episodes = np.arange(1, len(history) + 1)
 
-# Get max Q-value for each state
-q_values = np.max(st.session_state.q_table, axis=2)
+    # Learning curve
+    fig_progress = go.Figure()
+    if n_agents > 1:
+        x_band, high = minmax_downsample(episodes, history.high, MAX_CHART_POINTS)
+        x_low, low = minmax_downsample(episodes, history.low, MAX_CHART_POINTS)
+        fig_progress.add_trace(go.Scatter(
+            x=np.concatenate([x_band, x_low[::-1]]),
+            y=np.concatenate([high, low[::-1]]),
+            fill='toself',
+            fillcolor='rgba(44, 90, 160, 0.2)',
+            line=dict(width=0),
+            hoverinfo='skip',
+            name='10th-90th Percentile'
+        ))
+    x, y = minmax_downsample(episodes, history.mean, MAX_CHART_POINTS)
+    fig_progress.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name='Mean Episode Reward' if n_agents > 1 else 'Episode Reward',
+        line=dict(color='#2c5aa0', width=1)
+    ))
 
+    # Add moving average if enough data
+    window = history.window
+    if len(history) > window:
+        x, y = lttb(episodes[window-1:], history.moving_average[window-1:], MAX_CHART_POINTS)
+        fig_progress.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=f'{window}-Episode Average',
+            line=dict(color='#ff6b6b', width=2)
+        ))
+
+    fig_progress.update_layout(
+        title='Rewards Over Time',
+        xaxis_title='Episode',
+        yaxis_title='Total Reward',
+        hovermode='x unified',
+        height=400
+    )
+    return fig_progress
+
+@pipeline.stage(inputs=('q_version',), uses=('q_error_history', 'agreement_history', 'episodes_run'),
+                figure=True)
+def optimality_figure(q_version, q_error_history, agreement_history, episodes_run):
+    # Tracking may have started after a resumed checkpoint, so align on the last episode
+    episodes = np.arange(episodes_run - len(q_error_history) + 1, episodes_run + 1)
+
+    fig_optimal = go.Figure()
+    x, y = minmax_downsample(episodes, q_error_history.mean, MAX_CHART_POINTS)
+    fig_optimal.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name='RMS Error vs Q*',
+        line=dict(color='#ff6b6b', width=2)
+    ))
+    x, y = minmax_downsample(episodes, agreement_history.mean, MAX_CHART_POINTS)
+    fig_optimal.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name='Optimal Greedy Actions',
+        yaxis='y2',
+        line=dict(color='#4ECDC4', width=2)
+    ))
+
+    fig_optimal.update_layout(
+        title='Distance to the Optimal Solution',
+        xaxis_title='Episode',
+        yaxis=dict(title='‖Q − Q*‖ (RMS)', rangemode='tozero'),
+        yaxis2=dict(title='States with an Optimal Action', overlaying='y', side='right',
+                    range=[0, 1], tickformat='.0%', showgrid=False),
+        hovermode='x unified',
+        legend=dict(orientation='h', y=-0.2),
+        height=400
+    )
+    return fig_optimal
+
+MODE_COLORS = {'none': '#2c5aa0', 'dyna': '#ff6b6b', 'prioritized': '#4ECDC4'}
+
+@pipeline.stage(inputs=('comparison',), uses=('env',))
+def planning_comparison(comparison, env):
+    # Same agents, seed and episodes for every mode; Q* for the compared discount
+    _, learning_rate, discount, epsilon, n_agents, n_updates, n_episodes = comparison
+    return compare_planning(env, value_iteration(env, discount), n_agents, n_episodes,
+                            learning_rate, discount, epsilon, n_updates)
+
+@pipeline.stage(after=('planning_comparison',), figure=True)
+def comparison_figure(planning_comparison):
+    from plotly.subplots import make_subplots
+
+    fig_compare = make_subplots(rows=1, cols=2, shared_yaxes=True,
+                                subplot_titles=('Per Environment Step', 'Per Second of Training'))
+    for mode, trace in planning_comparison.items():
+        for col, x in ((1, trace.steps), (2, trace.seconds)):
+            fig_compare.add_trace(go.Scatter(
+                x=x,
+                y=trace.error,
+                mode='lines',
+                name=PLANNING_LABELS[mode],
+                legendgroup=mode,
+                showlegend=col == 1,
+                line=dict(color=MODE_COLORS[mode], width=2)
+            ), row=1, col=col)
+    fig_compare.update_xaxes(title_text='Environment steps per agent', row=1, col=1)
+    fig_compare.update_xaxes(title_text='Seconds', row=1, col=2)
+    fig_compare.update_yaxes(title_text='‖Q − Q*‖ (RMS)', rangemode='tozero', row=1, col=1)
+    fig_compare.update_layout(
+        title='Convergence to the Optimal Solution',
+        hovermode='x unified',
+        legend=dict(orientation='h', y=-0.25),
+        height=420
+    )
+    return fig_compare
+
+st.subheader("🗺️ Q-Values Heatmap")
+show_optimal = st.radio(
+    "Heatmap",
+    ["Learned Q-values", "Optimal (value iteration)"],
+    horizontal=True,
+    label_visibility='collapsed'
+) != "Learned Q-values"
+
+targets = ['optimal_heatmap' if show_optimal else 'q_heatmap']
 if st.session_state.episodes_run > 0:
-    q_values[GOAL[0], GOAL[1]] = 100
-
-# Create heatmap
-fig_q = go.Figure(data=go.Heatmap(
-    z=q_values,
-    colorscale='Viridis',
-    text=np.round(q_values, 1),
-    texttemplate='%{text}',
-    textfont={"size": 10},
-    colorbar=dict(title="Q-Value")
-))
-
-# Add START and GOAL annotations
-fig_q.add_annotation(
-    x=0, y=0,
-    text="START",
-    showarrow=False,
-    font=dict(color='white', size=14, family='Arial Black'),
-    yshift=15
+    targets.append('progress_figure')
+if len(st.session_state.q_error_history) > 0:
+    targets.append('optimality_figure')
+# A comparison stays on screen until the layout changes
+comparison = st.session_state.get('comparison')
+if comparison is not None and comparison[0] != layout_key:
+    comparison = st.session_state.comparison = None
+if comparison is not None:
+    targets.append('comparison_figure')
+run = pipeline.run(
+    targets,
+    profiler=profiler,
+    q_version=st.session_state.q_version,
+    layout_key=layout_key,
+    discount=discount,
+    comparison=comparison,
+    env=env,
+    q_star=q_star,
+    q_table=st.session_state.q_table,
+    episodes_run=st.session_state.episodes_run,
+    history=st.session_state.rewards_history,
+    q_error_history=st.session_state.q_error_history,
+    agreement_history=st.session_state.agreement_history
 )
-fig_q.add_annotation(
-    x=4, y=4,
-    text="GOAL",
-    showarrow=False,
-    font=dict(color='white', size=14, family='Arial Black'),
-    yshift=15
-)
-
-fig_q.update_layout(
-    title='Q-Values Heatmap (brighter = better)',
-    xaxis_title='Column',
-    yaxis_title='Row',
-    height=500
+st.sidebar.caption(
+    f"⚙️ Recomputed: {', '.join(run.computed) or 'nothing'} · "
+    f"reused: {', '.join(run.reused) or 'nothing'}"
 )
 
-st.plotly_chart(fig_q, use_container_width=True)
+# ========================================
+# Q-VALUES VISUALIZATION
+# ========================================
 
-st.caption("""
+if show_optimal:
+    show_figure(run['optimal_heatmap'], profiler, 'optimal_heatmap')
+    st.caption(
+        f"💡 **Ground truth:** exact values from value iteration ({q_star.iterations} vectorized "
+        f"Bellman sweeps{'' if q_star.converged else ', stopped at the iteration limit'}). "
+        f"A fully trained agent's heatmap converges to this one."
+    )
+else:
+    show_figure(run['q_heatmap'], profiler, 'q_heatmap')
+
+    st.caption("""
 💡 **Interpretation:**
 - Brighter colors = higher Q-values = better states
 - As agent learns, path from START to GOAL becomes brighter
@@ -237,38 +643,202 @@ st.caption("""
 if st.session_state.episodes_run > 0:
     st.subheader("📈 Learning Progress")
 
-    # Learning curve
-    fig_progress = go.Figure()
-    fig_progress.add_trace(go.Scatter(
-        y=st.session_state.rewards_history,
-        mode='lines',
-        name='Episode Reward',
-        line=dict(color='#2c5aa0', width=1)
-    ))
+    history = st.session_state.rewards_history
+    if len(history) > MAX_CHART_POINTS:
+        st.caption(f"Showing a shape-preserving sample of {len(history):,} episodes "
+                   f"(history uses {history.nbytes / 1e6:.1f} MB)")
 
-    # Add moving average if enough data
-    if len(st.session_state.rewards_history) > 10:
-        window = 10
-        moving_avg = np.convolve(
-            st.session_state.rewards_history,
-            np.ones(window)/window,
-            mode='valid'
-        )
-        fig_progress.add_trace(go.Scatter(
-            y=moving_avg,
-            mode='lines',
-            name=f'{window}-Episode Average',
-            line=dict(color='#ff6b6b', width=2)
-        ))
+    col_reward, col_optimal = st.columns(2)
+
+    with col_reward:
+        show_figure(run['progress_figure'], profiler, 'progress_figure')
 
-        fig_progress.update_layout(
-            title='Rewards Over Time',
-            xaxis_title='Episode',
-            yaxis_title='Total Reward',
-            hovermode='x unified',
-            height=400
+    with col_optimal:
+        if 'optimality_figure' in run:
+            show_figure(run['optimality_figure'], profiler, 'optimality_figure')
+            q_error_history = st.session_state.q_error_history
+            st.caption(
+                f"After the last episode: RMS error {q_error_history.mean[-1]:.2f}, optimal greedy "
+                f"action in {st.session_state.agreement_history.mean[-1]:.0%} of reachable states "
+                f"(Q* for γ at training time)"
+            )
+        else:
+            st.caption("Train more episodes to compare the agents with the optimal Q-values.")
+
+# ========================================
+# PLANNING COMPARISON
+# ========================================
+
+st.subheader("⚖️ Planning vs Plain Q-Learning")
+
+def request_comparison():
+    """Callback: compare the planning modes with the current settings."""
+    st.session_state.comparison = (
+        layout_key, learning_rate, discount, epsilon, n_agents,
+        n_planning or WIDGET_DEFAULTS['n_planning'], st.session_state.comparison_episodes
+    )
+
+compare_col1, compare_col2 = st.columns([3, 1])
+with compare_col1:
+    st.slider("Episodes per mode", 10, 500, 100, 10, key='comparison_episodes')
+with compare_col2:
+    st.button("▶️ Run Comparison", on_click=request_comparison, width='stretch')
+
+if comparison is not None:
+    show_figure(run['comparison_figure'], profiler, 'comparison_figure')
+    summary_cols = st.columns(len(run['planning_comparison']))
+    for col, (mode, trace) in zip(summary_cols, run['planning_comparison'].items()):
+        with col:
+            st.metric(PLANNING_LABELS[mode], f"{trace.error[-1]:.2f}",
+                      help="RMS error against Q* after the last episode")
+            st.caption(
+                f"{trace.agreement[-1]:.0%} optimal actions · {trace.steps[-1]:,.0f} steps · "
+                f"{trace.seconds[-1]:.2f}s · {trace.planning_updates / comparison[4]:,.0f} planning updates per agent"
+            )
+    st.caption(
+        f"{comparison[4]} agents, {comparison[6]} episodes per mode, "
+        f"{comparison[5]} planning updates per step, same seed. Planning needs far fewer environment "
+        f"steps; each step costs more compute."
+    )
+else:
+    st.caption("Trains fresh agents with each planning mode on this layout and plots their distance "
+               "to Q* per environment step and per second.")
+
+# ========================================
+# HYPERPARAMETER SWEEP
+# ========================================
+
+st.subheader("🧮 Hyperparameter Sweep (α × γ × ε)")
+st.caption("Trains every combination of the selected values with several seeds per cell, in the "
+           "background on all cores. Finished grids are cached for every session and across restarts.")
+
+for key, default in SWEEP_DEFAULTS.items():
+    st.session_state.setdefault(key, default)
+sweep_col1, sweep_col2, sweep_col3 = st.columns(3)
+with sweep_col1:
+    sweep_alphas = st.multiselect("Learning rates (α)", ALPHAS, key='sweep_alphas')
+with sweep_col2:
+    sweep_gammas = st.multiselect("Discount factors (γ)", GAMMAS, key='sweep_gammas')
+with sweep_col3:
+    sweep_epsilons = st.multiselect("Exploration rates (ε)", EPSILONS, key='sweep_epsilons')
+sweep_col1, sweep_col2 = st.columns(2)
+with sweep_col1:
+    sweep_seeds = st.slider("Seeds per cell", 1, 10, 5, key='sweep_seeds')
+with sweep_col2:
+    sweep_episodes = st.number_input("Episodes per agent", 10, 2000, 100, 10, key='sweep_episodes')
+
+sweep_settings = (layout_key, tuple(sorted(sweep_alphas)), tuple(sorted(sweep_gammas)),
+                  tuple(sorted(sweep_epsilons)), sweep_seeds, int(sweep_episodes))
+sweep_complete = bool(sweep_alphas and sweep_gammas and sweep_epsilons)
+with profiler.section('sweep lookup'):
+    sweep_grid = find_sweep(*sweep_settings) if sweep_complete else None
+
+def apply_best(best):
+    """Callback: move the sidebar sliders to the best cell of the sweep."""
+    st.session_state.learning_rate, st.session_state.discount, st.session_state.epsilon = best
+
+sweeping = st.session_state.get('sweep_runner') is not None
+
+@st.fragment(run_every=REFRESH_SECONDS if sweeping else None)
+def sweep_panel():
+    runner = st.session_state.get('sweep_runner')
+    if runner is not None and not runner.running:
+        st.session_state.sweep_runner = None
+        if runner.error is not None:
+            st.session_state.sweep_flash = ("error", f"❌ Sweep failed: {runner.error}")
+        elif runner.result is not None:
+            st.session_state.sweep_flash = ("success", f"✅ Swept {runner.n_agents:,} agents in "
+                                                       f"{runner.result.seconds:.1f}s")
+        st.rerun()
+
+    if 'sweep_flash' in st.session_state:
+        kind, message = st.session_state.pop('sweep_flash')
+        getattr(st, kind)(message)
+
+    if runner is not None:
+        st.progress(runner.progress)
+        status = "Stopping" if runner.stopped else "Sweeping"
+        st.text(f"{status}... {runner.agents_done:,}/{runner.n_agents:,} agents")
+        if st.button("⏹️ Stop Sweep", disabled=runner.stopped):
+            runner.stop()
+    elif sweep_grid is None:
+        n_cells = len(sweep_alphas) * len(sweep_gammas) * len(sweep_epsilons)
+        if st.button("▶️ Run Sweep", disabled=not sweep_complete):
+            st.session_state.sweep_runner = SweepRunner(*sweep_settings).start()
+            st.rerun()
+        st.caption(f"{n_cells} cells × {sweep_seeds} seeds = {n_cells * sweep_seeds:,} agents, "
+                   f"{int(sweep_episodes)} episodes each")
+
+sweep_panel()
+
+if sweep_grid is not None:
+    best = sweep_grid.best()
+    i, j, k = (list(values).index(v) for values, v in
+               zip((sweep_grid.alphas, sweep_grid.gammas, sweep_grid.epsilons), best))
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        st.metric("Best Cell (α, γ, ε)", f"{best[0]:g}, {best[1]:g}, {best[2]:g}")
+    with col2:
+        st.metric("Its Final Reward", f"{sweep_grid.final_reward[i, j, k]:.1f}",
+                  help=f"Mean over {sweep_grid.n_seeds} seeds of the last episodes")
+    with col3:
+        st.button("🎯 Use Best", on_click=apply_best, args=(best,),
+                  help="Set the sidebar sliders to this combination")
+
+    sweep_epsilon = sweep_grid.epsilons[0]
+    if len(sweep_grid.epsilons) > 1:
+        sweep_epsilon = st.select_slider("Exploration rate (ε) shown", sweep_grid.epsilons,
+                                         value=best[2], format_func=lambda v: f"{v:g}")
+    k = list(sweep_grid.epsilons).index(sweep_epsilon)
+
+    def sweep_heatmap(values, title, colorscale, hover, customdata=None):
+        fig_sweep = go.Figure(go.Heatmap(
+            z=values[:, :, k],
+            x=[f"{g:g}" for g in sweep_grid.gammas],
+            y=[f"{a:g}" for a in sweep_grid.alphas],
+            customdata=customdata,
+            colorscale=colorscale,
+            texttemplate='%{z:.0f}',
+            hovertemplate=hover + '<extra></extra>'
+        ))
+        fig_sweep.update_layout(
+            title=f'{title} (ε = {sweep_epsilon:g})',
+            xaxis_title='Discount factor (γ)',
+            yaxis_title='Learning rate (α)',
+            height=420
+        )
+        return fig_sweep
+
+    # Rebuilt only for a new grid or another ε slice
+    axes = (sweep_grid.alphas, sweep_grid.gammas)
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_reward = cached_figure(
+            'sweep reward heatmap',
+            lambda: sweep_heatmap(sweep_grid.final_reward, 'Final Reward', 'RdYlGn',
+                                  'α=%{y} γ=%{x}<br>final reward %{z:.1f}'),
+            data=(sweep_grid.final_reward[:, :, k], *axes), epsilon=sweep_epsilon
         )
-        st.plotly_chart(fig_progress, use_container_width=True)
+        show_figure(fig_reward, profiler, 'sweep reward heatmap')
+    with col2:
+        fig_convergence = cached_figure(
+            'sweep convergence heatmap',
+            lambda: sweep_heatmap(
+                sweep_grid.convergence, 'Episodes to Convergence', 'Viridis_r',
+                'α=%{y} γ=%{x}<br>%{z:.0f} episodes<br>%{customdata:.0%} of seeds converged',
+                customdata=sweep_grid.converged[:, :, k]
+            ),
+            data=(sweep_grid.convergence[:, :, k], sweep_grid.converged[:, :, k], *axes),
+            epsilon=sweep_epsilon
+        )
+        show_figure(fig_convergence, profiler, 'sweep convergence heatmap')
+    st.caption(
+        f"Mean over {sweep_grid.n_seeds} seeds, {sweep_grid.n_episodes} episodes each "
+        f"(computed in {sweep_grid.seconds:.1f}s). Final reward averages the last {FINAL_EPISODES} episodes. "
+        f"An agent has converged once its {SETTLE_WINDOW}-episode moving average stays within "
+        f"{SETTLE_FRACTION:.0%} of the goal reward of its final value; agents that never settle count as "
+        f"the full {sweep_grid.n_episodes} episodes."
+    )
 
 # ========================================
 # EDUCATIONAL SECTION
@@ -319,3 +889,5 @@ st.markdown("""
 - Trading strategies (stock market)
 - Recommendation systems
 """)
+
+finish_profiling(profiler)
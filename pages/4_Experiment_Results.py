@@ -0,0 +1,194 @@
+from pathlib import Path
+
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+from ml_explorer.experiments import EXPERIMENT_DIR, RESULT_SUFFIXES, list_results, load_results, save_upload
+from ml_explorer.figures import cached_figure
+from ml_explorer.overlay import finish_profiling, show_figure, start_profiling
+
+# Page configuration - MUST be first Streamlit command
+st.set_page_config(
+    page_title="ML Explorer Dashboard - Experiment Results",
+    page_icon="🤖",
+    layout="wide"
+)
+profiler = start_profiling('Experiment Results')
+
+
+def is_numeric(column):
+    # pandas is only imported once there are results to show (they need it anyway)
+    from pandas.api.types import is_numeric_dtype
+    return is_numeric_dtype(column)
+
+
+# Page title
+st.title("🧪 Experiment Results")
+st.markdown("## Browse Headless Experiment Runs")
+
+# ========================================
+# RESULTS FILE
+# ========================================
+
+st.sidebar.header("Results File")
+source = st.sidebar.radio(
+    "Results",
+    ["Saved on server", "Upload a file"],
+    label_visibility="collapsed"
+)
+
+results_path = None
+try:
+    if source == "Saved on server":
+        saved = list_results()
+        if saved:
+            results_path = st.sidebar.selectbox(
+                "File",
+                saved,
+                format_func=lambda p: str(p.relative_to(EXPERIMENT_DIR))
+            )
+    else:
+        uploaded = st.sidebar.file_uploader("Results file", type=[s.lstrip('.') for s in RESULT_SUFFIXES])
+        if uploaded is not None:
+            results_path = save_upload(uploaded.getvalue(), uploaded.name)
+
+    if results_path is None:
+        st.info(f"""
+No results file yet. Run an experiment spec from the command line, then pick its
+output in the sidebar (files under `{EXPERIMENT_DIR}` are listed automatically):
+
+```bash
+python -m ml_explorer.experiments my_spec.yaml
+```
+""")
+        st.stop()
+
+    with profiler.section('load results'):
+        results = load_results(results_path)
+except ValueError as e:
+    st.error(f"❌ {e}")
+    st.stop()
+
+spec = results.spec
+frame = results.frame
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Experiment", spec['experiment'])
+with col2:
+    st.metric("Runs", f"{len(frame):,}")
+with col3:
+    st.metric("Seeds", len(spec['seeds']))
+with col4:
+    st.metric("Compute Time", f"{frame['seconds'].sum():.1f}s")
+st.caption(f"**{spec['name']}** · written {results.created} · {Path(results_path).name}")
+with st.expander("Spec"):
+    st.json(spec)
+
+# ========================================
+# FILTERS
+# ========================================
+
+st.sidebar.header("Filters")
+rows = np.ones(len(frame), dtype=bool)
+for parameter in results.swept:
+    values = sorted(frame[parameter].unique(), key=str)
+    chosen = st.sidebar.multiselect(parameter, values, default=values)
+    rows &= frame[parameter].isin(chosen).to_numpy()
+if not rows.any():
+    st.warning("⚠️ No runs match the filters")
+    st.stop()
+
+# ========================================
+# METRIC BY PARAMETER
+# ========================================
+
+st.subheader("📈 Metric by Parameter")
+scalar_metrics = results.scalar_metrics + ('seconds',)
+swept = results.swept or ('seed',)
+col1, col2, col3 = st.columns(3)
+with col1:
+    metric = st.selectbox("Metric", scalar_metrics)
+with col2:
+    x_param = st.selectbox("X axis", swept)
+with col3:
+    color_param = st.selectbox("Color", ['(none)'] + [p for p in swept if p != x_param])
+by = [x_param] if color_param == '(none)' else [x_param, color_param]
+
+with profiler.section('summary'):
+    summary = results.summary(metric, by, rows)
+    summary = summary.sort_values(by, key=lambda column: column if is_numeric(column) else column.map(str))
+
+
+def build_metric_figure():
+    fig_metric = go.Figure()
+    groups = [(None, summary)] if color_param == '(none)' else summary.groupby(color_param, sort=False)
+    numeric_x = is_numeric(summary[x_param])
+    for i, (value, group) in enumerate(groups):
+        fig_metric.add_trace(go.Scatter(
+            x=group[x_param] if numeric_x else group[x_param].map(str),
+            y=group['mean'],
+            error_y=dict(type='data', array=group['std'].fillna(0), visible=True),
+            mode='lines+markers',
+            name=metric if value is None else f"{color_param}={value}",
+            line=dict(color=qualitative.Plotly[i % len(qualitative.Plotly)], width=2)
+        ))
+    fig_metric.update_layout(
+        title=f'{metric} (mean ± std over seeds)',
+        xaxis_title=x_param,
+        yaxis_title=metric,
+        hovermode='x unified',
+        height=420
+    )
+    return fig_metric
+
+
+# Keyed by the summarised values, so reruns with the same filters reuse the chart
+fig_metric = cached_figure('metric figure', build_metric_figure, data=(summary,),
+                           metric=metric, x_param=x_param, color_param=color_param)
+show_figure(fig_metric, profiler, 'metric figure')
+
+# Curves stored per run (the mean reward of every Q-learning episode)
+if results.curve_metrics:
+    curve = st.selectbox("Curve", results.curve_metrics)
+
+    def build_curve_figure():
+        fig_curve = go.Figure()
+        for i, (key, group) in enumerate(frame[rows].groupby(by, sort=False)):
+            curves = np.stack([np.asarray(c, dtype=float) for c in group[curve]])
+            label = ', '.join(f"{p}={v}" for p, v in zip(by, key if isinstance(key, tuple) else (key,)))
+            fig_curve.add_trace(go.Scatter(
+                x=np.arange(1, curves.shape[1] + 1),
+                y=curves.mean(axis=0),
+                mode='lines',
+                name=label,
+                line=dict(color=qualitative.Plotly[i % len(qualitative.Plotly)], width=2)
+            ))
+        fig_curve.update_layout(
+            title=f'{curve} (mean over seeds)',
+            xaxis_title='Episode',
+            yaxis_title=curve,
+            height=420
+        )
+        return fig_curve
+
+    # Curves are arrays per row: key by the file (rewritten files get a new timestamp) and the filters
+    fig_curve = cached_figure('curve figure', build_curve_figure, data=(str(results_path), results.created, rows),
+                              curve=curve, by=tuple(by))
+    show_figure(fig_curve, profiler, 'curve figure')
+
+# ========================================
+# RUNS TABLE
+# ========================================
+
+st.subheader("📋 Runs")
+table = frame.loc[rows, ['run_id', *results.parameters, 'seed', *scalar_metrics]]
+st.dataframe(table, width='stretch', hide_index=True)
+st.download_button(
+    "⬇️ Download CSV",
+    data=table.to_csv(index=False),
+    file_name=f"{spec['name']}.csv",
+    mime='text/csv'
+)
+
+finish_profiling(profiler)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from ml_explorer import tabular
+
+
+def test_column_switching_from_numbers_to_text_keeps_early_rows(tmp_path):
+    # The first chunk reads "grade" as integers, the second as text
+    n = tabular.CHUNK_ROWS
+    grades = [str(i % 3) for i in range(n)] + ['1', 'x', '2.5', 'x']
+    path = tmp_path / 'switch.csv'
+    path.write_text('grade,label\n' + ''.join(f'{g},{i % 2}\n' for i, g in enumerate(grades)))
+
+    profile = tabular.profile_table(path, path.stat().st_mtime)
+    column = profile.column('grade')
+    assert column.kind == 'categorical'
+    assert column.values == ('0', '1', '2', '2.5', 'x')
+    assert column.n_missing == 0
+
+    chunks = list(tabular._typed_chunks(path, profile, columns=['grade']))
+    assert len(chunks) == 2
+    codes = np.concatenate([chunk.column('grade').combine_chunks().indices.to_numpy(zero_copy_only=False)
+                            for chunk in chunks])
+    assert len(codes) == len(grades)
+    assert (codes >= 0).all()
+    assert [column.values[code] for code in codes] == grades